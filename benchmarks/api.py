@@ -0,0 +1,228 @@
+"""
+Times the main task endpoints against seeded datasets of several sizes and
+writes the timings and SQL query counts as JSON, to compare between commits.
+
+For each of ``--sizes``, ``manage.py seed_tasks`` spreads that many tasks
+over ``--users`` users, unless an earlier run seeded them already, in the
+database at ``DATABASE_URL``, which must be migrated. Each endpoint is then
+requested ``--repeat`` times, after one warm-up request, as the user owning
+the most tasks, through Django's test client with the response cache off.
+The tasks created by the benchmark are completed and deleted through the
+API, so the dataset is the same for the next run.
+
+    python benchmarks/api.py --sizes 10000,100000,1000000 --output before.json
+    python benchmarks/api.py --sizes 10000,100000,1000000 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+    # Every request reaches the views
+    os.environ["API_CACHE_TIMEOUT"] = "0"
+    os.environ.setdefault("DJANGO_LOG_LEVEL", "WARNING")
+    import django
+
+    django.setup()
+    from django.conf import settings
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+
+def seed(size, num_users, seed):
+    """Seeds ``size`` tasks once; returns the user owning the most."""
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from todo_api.seeding import Seeder
+
+    prefix = f"bench-{size}-"
+    username = Seeder(prefix, num_users, size).usernames()[0]
+    User = get_user_model()
+    if not User.objects.filter(username=username).exists():
+        print(f"Seeding {size} tasks...", file=sys.stderr)
+        call_command(
+            "seed_tasks",
+            prefix=prefix,
+            users=num_users,
+            tasks=size,
+            seed=seed,
+            stdout=sys.stderr,
+        )
+    return User.objects.get(username=username)
+
+
+def get_cases(client, user):
+    """Returns ``(name, request)`` pairs; each request returns a response."""
+    from datetime import timedelta
+    from urllib.parse import urlencode
+
+    from django.utils import timezone
+
+    from todo_api.models import Tag, Task
+
+    task_id = (
+        Task.objects.filter(user=user).order_by("created_at").values_list("pk")[0][0]
+    )
+    tag_ids = list(Tag.objects.filter(user=user).values_list("pk", flat=True)[:2])
+    month_ago = urlencode({"created_at__gte": timezone.now() - timedelta(days=30)})
+    second_page = client.get("/api/tasks/").data["next"]
+    created, completed = [], []
+
+    def create():
+        response = client.post(
+            "/api/tasks/",
+            {"title": "Benchmark task", "priority": 1, "tags": tag_ids},
+            format="json",
+        )
+        created.append(response.data["id"])
+        return response
+
+    def complete():
+        completed.append(created.pop(0))
+        return client.post(f"/api/tasks/{completed[-1]}/complete/")
+
+    def list_tasks(query=""):
+        return lambda: client.get(f"/api/tasks/{query}")
+
+    return [
+        ("list", list_tasks()),
+        ("list_page_2", lambda: client.get(second_page)),
+        ("list_filtered", list_tasks("?completed=false&priority=1")),
+        ("list_created_range", list_tasks(f"?{month_ago}")),
+        ("search", list_tasks("?search=invoice")),
+        ("ordering_priority", list_tasks("?ordering=-priority")),
+        ("ordering_finish_at", list_tasks("?ordering=finish_at")),
+        ("detail", lambda: client.get(f"/api/tasks/{task_id}/")),
+        ("create", create),
+        ("complete", complete),
+        ("delete", lambda: client.delete(f"/api/tasks/{completed.pop()}/")),
+    ]
+
+
+def run_case(request, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for i in range(repeat + 1):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = request()
+            elapsed = time.perf_counter() - start
+        # The first request warms up caches and connections
+        if i:
+            timings.append(elapsed * 1000)
+    return {
+        "status": response.status_code,
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "queries": len(queries),
+    }
+
+
+def get_environment():
+    import django
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "database": f"{connection.vendor} {connection.get_database_version()}",
+        "python": platform.python_version(),
+        "django": django.get_version(),
+    }
+
+
+def compare(results, baseline):
+    before = {
+        (result["size"], result["endpoint"]): result for result in baseline["results"]
+    }
+    print(
+        f"{'size':>9} {'endpoint':<20}{'before ms':>11}{'after ms':>10}"
+        f"{'ratio':>8}{'queries':>10}"
+    )
+    for result in results:
+        old = before.get((result["size"], result["endpoint"]))
+        if old is None:
+            continue
+        queries = f"{old['queries']}->{result['queries']}"
+        print(
+            f"{result['size']:>9} {result['endpoint']:<20}{old['median_ms']:>11.2f}"
+            f"{result['median_ms']:>10.2f}"
+            f"{result['median_ms'] / old['median_ms']:>8.2f}{queries:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000",
+        help="Comma separated numbers of tasks in the database.",
+    )
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write; stdout by default.")
+    parser.add_argument("--compare", help="JSON file of an earlier run.")
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIClient
+
+    from todo_api.models import Task
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        user = seed(size, args.users, args.seed)
+        user_tasks = Task.objects.filter(user=user).count()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        for name, request in get_cases(client, user):
+            result = run_case(request, args.repeat)
+            results.append(
+                {"size": size, "user_tasks": user_tasks, "endpoint": name, **result}
+            )
+            print(
+                f"{size:>9} {name:<20}{result['median_ms']:>9.2f} ms "
+                f"{result['queries']:>3} queries",
+                file=sys.stderr,
+            )
+
+    output = {**get_environment(), "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Compares the WSGI (sync views, gunicorn sync workers) and ASGI (async views,
+gunicorn uvicorn workers) deployments under many concurrent clients.
+
+Each mode is started as a real gunicorn server against ``DATABASE_URL``,
+which must point at a migrated database, and hammered by ``--clients``
+keep-alive connections for ``--duration`` seconds. The API response cache is
+disabled so every request reaches the views.
+
+    python benchmarks/concurrency.py --clients 200 --duration 20
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    "wsgi": ["todolist.wsgi:application"],
+    "asgi": ["-k", "uvicorn_worker.UvicornWorker", "todolist.asgi:application"],
+}
+
+
+def setup_data(num_tasks):
+    """Creates the benchmark user and tasks once; returns an access token."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from todo_api.models import Tag, Task
+
+    user, created = get_user_model().objects.get_or_create(username="benchmark")
+    if created:
+        tags = Tag.objects.bulk_create(
+            Tag(name=f"Tag {i}", user=user) for i in range(5)
+        )
+        tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", priority=i % 3 + 1, user=user)
+            for i in range(num_tasks)
+        )
+        Task.tags.through.objects.bulk_create(
+            Task.tags.through(task_id=task.pk, tag_id=tags[i % 5].pk)
+            for i, task in enumerate(tasks)
+        )
+    return str(AccessToken.for_user(user))
+
+
+def start_server(mode, port, workers):
+    env = {
+        **os.environ,
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "API_CACHE_TIMEOUT": "0",
+        "DJANGO_ASYNC_VIEWS": str(mode == "asgi"),
+        "DJANGO_LOG_LEVEL": "WARNING",
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        *SERVERS[mode],
+    ]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def request(reader, writer, raw):
+    """Sends ``raw`` and reads one response; returns (status, keep_alive)."""
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+        return status, headers.get("connection") != "close"
+    await reader.read()
+    return status, False
+
+
+async def client(port, raw, deadline, latencies, errors):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            start = time.perf_counter()
+            status, keep_alive = await request(reader, writer, raw)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            errors.append(type(exc).__name__)
+            keep_alive = False
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, path, token, clients, duration):
+    raw = (
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Authorization: Bearer {token}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *(client(port, raw, deadline, latencies, errors) for _ in range(clients))
+    )
+    return latencies, errors
+
+
+def report(mode, latencies, errors, duration):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float("nan")
+    median = statistics.median(latencies) if latencies else float("nan")
+    print(
+        f"{mode:<6}{len(latencies) / duration:>10.1f}{median * 1000:>12.1f}"
+        f"{p99 * 1000:>12.1f}{len(errors):>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--path", default="/api/tasks/")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", choices=SERVERS, default=list(SERVERS))
+    args = parser.parse_args()
+
+    token = setup_data(args.tasks)
+    print(
+        f"{args.clients} clients, {args.workers} workers, GET {args.path}, "
+        f"{args.duration:g}s per mode"
+    )
+    print(f"{'mode':<6}{'req/s':>10}{'p50 ms':>12}{'p99 ms':>12}{'errors':>10}")
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.workers)
+        try:
+            asyncio.run(load(args.port, args.path, token, args.clients, args.warmup))
+            latencies, errors = asyncio.run(
+                load(args.port, args.path, token, args.clients, args.duration)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        report(mode, latencies, errors, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measures how many images per second the image variant pipeline renders with
+1 up to ``--workers`` processes, to size ``API_IMAGE_VARIANT_WORKERS``.
+
+``--images`` synthetic JPEGs of ``--width`` x ``--height`` pixels, like
+phone photos, are written to a temporary directory, and each pool size
+renders every variant of all of them with ``render_variants``, as the pool
+started by ``todo_api.images`` does; the median of ``--repeat`` runs is
+reported. No database is needed.
+
+    python benchmarks/image_variants.py --images 64 --workers 8 --repeat 3
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_images(directory, num_images, width, height):
+    """Writes the source images once; returns their paths."""
+    from PIL import Image, ImageDraw
+
+    paths = []
+    for i in range(num_images):
+        path = os.path.join(directory, f"source-{i}.jpg")
+        image = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+        # Some detail, so the encoders have something to compress
+        draw = ImageDraw.Draw(image)
+        for x in range(0, width, 40):
+            draw.line((x, 0, width - x, height), fill=(i * 37 % 256, x % 256, 90))
+        image.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def run(paths, output, workers):
+    from todo_api.images import VARIANTS, render_variants, variant_name
+
+    shutil.rmtree(output, ignore_errors=True)
+    jobs = [
+        (
+            path,
+            {
+                variant: os.path.join(output, str(i), f"{variant}.webp")
+                for variant in VARIANTS
+            },
+        )
+        for i, path in enumerate(paths)
+    ]
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Workers are started, and import todo_api.images, before timing, as
+        # the server's pool outlives a request
+        list(executor.map(variant_name, ["warm-up"] * workers, ["thumbnail"] * workers))
+        start = time.perf_counter()
+        written = sum(executor.map(render_variants, *zip(*jobs)))
+        elapsed = time.perf_counter() - start
+    return elapsed, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = setup_images(directory, args.images, args.width, args.height)
+        output = os.path.join(directory, "variants")
+        print(
+            f"{args.images} images of {args.width}x{args.height}, "
+            f"{os.cpu_count()} CPUs, median of {args.repeat} runs"
+        )
+        print(f"{'workers':<10}{'total s':>10}{'images/s':>12}{'speedup':>10}{'MB':>8}")
+        baseline = None
+        for workers in range(1, args.workers + 1):
+            timings = []
+            for _ in range(args.repeat):
+                elapsed, written = run(paths, output, workers)
+                timings.append(elapsed)
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(
+                f"{workers:<10}{median:>10.2f}{args.images / median:>12.1f}"
+                f"{baseline / median:>10.2f}{written / 1024**2:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Compares request latency under load with the two logging setups: a plain
+``FileHandler`` written to by the request threads, as before, and the
+queue of ``todo_api.logs``, written to by a listener thread.
+
+``--threads`` threads each handle ``--requests`` simulated requests, which
+wait ``--wait-us`` microseconds, as on the database, and log ``--records``
+INFO records to a file in a temporary directory. ``--write-delay-ms``
+makes every write that much slower, like a busy disk. The latency
+percentiles, and how many records were written or dropped, are reported.
+No database is needed.
+
+    python benchmarks/logging_pipeline.py --threads 16 --write-delay-ms 1
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def slow(handler_class, delay):
+    """Returns ``handler_class`` with ``delay`` seconds added to each write."""
+
+    class SlowHandler(handler_class):
+        def emit(self, record):
+            super().emit(record)
+            time.sleep(delay)
+
+    return SlowHandler
+
+
+def get_handlers(setup, path, args):
+    """Returns the handler to attach to the logger, then all the handlers."""
+    from todo_api.logs import (
+        JSONFormatter,
+        NonBlockingQueueHandler,
+        ProcessSafeRotatingFileHandler,
+    )
+
+    delay = args.write_delay_ms / 1000
+    if setup == "file":
+        handler = slow(logging.FileHandler, delay)(path)
+        handler.setFormatter(
+            logging.Formatter("{levelname} {asctime} {module} {message}", style="{")
+        )
+        return handler, [handler]
+    file_handler = slow(ProcessSafeRotatingFileHandler, delay)(
+        path, maxBytes=10 * 1024**2, backupCount=100
+    )
+    file_handler.setFormatter(JSONFormatter())
+    file_handler.set_name(f"benchmark-{setup}")
+    handler = NonBlockingQueueHandler(
+        [file_handler.name], queue_size=args.queue_size, sample_rate=10
+    )
+    return handler, [handler, file_handler]
+
+
+def run(setup, directory, args):
+    path = os.path.join(directory, f"{setup}.log")
+    handler, handlers = get_handlers(setup, path, args)
+    logger = logging.getLogger(f"benchmark.{setup}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    latencies = [[] for _ in range(args.threads)]
+
+    def handle_requests(timings):
+        for i in range(args.requests):
+            start = time.perf_counter()
+            time.sleep(args.wait_us / 1e6)
+            for j in range(args.records):
+                logger.info("Request %s: step %s done", i, j, extra={"step": j})
+            timings.append(time.perf_counter() - start)
+
+    threads = [
+        threading.Thread(target=handle_requests, args=(timings,))
+        for timings in latencies
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # Closing the queue handler first writes out its queued records
+    for each in handlers:
+        logger.removeHandler(each)
+        each.close()
+    written = sum(
+        file.read_text().count("Request ")
+        for file in Path(directory).glob(f"{setup}.log*")
+        if not file.name.endswith(".lock")
+    )
+    dropped = args.threads * args.requests * args.records - written
+    return sorted(sum(latencies, [])), elapsed, written, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=3)
+    parser.add_argument("--wait-us", type=int, default=500)
+    parser.add_argument("--write-delay-ms", type=float, default=0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+
+    print(
+        f"{args.threads} threads x {args.requests} requests of {args.records} "
+        f"records, {args.write_delay_ms} ms per write"
+    )
+    print(
+        f"{'setup':<8}{'p50 us':>10}{'p99 us':>10}{'max ms':>10}"
+        f"{'req/s':>10}{'written':>10}{'dropped':>10}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for setup in ("file", "queue"):
+            latencies, elapsed, written, dropped = run(setup, directory, args)
+            p50 = statistics.median(latencies) * 1e6
+            p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+            print(
+                f"{setup:<8}{p50:>10.0f}{p99:>10.0f}{latencies[-1] * 1000:>10.1f}"
+                f"{len(latencies) / elapsed:>10.0f}{written:>10}{dropped:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
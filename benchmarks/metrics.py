@@ -0,0 +1,97 @@
+"""
+Measures what the request metrics of ``todo_api.metrics`` add to a request,
+in microseconds.
+
+A trivial view is called ``--requests`` times with and without
+``MetricsMiddleware`` in front of it, each request running ``--queries``
+calls through the ``record_query`` wrapper, as a view's SQL queries do; the
+difference is the cost per request. Metrics are written to a temporary
+``API_METRICS_DIR``, and no database is needed. The median of ``--repeat``
+runs is reported.
+
+    python benchmarks/metrics.py --requests 100000 --queries 5 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def time_requests(handler, requests):
+    start = time.perf_counter()
+    for request in requests:
+        handler(request)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    from todo_api.metrics import MetricsMiddleware, collect, record_query
+
+    def execute(sql, params, many, context):
+        return None
+
+    def view(request):
+        for _ in range(args.queries):
+            record_query(execute, "SELECT 1", (), False, {})
+        return HttpResponse(b'{"results": []}', content_type="application/json")
+
+    factory = RequestFactory()
+    requests = []
+    for i in range(args.requests):
+        request = factory.get("/api/tasks/")
+        request.resolver_match = resolve("/api/tasks/" if i % 2 else "/api/tags/")
+        requests.append(request)
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.API_METRICS_DIR = directory
+        middleware = MetricsMiddleware(view)
+        # Opens the store and encodes the keys, once per process in the server
+        time_requests(middleware, requests[:2])
+        print(
+            f"{args.requests} requests of {args.queries} queries, "
+            f"median of {args.repeat} runs"
+        )
+        print(f"{'':<18}{'total s':>10}{'us/request':>12}")
+        timings = {"without metrics": [], "with metrics": []}
+        for _ in range(args.repeat):
+            timings["without metrics"].append(time_requests(view, requests))
+            timings["with metrics"].append(time_requests(middleware, requests))
+        medians = {name: statistics.median(runs) for name, runs in timings.items()}
+        for name, median in medians.items():
+            print(f"{name:<18}{median:>10.3f}{median / args.requests * 1e6:>12.2f}")
+        overhead = medians["with metrics"] - medians["without metrics"]
+        print(
+            f"{'overhead':<18}{overhead:>10.3f}{overhead / args.requests * 1e6:>12.2f}"
+        )
+        recorded = sum(
+            value
+            for (name, _labels), value in collect(directory).items()
+            if name == "todo_api_requests_total"
+        )
+        assert recorded == args.requests * args.repeat + 2, recorded
+
+
+if __name__ == "__main__":
+    main()
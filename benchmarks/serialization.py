@@ -0,0 +1,140 @@
+"""
+Compares the two ways of serializing a page of tasks: ``TaskSerializer`` over
+model instances rendered by DRF's ``JSONRenderer``, and
+``TaskRowListSerializer`` over ``.values()`` rows rendered by
+``FastJSONRenderer``, as ``GET /api/tasks/`` now does.
+
+Each path loads, serializes and renders the same ``--tasks`` tasks of a
+benchmark user against ``DATABASE_URL``, which must point at a migrated
+database; the median of ``--repeat`` runs is reported per stage, and both
+paths must produce the same bytes.
+
+    python benchmarks/serialization.py --tasks 10000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_data(num_tasks):
+    """Creates the benchmark user and tasks once; returns the user."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from todo_api.models import Tag, Task
+
+    user, _ = get_user_model().objects.get_or_create(
+        username=f"serialization-{num_tasks}"
+    )
+    if not Task.objects.filter(user=user).exists():
+        tags = Tag.objects.bulk_create(
+            Tag(name=f"Tag {i}", user=user) for i in range(10)
+        )
+        now = timezone.now()
+        tasks = Task.objects.bulk_create(
+            (
+                Task(
+                    title=f"Task {i}",
+                    description="Benchmark task " * 4,
+                    priority=i % 3 + 1,
+                    completed=i % 4 == 0,
+                    finish_at=now + timedelta(days=i % 30) if i % 2 else None,
+                    related_url="https://example.com/" if i % 5 == 0 else None,
+                    extra_data={"index": i, "labels": ["a", "b"]} if i % 3 else None,
+                    user=user,
+                )
+                for i in range(num_tasks)
+            ),
+            batch_size=2000,
+        )
+        Task.tags.through.objects.bulk_create(
+            (
+                Task.tags.through(task_id=task.pk, tag_id=tags[(i + j) % 10].pk)
+                for i, task in enumerate(tasks)
+                for j in range(i % 3)
+            ),
+            batch_size=2000,
+        )
+    return user
+
+
+def run_serializer(queryset, request):
+    from rest_framework.renderers import JSONRenderer
+
+    from todo_api.serializers import TaskSerializer
+
+    start = time.perf_counter()
+    tasks = list(TaskSerializer.setup_eager_loading(queryset))
+    loaded = time.perf_counter()
+    data = TaskSerializer(tasks, many=True, context={"request": request}).data
+    serialized = time.perf_counter()
+    content = JSONRenderer().render(data)
+    rendered = time.perf_counter()
+    return content, [loaded - start, serialized - loaded, rendered - serialized]
+
+
+def run_rows(queryset, request):
+    from todo_api.renderers import FastJSONRenderer
+    from todo_api.serializers import TaskRowListSerializer
+
+    start = time.perf_counter()
+    rows = list(TaskRowListSerializer.setup_values(queryset))
+    loaded = time.perf_counter()
+    data = TaskRowListSerializer(rows, context={"request": request}).data
+    serialized = time.perf_counter()
+    content = FastJSONRenderer().render(data)
+    rendered = time.perf_counter()
+    return content, [loaded - start, serialized - loaded, rendered - serialized]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    user = setup_data(args.tasks)
+    from rest_framework.test import APIRequestFactory
+
+    from todo_api.models import Task
+
+    queryset = Task.objects.filter(user=user).order_by("-created_at", "-id")
+    request = APIRequestFactory().get("/api/tasks/")
+    paths = {"serializer": run_serializer, "rows": run_rows}
+
+    print(f"{args.tasks} tasks, median of {args.repeat} runs")
+    print(
+        f"{'path':<12}{'load ms':>10}{'serialize ms':>14}"
+        f"{'render ms':>12}{'total ms':>12}{'bytes':>12}"
+    )
+    outputs = {}
+    for name, run in paths.items():
+        timings = []
+        for _ in range(args.repeat):
+            content, stages = run(queryset, request)
+            timings.append(stages)
+        outputs[name] = content
+        medians = [statistics.median(stage) * 1000 for stage in zip(*timings)]
+        total = statistics.median(sum(stages) for stages in timings) * 1000
+        print(
+            f"{name:<12}{medians[0]:>10.1f}{medians[1]:>14.1f}"
+            f"{medians[2]:>12.1f}{total:>12.1f}{len(content):>12}"
+        )
+    if outputs["serializer"] != outputs["rows"]:
+        sys.exit("The two paths rendered different bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,10 @@
 
 python manage.py collectstatic --noinput
 python manage.py migrate --noinput
-python -m gunicorn --bind 0.0.0.0:8000 --workers 3 todolist.wsgi:application
\ No newline at end of file
+# Metrics of the previous server's processes
+rm -rf "${API_METRICS_DIR:-/tmp/todo_api_metrics}"
+if [ "$DJANGO_ASYNC_VIEWS" = "True" ]; then
+    python -m gunicorn --bind 0.0.0.0:8000 --workers 3 -k uvicorn_worker.UvicornWorker todolist.asgi:application
+else
+    python -m gunicorn --bind 0.0.0.0:8000 --workers 3 todolist.wsgi:application
+fi
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class TodoApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "todo_api"
+
+    def ready(self):
+        from .authentication import user_deleted, user_saved
+        from .jobs import task_saved
+        from .metrics import connection_created as metrics_connection_created
+
+        post_save.connect(user_saved, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(user_deleted, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(task_saved, sender="todo_api.Task")
+        connection_created.connect(metrics_connection_created)
@@ -0,0 +1,110 @@
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import views
+from .models import Task
+from .serializers import TaskSerializer
+
+
+class AsyncListMixin(AsyncAPIView):
+    """
+    Async handlers for a sync list view, served when ``API_ASYNC_VIEWS`` is
+    on.
+
+    The view keeps its querysets, serializers, filters, caching and ETags.
+    Reads use the async ORM; writes run the sync implementation in a single
+    ``sync_to_async`` call, as Django transactions (and the ``on_commit``
+    cache invalidation) are not available in async code.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aget_cached(request, self.alist, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.create)(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        etag = await self.aget_list_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+            page = await self.apaginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        response["ETag"] = etag
+        return response
+
+    async def apaginate_queryset(self, queryset):
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+
+class AsyncDetailMixin(AsyncAPIView):
+    """Async handlers for a sync detail view, see ``AsyncListMixin``."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aget_cached(request, self.aretrieve, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        return await sync_to_async(self.update)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await sync_to_async(self.partial_update)(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        return await sync_to_async(self.destroy)(request, *args, **kwargs)
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aretrieve(self, request, *args, **kwargs):
+        # Once loaded, retrieving is pure Python: ``get_object`` returns the
+        # memoized instance and the tags it serializes are prefetched.
+        self._object = await self.aget_object()
+        return self.retrieve(request, *args, **kwargs)
+
+
+class TaskListCreate(AsyncListMixin, views.TaskListCreate):
+    async def apaginate_queryset(self, queryset):
+        return await super().apaginate_queryset(self.get_rows_queryset(queryset))
+
+
+class TaskRetrieveUpdateDestroy(AsyncDetailMixin, views.TaskRetrieveUpdateDestroy):
+    pass
+
+
+class MarkTaskAsCompletedView(AsyncAPIView, views.MarkTaskAsCompletedView):
+    @extend_schema(request=TaskSerializer, responses=TaskSerializer)
+    async def post(self, request, pk):
+        try:
+            task = await sync_to_async(self.complete)(pk, request.user)
+        except Task.DoesNotExist:
+            return Response(
+                {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        serializer = TaskSerializer(task)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class TagListCreate(AsyncListMixin, views.TagListCreate):
+    pass
+
+
+class TagRetrieveUpdateDestroy(AsyncDetailMixin, views.TagRetrieveUpdateDestroy):
+    pass
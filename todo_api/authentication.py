@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Cached for users that were deleted, so their tokens are rejected
+DELETED = "deleted"
+
+
+def _get_cache():
+    return caches[settings.API_USER_CACHE_ALIAS]
+
+
+def _user_key(user_id) -> str:
+    return f"todo:user:{user_id}"
+
+
+def cache_user(user) -> None:
+    """
+    Stores what authenticating the user needs for ``API_USER_CACHE_TIMEOUT``
+    seconds: its id, username and whether it is active. The password hash
+    is only kept as the digest revocable tokens carry anyway.
+    """
+    entry = {
+        "id": getattr(user, api_settings.USER_ID_FIELD),
+        "username": user.get_username(),
+        "is_active": user.is_active,
+    }
+    if api_settings.CHECK_REVOKE_TOKEN:
+        entry["password"] = get_md5_hash_password(user.password)
+    _get_cache().set(
+        _user_key(entry["id"]), entry, timeout=settings.API_USER_CACHE_TIMEOUT
+    )
+
+
+def forget_user(user_id) -> None:
+    """Drops the cached user, e.g. after changing it with ``update()``."""
+    _get_cache().delete(_user_key(user_id))
+
+
+def user_saved(sender, instance, **kwargs) -> None:
+    # Replaced rather than dropped, so a deactivation is seen even by
+    # requests that would not read the user from the database
+    transaction.on_commit(lambda: cache_user(instance))
+
+
+def user_deleted(sender, instance, **kwargs) -> None:
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    transaction.on_commit(
+        lambda: _get_cache().set(
+            _user_key(user_id), DELETED, timeout=settings.API_USER_CACHE_TIMEOUT
+        )
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving users through the ``API_USER_CACHE_ALIAS``
+    cache, so requests do not query the user table on every call.
+
+    Users are cached by id for ``API_USER_CACHE_TIMEOUT`` seconds, the access
+    token lifetime by default, and re-cached whenever they are saved or
+    deleted. Changes made with ``update()`` send no signal and must call
+    ``forget_user``. The cache must be shared by all the server processes
+    and never cull entries, or a deactivation could go unseen.
+
+    Once the user is cached, views with ``stateless_auth`` get an unsaved
+    user holding only the cached fields instead of a database read, as
+    simplejwt's ``JWTStatelessUserAuthentication`` does. Other views, and
+    any request on a cache miss, read the user; a miss also caches it.
+    """
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        entry = _get_cache().get(_user_key(user_id))
+        # Cached before revocable tokens were turned on, without the password
+        if entry is None or (
+            api_settings.CHECK_REVOKE_TOKEN and "password" not in entry
+        ):
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+        if entry == DELETED:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not entry["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != entry["password"]
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        if self.allows_stateless_user():
+            return self.user_model(
+                **{
+                    api_settings.USER_ID_FIELD: user_id,
+                    self.user_model.USERNAME_FIELD: entry["username"],
+                    "is_active": entry["is_active"],
+                }
+            )
+        return super().get_user(validated_token)
+
+    def allows_stateless_user(self) -> bool:
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+        view = request.parser_context.get("view")
+        return getattr(view, "stateless_auth", False)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documents CachedJWTAuthentication as the bearer scheme it is."""
+
+    target_class = CachedJWTAuthentication
@@ -0,0 +1,205 @@
+"""
+Background jobs queued in the database, so slow work can leave the request
+path without a message broker.
+
+Functions decorated with ``@job`` are queued with ``enqueue`` and run by
+``manage.py runworker``. A job is written in the caller's transaction: like
+an ``on_commit`` callback it only becomes due once that transaction
+commits, and is dropped if it rolls back, but unlike one it is not lost if
+the process dies right after the commit.
+"""
+
+import logging
+import multiprocessing
+import threading
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import timedelta
+from typing import Callable
+
+import django
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Delay before the first retry, doubled for each further one up to MAX_BACKOFF
+BACKOFF = timedelta(seconds=10)
+MAX_BACKOFF = timedelta(hours=1)
+
+
+def job(func: Callable = None, *, max_attempts: int = 5) -> Callable:
+    """
+    Makes a module level function queueable with ``enqueue``. It is called
+    with the keyword arguments given to ``enqueue``, which must be JSON
+    serializable, and retried up to ``max_attempts`` times in all.
+
+    A job may run more than once, e.g. when its worker dies, so it must be
+    idempotent. Its database writes are committed with the deletion of the
+    job, or not at all.
+    """
+
+    def decorate(func):
+        func.job_name = f"{func.__module__}.{func.__qualname__}"
+        func.max_attempts = max_attempts
+        return func
+
+    return decorate(func) if func is not None else decorate
+
+
+def enqueue(func: Callable, *, delay: timedelta = None, **kwargs) -> Job:
+    """Queues a call of the ``@job`` ``func`` with ``kwargs``, due once the
+    current transaction commits and ``delay`` has passed."""
+    return Job.objects.create(
+        name=func.job_name,
+        kwargs=kwargs,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=func.max_attempts,
+    )
+
+
+def claim_jobs(limit: int, now=None) -> list[Job]:
+    """
+    Claims up to ``limit`` due jobs for ``API_JOB_TIMEOUT`` seconds and
+    returns them, oldest first.
+
+    A single ``UPDATE ... RETURNING`` claims them, over the due jobs that
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` finds, so concurrent workers never
+    wait for each other nor claim the same job. Claiming counts as an
+    attempt, so a job whose worker keeps dying still runs out of attempts.
+    """
+    now = now or timezone.now()
+    qn = connection.ops.quote_name
+    meta = Job._meta
+    table, pk = qn(meta.db_table), qn(meta.pk.column)
+    run_at, locked_until, attempts, failed_at = (
+        qn(meta.get_field(name).column)
+        for name in ("run_at", "locked_until", "attempts", "failed_at")
+    )
+    columns = ", ".join(qn(field.column) for field in meta.concrete_fields)
+    # SQLite has no row locks: it runs one write at a time anyway
+    skip_locked = (
+        " FOR UPDATE SKIP LOCKED"
+        if connection.features.has_select_for_update_skip_locked
+        else ""
+    )
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.raw(
+                f"UPDATE {table} SET {locked_until} = %s, {attempts} = {attempts} + 1 "
+                f"WHERE {pk} IN (SELECT {pk} FROM {table} "
+                f"WHERE {failed_at} IS NULL AND {run_at} <= %s "
+                f"AND ({locked_until} IS NULL OR {locked_until} < %s) "
+                f"ORDER BY {run_at} LIMIT %s{skip_locked}) RETURNING {columns}",
+                [now + timedelta(seconds=settings.API_JOB_TIMEOUT), now, now, limit],
+            )
+        )
+    return sorted(jobs, key=lambda job: (job.run_at, job.pk))
+
+
+def run_job(job: Job) -> bool:
+    """
+    Runs a claimed job and returns whether it succeeded. A successful job
+    is deleted in the transaction of its writes; a failed one is retried
+    with exponential backoff, or marked as failed after its last attempt.
+    """
+    try:
+        func = import_string(job.name)
+        if getattr(func, "job_name", None) != job.name:
+            raise TypeError(f"{job.name} is not a @job function.")
+        with transaction.atomic():
+            func(**job.kwargs)
+            Job.objects.filter(pk=job.pk).delete()
+        return True
+    except Exception:
+        logger.exception("Job %s failed on attempt %s", job, job.attempts)
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            changes = {"failed_at": now}
+        else:
+            backoff = min(BACKOFF * 2 ** (job.attempts - 1), MAX_BACKOFF)
+            changes = {"run_at": now + backoff, "locked_until": None}
+        Job.objects.filter(pk=job.pk).update(
+            last_error=traceback.format_exc(), **changes
+        )
+        return False
+
+
+class Worker:
+    """
+    Claims due jobs and runs them on ``concurrency`` threads, or processes
+    with ``pool="process"``, polling every ``poll_interval`` seconds while
+    there are none.
+
+    Threads suit jobs that mostly wait on I/O or release the GIL, processes
+    CPU bound Python code. ``stop()`` lets the running jobs finish.
+    """
+
+    def __init__(self, concurrency: int, pool: str = "thread", poll_interval=1.0):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+
+    def get_executor(self):
+        if self.pool == "process":
+            return ProcessPoolExecutor(
+                self.concurrency,
+                # Forking would share the parent's database connection
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+
+    @staticmethod
+    def execute(job: Job) -> bool:
+        try:
+            return run_job(job)
+        finally:
+            # Like at the end of a request, so a pool thread does not keep a
+            # broken or expired connection
+            close_old_connections()
+
+    def claim(self, limit: int) -> list[Job]:
+        try:
+            return claim_jobs(limit)
+        except DatabaseError:
+            # E.g. the database restarted: reconnect on the next poll
+            logger.exception("Could not claim jobs")
+            connection.close()
+            return []
+
+    def run(self, once: bool = False) -> None:
+        """Runs jobs until stopped, or with ``once`` until none are due."""
+        running = set()
+        with self.get_executor() as executor:
+            while not self.stopped.is_set():
+                free = self.concurrency - len(running)
+                jobs = self.claim(free) if free else []
+                running.update(executor.submit(self.execute, job) for job in jobs)
+                if not running:
+                    if once:
+                        break
+                    self.stopped.wait(self.poll_interval)
+                elif not jobs or len(running) == self.concurrency:
+                    # Waits for a free slot, or for new jobs to be due
+                    done, running = wait(
+                        running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        if future.exception() is not None:
+                            logger.error(
+                                "Job runner failed", exc_info=future.exception()
+                            )
+
+    def stop(self) -> None:
+        self.stopped.set()
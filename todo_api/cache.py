@@ -0,0 +1,160 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _version_key(user_id: int) -> str:
+    return f"todo:version:{user_id}"
+
+
+def get_data_version(user_id: int) -> str:
+    """Returns the user's data version, creating one if it was evicted.
+
+    Versions are random rather than counters so a version recreated after
+    eviction can never match responses cached under an older one.
+    """
+    cache = _get_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(_version_key(user_id), version, timeout=None):
+            version = cache.get(_version_key(user_id), version)
+    return version
+
+
+async def aget_data_version(user_id: int) -> str:
+    cache = _get_cache()
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(_version_key(user_id), version, timeout=None):
+            version = await cache.aget(_version_key(user_id), version)
+    return version
+
+
+def bump_data_version(user_id: int) -> None:
+    """Invalidates every cached response of the user."""
+    _get_cache().set(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+async def abump_data_version(user_id: int) -> None:
+    await _get_cache().aset(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Bumps the user's data version once the current transaction commits.
+
+    Bumping before the commit would let a concurrent read cache the old rows
+    under the new version.
+    """
+    transaction.on_commit(lambda: bump_data_version(user_id))
+
+
+async def ainvalidate_user(user_id: int) -> None:
+    """Bumps the user's data version right away.
+
+    Async code always runs in autocommit mode, so by the time this is
+    awaited the write is already committed.
+    """
+    await abump_data_version(user_id)
+
+
+def response_cache_key(request, version: str) -> str:
+    """Key on user, data version, host, path and normalized query params."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(
+        f"{request.get_host()}{request.path}?{query}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"todo:response:{request.user.pk}:{version}:{digest}"
+
+
+class CachedResponseMixin:
+    """
+    Serves repeated GETs from the cache and invalidates it on writes.
+
+    Cached entries are keyed on the user's data version, so any write through
+    ``create``/``update``/``destroy`` (or an explicit ``invalidate_user``
+    call) makes all of that user's entries unreachable; they then age out
+    through the cache's TTL and MAX_ENTRIES culling.
+
+    The ETag/Last-Modified validators are cached with the data, so
+    conditional GETs answered from the cache still get their 304.
+    """
+
+    CACHED_HEADERS = ("ETag", "Last-Modified")
+
+    def get(self, request, *args, **kwargs):
+        cache = _get_cache()
+        key = response_cache_key(request, get_data_version(request.user.pk))
+        entry = cache.get(key)
+        if entry is not None:
+            return self.get_cached_response(request, entry)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                self.get_cache_entry(response),
+                timeout=settings.API_CACHE_TIMEOUT,
+            )
+        return response
+
+    async def aget_cached(self, request, handler, *args, **kwargs):
+        """``get`` for async views, awaiting ``handler`` on a cache miss."""
+        cache = _get_cache()
+        key = response_cache_key(request, await aget_data_version(request.user.pk))
+        entry = await cache.aget(key)
+        if entry is not None:
+            return self.get_cached_response(request, entry)
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(
+                key,
+                self.get_cache_entry(response),
+                timeout=settings.API_CACHE_TIMEOUT,
+            )
+        return response
+
+    def get_cache_entry(self, response):
+        headers = {
+            header: response[header]
+            for header in self.CACHED_HEADERS
+            if header in response
+        }
+        return response.data, headers
+
+    def get_cached_response(self, request, entry):
+        data, headers = entry
+        return get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+            response=Response(data, headers=headers),
+        )
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        invalidate_user(request.user.pk)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        invalidate_user(request.user.pk)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        response = super().destroy(request, *args, **kwargs)
+        invalidate_user(request.user.pk)
+        return response
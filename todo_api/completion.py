@@ -0,0 +1,64 @@
+from collections import Counter
+from typing import Optional
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .cache import invalidate_user
+from .models import Task
+from .stats import COMPLETED, update_counters
+
+
+def complete_task(user, pk: int) -> Optional[Task]:
+    """
+    Completes the user's open task ``pk`` and returns it, or returns None
+    when the user has no such open task.
+
+    The task is updated and read back by a single ``UPDATE ... RETURNING``
+    instead of being locked, loaded and saved column by column. Only an open
+    task matches it, so concurrent calls count the task as completed once.
+    """
+    qn = connection.ops.quote_name
+    meta = Task._meta
+    fields = [field for field in meta.concrete_fields if not field.generated]
+    columns = ", ".join(qn(field.column) for field in fields)
+    completed, updated_at = (
+        qn(meta.get_field(name).column) for name in ("completed", "updated_at")
+    )
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.raw(
+                f"UPDATE {qn(meta.db_table)} SET {completed} = %s, {updated_at} = %s "
+                f"WHERE {qn(meta.pk.column)} = %s "
+                f"AND {qn(meta.get_field('user').column)} = %s "
+                f"AND {completed} = %s RETURNING {columns}",
+                [True, timezone.now(), pk, user.pk, False],
+            )
+        )
+        if not tasks:
+            return None
+        update_counters({user.pk: Counter({COMPLETED: 1})})
+        invalidate_user(user.pk)
+    return tasks[0]
+
+
+def set_completed(user, tasks: QuerySet, completed: bool = True) -> int:
+    """
+    Completes, or reopens, the user's tasks among ``tasks`` with one
+    ``UPDATE`` and returns how many of them changed.
+
+    Tasks already in that state are left untouched, so the count, the
+    counters and the data version only follow actual changes.
+    """
+    with transaction.atomic():
+        # update() skips auto_now, so stamp updated_at here
+        changed = tasks.filter(user=user, completed=not completed).update(
+            completed=completed, updated_at=timezone.now()
+        )
+        if changed:
+            update_counters(
+                {user.pk: Counter({COMPLETED: changed if completed else -changed})}
+            )
+            invalidate_user(user.pk)
+    return changed
@@ -0,0 +1,157 @@
+import hashlib
+from calendar import timegm
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+
+FINGERPRINT = {"last": Max("updated_at"), "count": Count("pk")}
+
+
+def make_etag(request, parts) -> str:
+    """Strong ETag over the resource path, normalized query and ``parts``."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(
+        repr((request.path, query, list(parts))).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def _timestamp(value):
+    return None if value is None else timegm(value.utctimetuple())
+
+
+class ConditionalListMixin:
+    """
+    Adds an ETag to list responses and answers If-None-Match with a 304.
+
+    The ETag is derived from ``MAX(updated_at)`` and ``COUNT(*)`` over each
+    queryset of ``get_fingerprint_querysets``, so a matching request is
+    answered without loading or serializing a single row. Lists carry no
+    Last-Modified: deleting a row lowers the count but not the maximum.
+    """
+
+    def get_fingerprint_querysets(self):
+        return [self.filter_queryset(self.get_queryset())]
+
+    def get_list_etag(self, request):
+        parts = []
+        for queryset in self.get_fingerprint_querysets():
+            stats = queryset.order_by().aggregate(**FINGERPRINT)
+            parts += [stats["last"], stats["count"]]
+        return make_etag(request, parts)
+
+    async def aget_list_etag(self, request):
+        parts = []
+        querysets = await sync_to_async(self.get_fingerprint_querysets)()
+        for queryset in querysets:
+            stats = await queryset.order_by().aaggregate(**FINGERPRINT)
+            parts += [stats["last"], stats["count"]]
+        return make_etag(request, parts)
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+
+class ConditionalObjectMixin:
+    """
+    Adds ETag/Last-Modified to detail responses and checks preconditions.
+
+    GETs honour If-None-Match/If-Modified-Since with a 304; PUT, PATCH and
+    DELETE honour If-Match/If-Unmodified-Since with a 412 so clients can
+    update optimistically. Validators come from ``get_versions`` on the
+    already-loaded object, so checking them costs no extra query.
+
+    A conditional write loads the object with ``SELECT ... FOR UPDATE`` and
+    holds the lock until it is written, so of two requests sending the same
+    ETag, the second sees the first one's write and gets its 412.
+    Last-Modified is only sent once it is a second old: two writes within
+    the same second have the same HTTP date, which could not tell them apart.
+    """
+
+    lock_object = False
+
+    def filter_queryset(self, queryset):
+        # Not in get_queryset, which the views override without calling super()
+        queryset = super().filter_queryset(queryset)
+        if self.lock_object:
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_object(self):
+        # Loaded once per request: the precondition check and the update or
+        # destroy that follows it share the same instance.
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def get_versions(self, instance):
+        """Returns ``(pk, updated_at)`` pairs the representation depends on."""
+        return [(instance.pk, instance.updated_at)]
+
+    def get_validators(self, instance):
+        versions = self.get_versions(instance)
+        last_modified = max(updated_at for _, updated_at in versions)
+        return make_etag(self.request, versions), last_modified
+
+    def check_preconditions(self, request):
+        """Returns a 304/412 response if a conditional header fails."""
+        etag, last_modified = self.get_validators(self.get_object())
+        timestamp = _timestamp(last_modified)
+        if timestamp >= _timestamp(timezone.now()):
+            # No date sent for it yet, and another write may follow within
+            # the second: no date can match, If-Unmodified-Since fails
+            timestamp += 1
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def set_validators(self, response):
+        etag, last_modified = self.get_validators(self.get_object())
+        response["ETag"] = etag
+        timestamp = _timestamp(last_modified)
+        if timestamp < _timestamp(timezone.now()):
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.check_preconditions(request)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return self.set_validators(response)
+
+    def update(self, request, *args, **kwargs):
+        if not _has_write_preconditions(request):
+            response = super().update(request, *args, **kwargs)
+        else:
+            self.lock_object = True
+            with transaction.atomic():
+                response = self.check_preconditions(request)
+                if response is not None:
+                    return response
+                response = super().update(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validators(response)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        if not _has_write_preconditions(request):
+            return super().destroy(request, *args, **kwargs)
+        self.lock_object = True
+        with transaction.atomic():
+            response = self.check_preconditions(request)
+            if response is not None:
+                return response
+            return super().destroy(request, *args, **kwargs)
+
+
+def _has_write_preconditions(request) -> bool:
+    return "HTTP_IF_MATCH" in request.META or "HTTP_IF_UNMODIFIED_SINCE" in request.META
@@ -0,0 +1,255 @@
+"""
+Downscaled WebP variants of task images.
+
+Variants are rendered with Pillow outside of the request that stores or
+asks for an image: by a background job once a task's image is saved (see
+``todo_api.jobs``), or in a process pool when one is asked for before that.
+They are cached on disk under ``MEDIA_ROOT/variants/``, and the cache is
+kept under ``API_IMAGE_VARIANT_CACHE_SIZE`` bytes by deleting the least
+recently served variants, which are rendered again when next asked for.
+
+The pool's workers only run ``render_variants``, so this module must not
+import models: spawned workers import it without setting Django up.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """An image scaled down to fit in ``size`` x ``size`` pixels."""
+
+    size: int
+    quality: int = 80
+    format: str = "WEBP"
+    content_type: str = "image/webp"
+    extension: str = ".webp"
+
+
+VARIANTS = {
+    "thumbnail": Variant(256),
+    "preview": Variant(1280),
+}
+
+# Share of the cache size written between two evictions
+EVICTION_INTERVAL = 0.1
+# Share of the cache size an eviction frees down to
+EVICTION_TARGET = 0.9
+
+
+def variant_name(image_name: str, variant: str) -> str:
+    """Returns the storage name of a variant of the image ``image_name``."""
+    key = hashlib.sha1(image_name.encode()).hexdigest()
+    return f"variants/{key[:2]}/{key}/{variant}{VARIANTS[variant].extension}"
+
+
+def variant_urls(image_name: Optional[str], request=None) -> Optional[dict]:
+    """Returns the URLs of the variants of ``image_name`` by variant name,
+    absolute when a request is given, or None when there is no image."""
+    if not image_name:
+        return None
+    urls = {
+        variant: reverse(
+            "task-image-variant", kwargs={"variant": variant, "name": image_name}
+        )
+        for variant in VARIANTS
+    }
+    if request is not None:
+        return {
+            variant: request.build_absolute_uri(url) for variant, url in urls.items()
+        }
+    return urls
+
+
+def render_variants(source: str, targets: dict[str, str]) -> int:
+    """
+    Renders the image file ``source`` into the variants of ``targets``, a
+    dict of file paths by variant name, and returns the bytes written.
+
+    The image is decoded once. JPEGs are decoded at the smallest scale that
+    still covers the largest variant, and each variant is scaled down from
+    the previous, larger one.
+    """
+    variants = sorted(targets.items(), key=lambda item: -VARIANTS[item[0]].size)
+    largest = VARIANTS[variants[0][0]].size
+    written = 0
+    with Image.open(source) as original:
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    for name, target in variants:
+        variant = VARIANTS[name]
+        image.thumbnail((variant.size, variant.size), Image.Resampling.LANCZOS)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Written aside and renamed, so a variant is never served half written
+        partial = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        image.save(partial, variant.format, quality=variant.quality)
+        os.replace(partial, target)
+        written += os.path.getsize(target)
+    return written
+
+
+def missing_variants(image_name: str) -> dict[str, str]:
+    """Returns the paths of the variants of ``image_name`` not on disk yet."""
+    paths = {
+        variant: default_storage.path(variant_name(image_name, variant))
+        for variant in VARIANTS
+    }
+    return {
+        variant: path for variant, path in paths.items() if not os.path.exists(path)
+    }
+
+
+class VariantRenderer:
+    """
+    Process-wide pool rendering image variants, created on first use with
+    ``API_IMAGE_VARIANT_WORKERS`` processes. With 0 workers, variants are
+    rendered in the calling thread instead, e.g. for tests.
+
+    An image is only queued once at a time, and the cache is trimmed each
+    time ``EVICTION_INTERVAL`` of its size has been written by this process.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.pending = set()
+        self.written = 0
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    settings.API_IMAGE_VARIANT_WORKERS,
+                    # Forking a process running request threads and holding
+                    # database connections is unsafe
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.executor
+
+    def schedule(self, image_name: str) -> Optional[Future]:
+        """Queues the rendering of the missing variants of ``image_name``.
+
+        Returns the rendering's future, or None when there was nothing to
+        queue or the variants were rendered in the calling thread.
+        """
+        if not settings.API_IMAGE_VARIANT_WORKERS:
+            self.render(image_name)
+            return None
+        targets = missing_variants(image_name)
+        if not targets:
+            return None
+        source = default_storage.path(image_name)
+        with self.lock:
+            if image_name in self.pending:
+                return None
+            self.pending.add(image_name)
+        executor = self.get_executor()
+        try:
+            future = executor.submit(render_variants, source, targets)
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for its memory use: the next image
+            # starts a new pool
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            self.pending.discard(image_name)
+            logger.exception("Could not queue the variants of %s", image_name)
+            return None
+        future.add_done_callback(lambda future: self.done(image_name, future))
+        return future
+
+    def render(self, image_name: str) -> int:
+        """Renders the missing variants of ``image_name`` in the calling
+        thread and returns the bytes written."""
+        targets = missing_variants(image_name)
+        if not targets:
+            return 0
+        written = render_variants(default_storage.path(image_name), targets)
+        self.record(written)
+        return written
+
+    def done(self, image_name: str, future: Future) -> None:
+        self.pending.discard(image_name)
+        try:
+            self.record(future.result())
+        except Exception:
+            logger.exception("Could not render the variants of %s", image_name)
+
+    def record(self, written: int) -> None:
+        max_size = settings.API_IMAGE_VARIANT_CACHE_SIZE
+        with self.lock:
+            self.written += written
+            if self.written < max_size * EVICTION_INTERVAL:
+                return
+            self.written = 0
+        evict_variants(max_size)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+renderer = VariantRenderer()
+
+
+def schedule_variants(image_name: str) -> Optional[Future]:
+    return renderer.schedule(image_name)
+
+
+def touch_variant(path: str) -> None:
+    """Marks a variant as just served, which eviction keeps the longest."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_variants(max_size: int) -> int:
+    """
+    Deletes the least recently served variants while the cache holds more
+    than ``max_size`` bytes, down to ``EVICTION_TARGET`` of it, and returns
+    the bytes freed.
+    """
+    files = []
+    for root, _dirs, names in os.walk(default_storage.path("variants")):
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+    total = sum(size for _mtime, size, _path in files)
+    if total <= max_size:
+        return 0
+    freed = 0
+    for _mtime, size, path in sorted(files):
+        if total - freed <= max_size * EVICTION_TARGET:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        freed += size
+    return freed
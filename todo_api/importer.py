@@ -0,0 +1,179 @@
+from collections import Counter
+from typing import Any, Callable, Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_user
+from .models import Tag, Task
+from .serializers import TaskImportSerializer
+from .stats import task_counts, update_counters
+
+
+class TaskImporter:
+    """
+    Imports rows of task data for one user in batches.
+
+    ``run`` consumes ``(line, row, error)`` tuples, as yielded by the parsers
+    in ``todo_api.parsers``, and keeps at most one batch in memory. Rows are
+    validated by a single ``TaskImportSerializer`` instance, which skips
+    building a serializer (and its fields) per row. Tags are matched by name
+    with one query per batch, creating the missing ones, and each batch is
+    written in its own transaction by ``write_tasks``.
+
+    Invalid rows are skipped and reported by line; the first ``max_errors``
+    are kept in the report.
+    """
+
+    batch_size = 5000
+    max_errors = 100
+
+    def __init__(
+        self,
+        user,
+        batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[dict[str, Any]], None]] = None,
+    ):
+        self.user = user
+        self.batch_size = batch_size or self.batch_size
+        self.on_batch = on_batch
+        self.serializer = TaskImportSerializer()
+        self.tag_ids: dict[str, int] = {}
+        self.report = {
+            "processed": 0,
+            "created": 0,
+            "failed": 0,
+            "errors": [],
+            "errors_truncated": False,
+        }
+
+    def run(self, rows: Iterable[tuple[int, Optional[dict], Any]]) -> dict[str, Any]:
+        batch = []
+        try:
+            for line, row, error in rows:
+                self.report["processed"] += 1
+                if row is not None:
+                    try:
+                        batch.append(self.serializer.run_validation(row))
+                    except ValidationError as exc:
+                        error = exc.detail
+                if error is not None:
+                    self.add_error(line, error)
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = []
+            if batch:
+                self.write_batch(batch)
+        finally:
+            if self.report["created"]:
+                invalidate_user(self.user.pk)
+        return self.report
+
+    def add_error(self, line: int, error) -> None:
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"line": line, "errors": error})
+        else:
+            self.report["errors_truncated"] = True
+
+    def write_batch(self, batch: list[dict[str, Any]]) -> None:
+        with transaction.atomic():
+            tag_names = [data.pop("tags", []) for data in batch]
+            self.resolve_tags({name for names in tag_names for name in names})
+            tasks = [Task(user=self.user, **data) for data in batch]
+            tags = [{self.tag_ids[name] for name in names} for names in tag_names]
+            write_tasks(tasks, tags)
+            counts = Counter()
+            for task, tag_ids in zip(tasks, tags):
+                counts.update(task_counts(task, tag_ids))
+            update_counters({self.user.pk: counts})
+        self.report["created"] += len(tasks)
+        if self.on_batch is not None:
+            self.on_batch(self.report)
+
+    def resolve_tags(self, names: set[str]) -> None:
+        """Maps ``names`` to the user's tags, creating the missing ones.
+
+        When the user has several tags with the same name, the oldest wins.
+        """
+        missing = names - self.tag_ids.keys()
+        if not missing:
+            return
+        existing = Tag.objects.filter(user=self.user, name__in=missing).order_by("-pk")
+        self.tag_ids.update(existing.values_list("name", "pk"))
+        created = Tag.objects.bulk_create(
+            Tag(user=self.user, name=name)
+            for name in sorted(missing - self.tag_ids.keys())
+        )
+        self.tag_ids.update((tag.name, tag.pk) for tag in created)
+
+
+def use_copy() -> bool:
+    # psycopg2's copy API takes a file, not rows
+    return connection.vendor == "postgresql" and is_psycopg3
+
+
+def write_tasks(tasks: list[Task], tags: list[set[int]]) -> None:
+    """Inserts ``tasks`` and links each to the tag ids at the same index of
+    ``tags``: with COPY when available, otherwise with ``bulk_create``."""
+    if use_copy():
+        copy_tasks(tasks, tags)
+        return
+    Task.objects.bulk_create(tasks)
+    Task.tags.through.objects.bulk_create(
+        Task.tags.through(task_id=task.pk, tag_id=tag_id)
+        for task, tag_ids in zip(tasks, tags)
+        for tag_id in tag_ids
+    )
+
+
+def copy_tasks(tasks: list[Task], tags: list[set[int]], pre_save: bool = True) -> None:
+    """Writes ``tasks`` and their tag rows with COPY FROM STDIN.
+
+    Ids are reserved from the table's sequence up front, as COPY cannot
+    return them, and field values are prepared the way an INSERT would,
+    unless ``pre_save`` is false: the tasks' values are then written as
+    they are, e.g. ``auto_now_add`` dates set by the caller.
+    """
+    table = Task._meta.db_table
+    pk_column = Task._meta.pk.column
+    fields = [field for field in Task._meta.concrete_fields if not field.generated]
+    with connection.cursor() as cursor:
+        # The wrapper itself, rather than the thread-local proxy, as it is
+        # passed to every field of every row
+        db = cursor.db
+        quote = db.ops.quote_name
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [table, pk_column, len(tasks)],
+        )
+        for task, (pk,) in zip(tasks, cursor.fetchall()):
+            task.pk = pk
+        columns = ", ".join(quote(field.column) for field in fields)
+        with cursor.copy(f"COPY {quote(table)} ({columns}) FROM STDIN") as copy:
+            for task in tasks:
+                copy.write_row(
+                    [
+                        field.get_db_prep_save(
+                            (
+                                field.pre_save(task, add=True)
+                                if pre_save
+                                else getattr(task, field.attname)
+                            ),
+                            db,
+                        )
+                        for field in fields
+                    ]
+                )
+        through = Task.tags.through._meta
+        columns = ", ".join(
+            quote(through.get_field(name).column) for name in ("task", "tag")
+        )
+        with cursor.copy(
+            f"COPY {quote(through.db_table)} ({columns}) FROM STDIN"
+        ) as copy:
+            for task, tag_ids in zip(tasks, tags):
+                for tag_id in tag_ids:
+                    copy.write_row((task.pk, tag_id))
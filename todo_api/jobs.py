@@ -0,0 +1,20 @@
+from django.core.files.storage import default_storage
+
+from .background import enqueue, job
+from .images import missing_variants, renderer
+
+
+@job
+def render_image_variants(image_name: str) -> None:
+    """Renders the missing variants of a task image, see ``todo_api.images``."""
+    # The image may have been replaced and deleted since
+    if default_storage.exists(image_name):
+        renderer.render(image_name)
+
+
+def task_saved(sender, instance, update_fields=None, **kwargs) -> None:
+    # Rendered ahead of the first request for them, once the image is stored
+    if not instance.image or (update_fields and "image" not in update_fields):
+        return
+    if missing_variants(instance.image.name):
+        enqueue(render_image_variants, image_name=instance.image.name)
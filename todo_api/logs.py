@@ -0,0 +1,264 @@
+"""
+A logging pipeline that keeps file writes out of the request path.
+
+``NonBlockingQueueHandler`` only puts records on a bounded in-memory queue,
+and a listener thread per process passes them on in batches to the real
+handlers. When the queue fills up, e.g. because the disk stalls, records
+below WARNING are first sampled, then all records are dropped and counted,
+so logging never blocks a request. ``ProcessSafeRotatingFileHandler``
+writes JSON lines from ``JSONFormatter``; the server's processes share the
+file and rotate it under a file lock.
+"""
+
+import copy
+import fcntl
+import logging
+import os
+import queue
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+# Attributes of every LogRecord; any other attribute came from ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as a JSON object on one line, with the ``extra``
+    values passed to the logging call as further keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and name not in data:
+                data[name] = value
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class ProcessSafeRotatingFileHandler(RotatingFileHandler):
+    """
+    A ``RotatingFileHandler`` that several processes can write to.
+
+    Each write takes an exclusive ``flock`` on ``<filename>.lock``, reopens
+    the file if another process rotated it, and rotates it itself once it
+    would grow past ``maxBytes``. ``handle_batch()`` writes all the records
+    the listener has dequeued at once, holding the lock once for them.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding="utf-8"):
+        super().__init__(
+            filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding
+        )
+        self.lock_file = None
+        self.lock_pid = None
+
+    @contextmanager
+    def file_lock(self):
+        # A forked child shares its parent's lock until it opens its own
+        if self.lock_pid != os.getpid():
+            self.lock_file = open(f"{self.baseFilename}.lock", "a")
+            self.lock_pid = os.getpid()
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    def reopen_if_rotated(self) -> None:
+        if self.stream is not None:
+            try:
+                on_disk = os.stat(self.baseFilename)
+            except FileNotFoundError:
+                on_disk = None
+            opened = os.fstat(self.stream.fileno())
+            if on_disk and (on_disk.st_dev, on_disk.st_ino) == (
+                opened.st_dev,
+                opened.st_ino,
+            ):
+                return
+            self.stream.close()
+        self.stream = self._open()
+
+    def write_lines(self, lines: list[str]) -> None:
+        with self.file_lock():
+            self.reopen_if_rotated()
+            size = os.fstat(self.stream.fileno()).st_size
+            chunk = []
+            for line in lines:
+                if self.maxBytes and size and size + len(line) > self.maxBytes:
+                    self.stream.write("".join(chunk))
+                    self.doRollover()
+                    size, chunk = 0, []
+                chunk.append(line)
+                size += len(line)
+            # The file is opened for appending, so whole lines are added at
+            # its end whatever the other processes wrote
+            self.stream.write("".join(chunk))
+            self.stream.flush()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.write_lines([f"{self.format(record)}{self.terminator}"])
+        except Exception:
+            self.handleError(record)
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            if self.filter(record):
+                try:
+                    lines.append(f"{self.format(record)}{self.terminator}")
+                except Exception:
+                    self.handleError(record)
+        if not lines:
+            return
+        with self.lock:
+            try:
+                self.write_lines(lines)
+            except Exception:
+                self.handleError(records[0])
+
+    def close(self) -> None:
+        super().close()
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    A ``QueueListener`` that dequeues up to ``batch_size`` records at once,
+    and passes them to the ``handle_batch()`` of the handlers that have one,
+    to the other handlers one by one.
+    """
+
+    batch_size = 500
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            selected = [record for record in records if record.levelno >= handler.level]
+            if not selected:
+                continue
+            if hasattr(handler, "handle_batch"):
+                handler.handle_batch(selected)
+            else:
+                for record in selected:
+                    handler.handle(record)
+
+    def _monitor(self):
+        stopped = False
+        while not stopped:
+            records = [self.dequeue(True)]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            if self._sentinel in records:
+                records = records[: records.index(self._sentinel)]
+                stopped = True
+            self.handle_batch(records)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Puts records on a queue of ``queue_size`` records, passed on to the
+    handlers named in ``handlers`` by a ``BatchingQueueListener`` thread,
+    started on the first record of each process.
+
+    Once the queue is half full, only one in ``sample_rate`` records below
+    WARNING is kept; once it is full, records are dropped. How many were
+    dropped is logged once the queue is below half full again. ``Handler.handle()``
+    calls ``emit()`` under the handler's lock, which guards the counts.
+    """
+
+    def __init__(self, handlers, queue_size=10000, sample_rate=10):
+        super().__init__(queue.Queue(queue_size))
+        self.handler_names = handlers
+        self.sample_rate = sample_rate
+        self.listener = None
+        self.listener_pid = None
+        self.sampled = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        # A forked child has the parent's queue, but not its thread
+        self.queue = queue.Queue(self.queue.maxsize)
+        # Like logging.getHandlerByName(), new in Python 3.12
+        handlers = [logging._handlers[name] for name in self.handler_names]
+        self.listener = BatchingQueueListener(self.queue, *handlers)
+        self.listener.start()
+        self.listener_pid = os.getpid()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare(), leaves the formatting to the
+        # listener's handlers, and only drops what cannot cross threads.
+        # The other handlers of the logger still get the record as it was
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.listener_pid != os.getpid():
+            self.start()
+        if (
+            record.levelno < logging.WARNING
+            and self.queue.qsize() * 2 >= self.queue.maxsize
+        ):
+            self.sampled += 1
+            if self.sampled % self.sample_rate:
+                self.dropped += 1
+                return
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        if self.dropped and self.queue.qsize() * 2 < self.queue.maxsize:
+            self.report_dropped()
+
+    def report_dropped(self) -> None:
+        dropped, self.dropped = self.dropped, 0
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {dropped} log records to keep up with the load",
+                "dropped": dropped,
+            }
+        )
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += dropped
+
+    def close(self) -> None:
+        # Writes out the queued records before the handlers are closed
+        if self.listener is not None and self.listener_pid == os.getpid():
+            self.listener.stop()
+        self.listener = self.listener_pid = None
+        super().close()
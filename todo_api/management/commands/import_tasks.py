@@ -0,0 +1,67 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_api.importer import TaskImporter
+from todo_api.parsers import CSVParser, NDJSONParser
+
+PARSERS = {parser.format: parser for parser in (NDJSONParser, CSVParser)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports tasks for a user from an NDJSON or CSV file, in the format "
+        "written by the export endpoint. The file is read and written in "
+        "batches, so its size is not limited by memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path", help='File to import, or "-" for stdin.')
+        parser.add_argument(
+            "--format",
+            choices=PARSERS,
+            help="Input format; defaults to the file extension, or ndjson.",
+        )
+        parser.add_argument("--batch-size", type=int, default=TaskImporter.batch_size)
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        User = get_user_model()
+        try:
+            user = User.objects.get(**{User.USERNAME_FIELD: options["username"]})
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        importer = TaskImporter(
+            user, batch_size=options["batch_size"], on_batch=self.write_progress
+        )
+        if path == "-":
+            report = importer.run(PARSERS[fmt]().parse(sys.stdin.buffer))
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    report = importer.run(PARSERS[fmt]().parse(stream))
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc.strerror}.")
+
+        for error in report["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        if report["errors_truncated"]:
+            self.stderr.write("More errors were not shown.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} of {report['processed']} rows "
+                f"({report['failed']} failed)."
+            )
+        )
+
+    def write_progress(self, report):
+        if self.verbosity >= 1:
+            self.stdout.write(
+                f"{report['processed']} rows processed, {report['created']} "
+                f"created, {report['failed']} failed"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from todo_api.tokens import prune_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding refresh tokens and their blacklist "
+        "entries in batches, each in its own transaction, so the token "
+        "tables only hold tokens that can still be used. Meant to run "
+        "periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = 0
+        for count in prune_tokens(batch_size=options["batch_size"]):
+            deleted += count
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Deleted {deleted} tokens so far.")
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens."))
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_api.stats import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the task stats counters from the tasks and replaces the "
+        "stored ones, reporting any drift found. With --check, only reports "
+        "the drift and exits with an error if there is any."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report drift without changing the counters.",
+        )
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            metavar="USERNAME",
+            help="Only recount this user; may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = None
+        if options["usernames"]:
+            users = User.objects.filter(
+                **{f"{User.USERNAME_FIELD}__in": options["usernames"]}
+            )
+            missing = set(options["usernames"]) - set(
+                users.values_list(User.USERNAME_FIELD, flat=True)
+            )
+            if missing:
+                raise CommandError(f"Unknown users: {', '.join(sorted(missing))}.")
+
+        drift = rebuild_counters(users, dry_run=options["check"])
+
+        names = dict(
+            User.objects.filter(pk__in=drift).values_list("pk", User.USERNAME_FIELD)
+        )
+        for user_id, counts in sorted(drift.items()):
+            for name, value in sorted(counts.items()):
+                self.stdout.write(
+                    f"{names.get(user_id, user_id)}: {name} off by {value:+d}"
+                )
+        if options["check"] and drift:
+            raise CommandError(f"Found drift in the counters of {len(drift)} users.")
+        if options["check"]:
+            self.stdout.write(self.style.SUCCESS("No drift found."))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rebuilt counters; fixed drift for {len(drift)} users."
+                )
+            )
@@ -0,0 +1,42 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from todo_api.background import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the background jobs queued with todo_api.background.enqueue, "
+        "on a pool of threads or processes, until SIGINT or SIGTERM, which "
+        "let the running jobs finish. Several workers can run at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.API_JOB_CONCURRENCY
+        )
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no job is due."
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            options["concurrency"], options["pool"], options["poll_interval"]
+        )
+        handlers = {
+            signum: signal.signal(signum, lambda signum, frame: worker.stop())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        self.stdout.write(
+            f"Running jobs on {options['concurrency']} {options['pool']} workers."
+        )
+        try:
+            worker.run(once=options["once"])
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS("Stopped."))
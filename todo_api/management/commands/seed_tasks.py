@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_api.seeding import DISTRIBUTIONS, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates users named <prefix><number> with synthetic tags and tasks, "
+        "for benchmarks. The data is generated from --seed, so the same "
+        "options give the same data, and written in batches with COPY on "
+        "PostgreSQL, so millions of tasks take minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="seed-", help="Username prefix.")
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=100_000, help="In total.")
+        parser.add_argument(
+            "--distribution",
+            choices=DISTRIBUTIONS,
+            default="zipf",
+            help="How tasks are spread over the users; zipf gives most of "
+            "them to a few users.",
+        )
+        parser.add_argument("--exponent", type=float, default=1.1, help="Skew of zipf.")
+        parser.add_argument("--tags-per-user", type=int, default=20)
+        parser.add_argument("--max-tags-per-task", type=int, default=3)
+        parser.add_argument("--completed-ratio", type=float, default=0.3)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Age of the oldest tasks."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=Seeder.batch_size)
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if options["users"] < 1 or options["tasks"] < 0:
+            raise CommandError("--users must be positive and --tasks not negative.")
+        seeder = Seeder(
+            options["prefix"],
+            options["users"],
+            options["tasks"],
+            distribution=options["distribution"],
+            exponent=options["exponent"],
+            tags_per_user=options["tags_per_user"],
+            max_tags_per_task=options["max_tags_per_task"],
+            completed_ratio=options["completed_ratio"],
+            days=options["days"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            on_batch=self.write_progress,
+        )
+        User = get_user_model()
+        existing = User.objects.filter(
+            **{f"{User.USERNAME_FIELD}__in": seeder.usernames()}
+        )
+        if existing.exists():
+            raise CommandError(
+                f"Users prefixed {options['prefix']!r} already exist; "
+                "use another --prefix."
+            )
+
+        report = seeder.run()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report['users']} users, {report['tags']} tags, "
+                f"{report['tasks']} tasks and {report['links']} task tags."
+            )
+        )
+
+    def write_progress(self, report):
+        if self.verbosity >= 2:
+            self.stdout.write(f"{report['tasks']} tasks created")
@@ -0,0 +1,39 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import content_disposition_header
+
+
+def media_response(name: str, content_type: str = None) -> HttpResponse:
+    """
+    Returns a response sending the stored file ``name``, once the caller
+    has checked that the user may read it.
+
+    With ``API_MEDIA_ACCEL_REDIRECT`` set, the response only carries an
+    ``X-Accel-Redirect`` to that internal nginx location and nginx sends
+    the file, so no worker is held while the bytes go out. Otherwise the
+    file is sent by Django, through the server's ``sendfile`` when it has
+    one, and a missing file raises ``FileNotFoundError``.
+
+    Only images are shown inline: other files, which the browser could run
+    as pages of the API's origin, are downloaded.
+    """
+    content_type = (
+        content_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    )
+    inline = content_type.startswith("image/") and content_type != "image/svg+xml"
+    disposition = content_disposition_header(not inline, os.path.basename(name))
+    prefix = settings.API_MEDIA_ACCEL_REDIRECT
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + filepath_to_uri(name)
+    else:
+        response = FileResponse(
+            open(default_storage.path(name), "rb"), content_type=content_type
+        )
+    response["Content-Disposition"] = disposition
+    return response
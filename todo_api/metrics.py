@@ -0,0 +1,369 @@
+"""
+Per-view request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` records each request's latency, SQL queries, response
+size and status under the URL name of its view. Values are added to a
+memory-mapped file of the process in ``API_METRICS_DIR``, so recording
+costs a few microseconds, and ``metrics_view`` sums the files of all the
+server's worker processes into one exposition. The directory should be
+emptied when the server starts, as ``entrypoint.prod.sh`` does.
+"""
+
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    kind: str
+    help: str
+    labels: tuple[str, ...]
+    buckets: tuple[float, ...] = ()
+
+
+REQUEST_LABELS = ("view", "method")
+
+REQUESTS = Metric(
+    "todo_api_requests_total",
+    "counter",
+    "Requests by view, method and response status.",
+    (*REQUEST_LABELS, "status"),
+)
+REQUEST_DURATION = Metric(
+    "todo_api_request_duration_seconds",
+    "histogram",
+    "Request latency by view.",
+    REQUEST_LABELS,
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+QUERIES = Metric(
+    "todo_api_request_queries_total",
+    "counter",
+    "SQL queries run by requests, by view.",
+    REQUEST_LABELS,
+)
+QUERY_DURATION = Metric(
+    "todo_api_request_query_seconds_total",
+    "counter",
+    "Time requests spent in SQL queries, by view.",
+    REQUEST_LABELS,
+)
+RESPONSE_SIZE = Metric(
+    "todo_api_response_bytes_total",
+    "counter",
+    "Bytes of the response bodies built by Django, by view.",
+    REQUEST_LABELS,
+)
+METRICS = [REQUESTS, REQUEST_DURATION, QUERIES, QUERY_DURATION, RESPONSE_SIZE]
+
+_HEADER = struct.Struct("<I4x")
+_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+def _read_entries(data):
+    """Yields the ``(key, value, value position)`` entries of a store file."""
+    (used,) = _HEADER.unpack_from(data, 0)
+    position = _HEADER.size
+    while position < used:
+        (length,) = _LENGTH.unpack_from(data, position)
+        key = bytes(data[position + 4 : position + 4 + length])
+        position += _padded(4 + length)
+        yield key, _VALUE.unpack_from(data, position)[0], position
+        position += _VALUE.size
+
+
+def _padded(size: int) -> int:
+    # Values are kept 8-byte aligned
+    return size + -size % 8
+
+
+class MmapStore:
+    """
+    Float values by key in a memory-mapped file, written by one process and
+    read by any.
+
+    Each entry is the key's length, the key and its value. A new entry is
+    written before the used size in the header grows to cover it, so a
+    reader never sees a partial entry.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.file = open(path, "a+b")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(self.INITIAL_SIZE)
+        self._map()
+        if _HEADER.unpack_from(self.mmap, 0)[0] == 0:
+            _HEADER.pack_into(self.mmap, 0, _HEADER.size)
+        self.positions = {
+            key: position for key, _value, position in _read_entries(self.mmap)
+        }
+
+    def _map(self):
+        self.mmap = mmap.mmap(self.file.fileno(), os.fstat(self.file.fileno()).st_size)
+
+    def _add(self, key: bytes) -> int:
+        (used,) = _HEADER.unpack_from(self.mmap, 0)
+        entry_size = _padded(4 + len(key)) + _VALUE.size
+        if used + entry_size > len(self.mmap):
+            size = max(len(self.mmap) * 2, used + entry_size)
+            self.mmap.close()
+            self.file.truncate(size)
+            self._map()
+        _LENGTH.pack_into(self.mmap, used, len(key))
+        self.mmap[used + 4 : used + 4 + len(key)] = key
+        position = used + _padded(4 + len(key))
+        _VALUE.pack_into(self.mmap, position, 0.0)
+        _HEADER.pack_into(self.mmap, 0, used + entry_size)
+        self.positions[key] = position
+        return position
+
+    def inc(self, key: bytes, amount: float = 1.0) -> None:
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self._add(key)
+            (value,) = _VALUE.unpack_from(self.mmap, position)
+            _VALUE.pack_into(self.mmap, position, value + amount)
+
+    def close(self) -> None:
+        self.mmap.close()
+        self.file.close()
+
+
+_store: Optional[MmapStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MmapStore:
+    """Returns this process's store in ``API_METRICS_DIR``, opened on first
+    use, so that workers forked from a preloaded server get their own."""
+    global _store
+    store, directory = _store, settings.API_METRICS_DIR
+    if (
+        store is None
+        or store.pid != os.getpid()
+        or os.path.dirname(store.path) != directory
+    ):
+        with _store_lock:
+            os.makedirs(directory, exist_ok=True)
+            store = _store = MmapStore(os.path.join(directory, f"{os.getpid()}.db"))
+    return store
+
+
+# Keys are cached encoded, as labels repeat from request to request
+_keys: dict[tuple, bytes] = {}
+
+
+def _key(name: str, labels: tuple) -> bytes:
+    key = _keys.get((name, labels))
+    if key is None:
+        key = _keys[(name, labels)] = json.dumps([name, labels]).encode()
+    return key
+
+
+def inc(store: MmapStore, metric: Metric, labels: tuple, amount=1.0) -> None:
+    store.inc(_key(metric.name, labels), amount)
+
+
+def observe(store: MmapStore, metric: Metric, labels: tuple, value: float) -> None:
+    """Adds ``value`` to a histogram. Each bucket only counts the values
+    above the previous bucket; they are summed up when exposed."""
+    bucket = next((le for le in metric.buckets if value <= le), "+Inf")
+    store.inc(_key(f"{metric.name}_bucket", (*labels, bucket)))
+    store.inc(_key(f"{metric.name}_sum", labels), value)
+
+
+class RequestStats:
+    __slots__ = ("queries", "query_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's
+    stats. A context variable, unlike the connection, also follows the
+    queries that async views run in other threads."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.query_time += time.perf_counter() - start
+        stats.queries += 1
+
+
+def connection_created(sender, connection, **kwargs) -> None:
+    # connection.execute_wrapper() pops the last wrapper on exit, so this one
+    # goes first, where it is never popped
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def record_request(request, response, duration: float, stats: RequestStats) -> None:
+    match = request.resolver_match
+    labels = (match.view_name if match else "unmatched", request.method)
+    if response.streaming:
+        size = int(response.get("Content-Length") or 0)
+    else:
+        size = len(response.content)
+    store = get_store()
+    inc(store, REQUESTS, (*labels, str(response.status_code)))
+    observe(store, REQUEST_DURATION, labels, duration)
+    inc(store, RESPONSE_SIZE, labels, size)
+    if stats.queries:
+        inc(store, QUERIES, labels, stats.queries)
+        inc(store, QUERY_DURATION, labels, stats.query_time)
+
+
+class MetricsMiddleware:
+    """Records the metrics of each request, see ``todo_api.metrics``. It
+    should come first in ``MIDDLEWARE``, to time the other middleware too."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        record_request(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        record_request(request, response, time.perf_counter() - start, stats)
+        return response
+
+
+def collect(directory: str) -> dict[tuple, float]:
+    """Sums the values of the stores of all processes by ``(name, labels)``."""
+    values = defaultdict(float)
+    for name in os.listdir(directory):
+        if not name.endswith(".db"):
+            continue
+        with open(os.path.join(directory, name), "rb") as file:
+            data = file.read()
+        if len(data) < _HEADER.size:
+            continue
+        for key, value, _position in _read_entries(data):
+            metric, labels = json.loads(key)
+            values[(metric, tuple(labels))] += value
+    return values
+
+
+def _format_labels(names, values) -> str:
+    def escape(value):
+        return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_metrics(values: dict[tuple, float]) -> str:
+    """Renders collected values in the Prometheus text format."""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "counter":
+            samples = sorted(
+                (labels, value)
+                for (name, labels), value in values.items()
+                if name == metric.name
+            )
+            for labels, value in samples:
+                lines.append(
+                    f"{metric.name}{_format_labels(metric.labels, labels)} "
+                    f"{_format_value(value)}"
+                )
+            continue
+        buckets = defaultdict(dict)
+        for (name, labels), value in values.items():
+            if name == f"{metric.name}_bucket":
+                buckets[tuple(labels[:-1])][labels[-1]] = value
+        for labels in sorted(buckets):
+            total = 0.0
+            for le in (*metric.buckets, "+Inf"):
+                total += buckets[labels].get(le, 0.0)
+                lines.append(
+                    f"{metric.name}_bucket"
+                    f"{_format_labels((*metric.labels, 'le'), (*labels, le))} "
+                    f"{_format_value(total)}"
+                )
+            label_text = _format_labels(metric.labels, labels)
+            lines.append(
+                f"{metric.name}_sum{label_text} "
+                f"{_format_value(values.get((f'{metric.name}_sum', labels), 0.0))}"
+            )
+            lines.append(f"{metric.name}_count{label_text} {_format_value(total)}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Exposes the metrics of all the server's processes to Prometheus, which
+    must send ``API_METRICS_TOKEN`` as a bearer token. Without a token set,
+    the endpoint is off.
+    """
+    token = settings.API_METRICS_TOKEN
+    if not token:
+        raise Http404
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return HttpResponseForbidden()
+    directory = settings.API_METRICS_DIR
+    values = collect(directory) if os.path.isdir(directory) else {}
+    return HttpResponse(
+        render_metrics(values), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.6 on 2026-10-18 05:41
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+import todo_api.search
+
+
+def create_search_indexes(apps, schema_editor):
+    """GIN index the tsvector, plus a trigram index when pg_trgm exists."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS task_search_vector_idx "
+        "ON todo_api_task USING gin (search_vector)"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS task_title_trgm_idx "
+        "ON todo_api_task USING gin (title gin_trgm_ops)"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS task_title_trgm_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS task_search_vector_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo_api", "0003_task_access_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    todo_api.search.PortableSearchVector(
+                        "title", config="english", weight="A"
+                    ),
+                    "||",
+                    todo_api.search.PortableSearchVector(
+                        "description", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(
+                    null=True
+                ),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "completed", "created_at", "id"],
+                name="task_user_completed_idx",
+            ),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_tasks(apps, schema_editor):
+    """Seeds the counters from the existing tasks, as rebuild_task_stats does."""
+    Task = apps.get_model("todo_api", "Task")
+    TaskCounter = apps.get_model("todo_api", "TaskCounter")
+    counters = {}
+
+    def add(user_id, name, count):
+        key = (user_id, name)
+        counters[key] = counters.get(key, 0) + count
+
+    rows = (
+        Task.objects.order_by()
+        .values_list("user_id", "completed", "priority")
+        .annotate(count=Count("pk"))
+    )
+    for user_id, completed, priority, count in rows:
+        add(user_id, "total", count)
+        add(user_id, f"priority:{priority}", count)
+        if completed:
+            add(user_id, "completed", count)
+    rows = Task.tags.through.objects.values_list("task__user_id", "tag_id").annotate(
+        count=Count("pk")
+    )
+    for user_id, tag_id, count in rows:
+        add(user_id, f"tag:{tag_id}", count)
+    TaskCounter.objects.bulk_create(
+        [
+            TaskCounter(user_id=user_id, name=name, value=value)
+            for (user_id, name), value in counters.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo_api", "0005_task_tag_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=40)),
+                ("value", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "name"), name="task_counter_user_name_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -1,32 +1,50 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db.models import (
     CASCADE,
+    BigIntegerField,
     BooleanField,
     CharField,
     DateTimeField,
     FileField,
     ForeignKey,
+    GeneratedField,
     ImageField,
+    Index,
     IntegerField,
     JSONField,
     ManyToManyField,
     Model,
+    PositiveSmallIntegerField,
+    Q,
     TextField,
+    UniqueConstraint,
     URLField,
 )
 
+from .search import SEARCH_CONFIG, PortableSearchVector
+
 
 class Tag(Model):
-    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE)
+    # Indexed through the leading column of Meta.indexes
+    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False)
     name = CharField(max_length=30)
+    updated_at = DateTimeField(auto_now=True, help_text="Last modification date")
+
+    class Meta:
+        indexes = [
+            # Default TagListCreate ordering (name, id)
+            Index(fields=["user", "name", "id"], name="tag_user_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
 class Task(Model):
-    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE)
+    # Indexed through the leading column of Meta.indexes
+    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False)
 
     PRIORITY_CHOICES = ((1, "High"), (2, "Medium"), (3, "Low"))
 
@@ -44,6 +62,7 @@ class Task(Model):
     )
     completed = BooleanField(default=False)
     created_at = DateTimeField(auto_now_add=True, help_text="Task creation date")
+    updated_at = DateTimeField(auto_now=True, help_text="Last modification date")
     finish_at = DateTimeField(blank=True, null=True)
     parent_task = ForeignKey("self", on_delete=CASCADE, null=True, blank=True)
 
@@ -52,5 +71,127 @@ class Task(Model):
     image = ImageField(upload_to="tasks/images/", null=True, blank=True)
     extra_data = JSONField(null=True, blank=True)
 
+    # Stored tsvector used by TaskSearchFilter; GIN indexed on PostgreSQL
+    search_vector = GeneratedField(
+        expression=PortableSearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + PortableSearchVector("description", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(null=True),
+        db_persist=True,
+    )
+
+    class Meta:
+        # Every task query is scoped to one user and keyset paginated on
+        # (ordering field, id), so each index ends in id to serve the
+        # ORDER BY ... LIMIT without a sort step.
+        indexes = [
+            Index(fields=["user", "created_at", "id"], name="task_user_created_idx"),
+            Index(fields=["user", "priority", "id"], name="task_user_priority_idx"),
+            Index(fields=["user", "finish_at", "id"], name="task_user_finish_idx"),
+            # Covers the MAX(updated_at)/COUNT(*) list fingerprint
+            Index(fields=["user", "updated_at"], name="task_user_updated_idx"),
+            Index(
+                fields=["user", "completed", "created_at", "id"],
+                name="task_user_completed_idx",
+            ),
+            Index(
+                fields=["user", "completed", "priority", "created_at", "id"],
+                name="task_user_state_idx",
+            ),
+            Index(
+                fields=["user", "finish_at", "id"],
+                condition=Q(completed=False),
+                name="task_open_finish_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.user} - {self.priority}"
+
+
+class TaskCounter(Model):
+    """
+    One of a user's task counts, e.g. ``total`` or ``tag:<id>``.
+
+    Kept in step with the tasks by every write path through
+    ``todo_api.stats``, in the same transaction as the write.
+    """
+
+    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False)
+    name = CharField(max_length=40)
+    value = IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the upsert target and the index stats are read through
+            UniqueConstraint(
+                fields=["user", "name"], name="task_counter_user_name_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.name}: {self.value}"
+
+
+class Upload(Model):
+    """
+    A file sent in chunks through the upload API, see ``todo_api.uploads``.
+
+    Chunks are appended to a part file until ``offset`` reaches ``size``;
+    the finished file is then stored under its SHA-256, so identical
+    uploads share one stored file.
+    """
+
+    # Indexed through the leading column of Meta.indexes
+    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False)
+    filename = CharField(max_length=255)
+    size = BigIntegerField(help_text="Size of the whole file in bytes")
+    offset = BigIntegerField(default=0, help_text="Bytes received so far")
+    sha256 = CharField(max_length=64, blank=True, db_index=True)
+    file = FileField(max_length=255, blank=True)
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [Index(fields=["user", "id"], name="upload_user_idx")]
+
+    def __str__(self):
+        return f"{self.filename} - {self.user} - {self.offset}/{self.size}"
+
+    @property
+    def completed(self) -> bool:
+        return bool(self.file)
+
+
+class Job(Model):
+    """
+    A call of a ``@job`` function queued by ``enqueue``, see
+    ``todo_api.background``.
+
+    Jobs are due from ``run_at``, and a worker claims one by setting
+    ``locked_until``, after which another worker may claim it again. Jobs
+    are deleted once they succeed, and kept with ``failed_at`` set once
+    they have failed ``max_attempts`` times.
+    """
+
+    name = CharField(max_length=200, help_text="Dotted path of the job function")
+    kwargs = JSONField(default=dict)
+    run_at = DateTimeField()
+    locked_until = DateTimeField(null=True, blank=True)
+    attempts = PositiveSmallIntegerField(default=0)
+    max_attempts = PositiveSmallIntegerField(default=5)
+    last_error = TextField(blank=True)
+    failed_at = DateTimeField(null=True, blank=True)
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The due jobs workers claim, failed jobs are never claimed again
+            Index(
+                fields=["run_at"],
+                condition=Q(failed_at__isnull=True),
+                name="job_due_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} - attempt {self.attempts}/{self.max_attempts}"
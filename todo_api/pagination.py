@@ -0,0 +1,298 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import namedtuple
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple("KeysetCursor", ["reverse", "position"])
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Opaque cursor pagination that seeks on the full ordering key.
+
+    DRF's ``CursorPagination`` only stores the first ordering field plus an
+    OFFSET for ties, which degrades on low-cardinality fields like
+    ``priority``. Here the cursor stores every ordering value of the boundary
+    row plus the primary key as tie-breaker, so each page is a plain
+    ``WHERE (key) > (cursor) ORDER BY key LIMIT n`` regardless of its depth.
+
+    NULLs sort as the greatest value (PostgreSQL's native behaviour), which
+    is enforced explicitly so SQLite pages the same way.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "pk"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching the page natively."""
+        queryset = self._get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([obj async for obj in queryset[: self.page_size + 1]])
+
+    def _get_page_queryset(self, queryset, request, view):
+        """Returns ``queryset`` ordered and seeked to the requested page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.keys = self._get_keys(self.ordering)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        queryset = queryset.order_by(*self._get_order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self._get_seek(self.cursor.position, reverse))
+        return queryset
+
+    def _set_page(self, results):
+        """
+        Sets the page from the rows fetched by ``_get_page_queryset``.
+
+        One row more than the page size is fetched to know whether there is a
+        page after this one.
+        """
+        reverse = self.cursor is not None and self.cursor.reverse
+        self.page = results[: self.page_size]
+        has_following = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position(self.page[-1])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(KeysetCursor(reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position(self.page[0])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(KeysetCursor(reverse=True, position=position))
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering requested through ``OrderingFilter``, else the
+        queryset's own ordering (e.g. search rank), else ``ordering``.
+        """
+        ordering = None
+        ordering_filters = [
+            filter_cls
+            for filter_cls in getattr(view, "filter_backends", [])
+            if hasattr(filter_cls, "get_ordering")
+        ]
+        if ordering_filters:
+            ordering = ordering_filters[0]().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = [
+                order for order in queryset.query.order_by if isinstance(order, str)
+            ] or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def decode_cursor(self, request):
+        """
+        Given a request with a cursor, return a `KeysetCursor` instance.
+
+        Cursors are bound to the ordering they were issued for, so reusing one
+        after changing ``?ordering=`` is rejected instead of silently skipping
+        rows.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if payload["o"] != self._get_signature():
+                raise ValueError("Cursor ordering mismatch")
+            values = payload["p"]
+            if len(values) != len(self.keys):
+                raise ValueError("Cursor position mismatch")
+            position = tuple(
+                None if value is None else self._get_field(name).to_python(value)
+                for (name, _), value in zip(self.keys, values)
+            )
+            reverse = bool(payload.get("r", 0))
+        except (
+            BinasciiError,
+            KeyError,
+            TypeError,
+            UnicodeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return KeysetCursor(reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        """
+        Given a KeysetCursor instance, return an url with encoded cursor.
+        """
+        payload = {"o": self._get_signature(), "p": list(cursor.position)}
+        if cursor.reverse:
+            payload["r"] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_field(self, name):
+        """Return the model field or annotation output field for ``name``."""
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if name in self.annotations:
+                return self.annotations[name].output_field
+            raise
+
+    def _get_keys(self, ordering):
+        """
+        Return ``(field_name, descending)`` pairs ending in a unique key.
+
+        The primary key is appended as tie-breaker, following the direction
+        of the last ordering field so a composite index can serve the scan.
+        """
+        pk_name = self.model._meta.pk.name
+        keys = []
+        for order in ordering:
+            descending = order.startswith("-")
+            name = order.lstrip("-")
+            if name == "pk":
+                name = pk_name
+            try:
+                self._get_field(name)
+            except FieldDoesNotExist:
+                continue
+            keys.append((name, descending))
+            if name == pk_name:
+                return keys
+        keys.append((pk_name, keys[-1][1] if keys else False))
+        return keys
+
+    def _get_signature(self):
+        return [f"-{name}" if descending else name for name, descending in self.keys]
+
+    def _get_order_by(self, reverse):
+        order_by = []
+        for name, descending in self.keys:
+            expression = F(name)
+            if descending != reverse:
+                order_by.append(
+                    expression.desc(nulls_first=True)
+                    if self._get_field(name).null
+                    else expression.desc()
+                )
+            else:
+                order_by.append(
+                    expression.asc(nulls_last=True)
+                    if self._get_field(name).null
+                    else expression.asc()
+                )
+        return order_by
+
+    def _get_seek(self, position, reverse):
+        """
+        Build the lexicographic "strictly after ``position``" condition.
+
+        ``(a, b, pk) > (x, y, z)`` expands to
+        ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)``; a
+        redundant ``a >= x`` bound is added so the planner can turn the leading
+        column into an index range instead of filtering every row.
+        """
+        terms = []
+        equal = Q()
+        for (name, descending), value in zip(self.keys, position):
+            nullable = self._get_field(name).null
+            after = self._get_after(name, value, descending != reverse, nullable)
+            if after is not None:
+                terms.append(equal & after)
+            if value is None:
+                equal &= Q(**{f"{name}__isnull": True})
+            else:
+                equal &= Q(**{name: value})
+
+        condition = reduce(or_, terms, Q(pk__in=[]))
+        (name, descending), value = self.keys[0], position[0]
+        if value is not None and not self._get_field(name).null:
+            lookup = "lte" if descending != reverse else "gte"
+            condition &= Q(**{f"{name}__{lookup}": value})
+        return condition
+
+    @staticmethod
+    def _get_after(name, value, descending, nullable):
+        """Rows strictly after ``value`` on one column, NULLs sorting last."""
+        if descending:
+            if value is None:
+                return Q(**{f"{name}__isnull": False})
+            return Q(**{f"{name}__lt": value})
+        if value is None:
+            return None
+        after = Q(**{f"{name}__gt": value})
+        if nullable:
+            after |= Q(**{f"{name}__isnull": True})
+        return after
+
+    def _get_position(self, instance):
+        position = []
+        for name, _ in self.keys:
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(
+                    instance, getattr(self._get_field(name), "attname", None) or name
+                )
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+
+class TaskCursorPagination(KeysetCursorPagination):
+    ordering = "-created_at"
+
+
+class TagCursorPagination(KeysetCursorPagination):
+    ordering = "name"
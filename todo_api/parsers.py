@@ -0,0 +1,128 @@
+import codecs
+import csv
+import json
+
+from rest_framework.parsers import BaseParser
+
+# Columns holding nested values, written as JSON by CSVRenderer
+JSON_COLUMNS = {"extra_data", "tags", "tags_detail"}
+
+
+def iter_ndjson(stream, encoding="utf-8-sig"):
+    """
+    Yields ``(line, row, error)`` for each non-blank line of an NDJSON byte
+    stream, ``row`` being None when the line is not a JSON object.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line_no, raw in enumerate(stream, 1):
+        try:
+            text = decoder.decode(raw)
+        except UnicodeDecodeError as exc:
+            yield line_no, None, f"Invalid {encoding} text: {exc.reason}."
+            decoder.reset()
+            continue
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}."
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object."
+            continue
+        yield line_no, row, None
+
+
+def _decode_cell(column, value):
+    if column in JSON_COLUMNS and value[:1] in ("[", "{"):
+        return json.loads(value)
+    if column == "tags":
+        return [name.strip() for name in value.split(",") if name.strip()]
+    return value
+
+
+def iter_csv(stream, encoding="utf-8-sig"):
+    """
+    Yields ``(line, row, error)`` for each record of a CSV byte stream with a
+    header row.
+
+    Empty cells are left out of the row so the field's default applies.
+    ``extra_data``/``tags``/``tags_detail`` cells are JSON decoded, as written
+    by the export; ``tags`` also accepts comma separated names.
+    """
+    reader = csv.reader(codecs.iterdecode(stream, encoding))
+    try:
+        header = next(reader)
+    except (StopIteration, UnicodeDecodeError, csv.Error):
+        return
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as exc:
+            # Both leave the reader unusable, so the rest of the file is lost
+            yield reader.line_num, None, f"Invalid CSV: {exc}."
+            return
+        if not any(values):
+            continue
+        if len(values) > len(header):
+            yield reader.line_num, None, "Row has more values than the header."
+            continue
+        try:
+            row = {
+                column: _decode_cell(column, value)
+                for column, value in zip(header, values)
+                if value != ""
+            }
+        except ValueError as exc:
+            yield reader.line_num, None, f"Invalid JSON: {exc}."
+            continue
+        yield reader.line_num, row, None
+
+
+class RowStreamParser(BaseParser):
+    """
+    Parses the request body lazily into ``(line, row, error)`` tuples.
+
+    Rows are read from the request stream as they are consumed, so the body
+    is never held in memory; ``request.data`` can only be iterated once.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return self.iter_rows(stream)
+
+    def iter_rows(self, stream):
+        raise NotImplementedError
+
+
+class NDJSONParser(RowStreamParser):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def iter_rows(self, stream):
+        return iter_ndjson(stream)
+
+
+class CSVParser(RowStreamParser):
+    media_type = "text/csv"
+    format = "csv"
+
+    def iter_rows(self, stream):
+        return iter_csv(stream)
+
+
+class UploadChunkParser(BaseParser):
+    """
+    Declares the media type of upload chunks. Chunks are copied from the
+    request stream to disk by ``todo_api.uploads.append_chunk`` rather than
+    parsed, so this parser hands back the stream.
+    """
+
+    media_type = "application/offset+octet-stream"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
@@ -0,0 +1,143 @@
+import csv
+import json
+from io import StringIO
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_PLAIN_SCALARS = frozenset([str, int, bool, type(None)])
+_JS_ESCAPES = [("\u2028".encode(), b"\\u2028"), ("\u2029".encode(), b"\\u2029")]
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+class PlainList(list):
+    """
+    A list whose producer has made sure every item is ``is_plain_json``, so
+    that ``FastJSONRenderer`` does not walk it again.
+    """
+
+
+def is_plain_json(value) -> bool:
+    """
+    Whether ``value`` only holds strings, integers, booleans, None, lists and
+    dicts with string keys: values orjson encodes to the same bytes as
+    ``JSONRenderer``. Floats are not plain, orjson formats them differently
+    (``1e-05`` becomes ``0.00001``), nor are dates or other types left to
+    DRF's encoder.
+    """
+    kind = type(value)
+    if kind in _PLAIN_SCALARS or kind is PlainList:
+        return True
+    if isinstance(value, dict):
+        return all(type(key) is str for key in value) and all(
+            map(is_plain_json, value.values())
+        )
+    if isinstance(value, list):
+        return all(map(is_plain_json, value))
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` encoding with orjson whenever that gives the same bytes.
+
+    That is when the output is compact and ``is_plain_json(data)``; anything
+    else, including integers too large for orjson, is left to
+    ``JSONRenderer``. Lists of rows built as ``PlainList`` are not walked
+    again, which is what makes large lists cheap to render.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            indent is None
+            and self.compact
+            and not self.ensure_ascii
+            and data is not None
+            and is_plain_json(data)
+        ):
+            try:
+                rendered = orjson.dumps(data)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # Escaped like JSONRenderer does, to stay a JavaScript subset
+                for char, escaped in _JS_ESCAPES:
+                    rendered = rendered.replace(char, escaped)
+                return rendered
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer whose ``stream`` method encodes an iterable of rows lazily.
+
+    Rows are encoded one at a time and yielded in ``buffer_size`` blocks, so
+    memory use does not depend on the number of rows. ``render`` handles
+    regular responses (e.g. errors) as a list of rows, or a single row.
+    """
+
+    charset = "utf-8"
+    buffer_size = 64 * 1024
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(rows))
+
+    def stream(self, rows, fields=None):
+        """Yields the encoded ``rows``, ``fields`` being their columns."""
+        parts, size = [], 0
+        for text in self.encode_rows(rows, fields):
+            parts.append(text)
+            size += len(text)
+            if size >= self.buffer_size:
+                yield "".join(parts).encode()
+                parts, size = [], 0
+        if parts:
+            yield "".join(parts).encode()
+
+    def encode_rows(self, rows, fields):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def encode_rows(self, rows, fields):
+        for row in rows:
+            yield _dumps(row) + "\n"
+
+
+class CSVRenderer(StreamingRenderer):
+    """Nested values (lists, dicts) are written as JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def encode_rows(self, rows, fields):
+        buffer = StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(
+                    buffer, fields or list(row), extrasaction="ignore"
+                )
+                writer.writeheader()
+            writer.writerow(
+                {
+                    key: _dumps(value) if isinstance(value, (list, dict)) else value
+                    for key, value in row.items()
+                }
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if writer is None and fields:
+            yield ",".join(fields) + "\r\n"
@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from rest_framework.filters import SearchFilter
+
+SEARCH_CONFIG = "english"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class PortableSearchVector(SearchVector):
+    """
+    A ``SearchVector`` that compiles to NULL outside PostgreSQL.
+
+    Lets ``Task.search_vector`` be declared as a stored generated column on
+    every backend, so SQLite test databases can still be created.
+    """
+
+    def as_sql(self, compiler, connection, function=None, template=None):
+        if connection.vendor != "postgresql":
+            return "NULL", []
+        return super().as_sql(compiler, connection, function, template)
+
+
+@lru_cache
+def has_trigram(alias: str) -> bool:
+    """Whether the pg_trgm extension is installed on the ``alias`` database."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    Ranked full-text search over ``Task.search_vector`` on PostgreSQL.
+
+    A task matches when its stored tsvector matches the ``?search=`` text as
+    a websearch query or as word prefixes (for search-as-you-type), or, when
+    pg_trgm is installed, when its title is trigram-similar to the text
+    (typo tolerance). Matches are ordered by relevance unless ``?ordering=``
+    is given. Other databases fall back to ``SearchFilter``'s ``icontains``
+    lookups over ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms or connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        text = " ".join(search_terms)
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        words = _WORD_RE.findall(text)
+        if words:
+            prefix = " & ".join(f"{word}:*" for word in words)
+            query |= SearchQuery(prefix, search_type="raw", config=SEARCH_CONFIG)
+
+        condition = Q(search_vector=query)
+        rank = SearchRank(F("search_vector"), query)
+        if has_trigram(queryset.db):
+            condition |= Q(title__trigram_word_similar=text)
+            rank += TrigramWordSimilarity(text, "title")
+
+        # ts_rank() is a float4; widen it so the value stored in a pagination
+        # cursor compares exactly equal to the row it came from.
+        return (
+            queryset.filter(condition)
+            .annotate(search_rank=Cast(rank, FloatField()))
+            .order_by("-search_rank")
+        )
@@ -0,0 +1,193 @@
+"""
+Synthetic users, tags and tasks, generated from a random seed, for the
+benchmarks in ``benchmarks/`` and ``manage.py seed_tasks``.
+
+Tasks are spread over the users uniformly, or following Zipf's law like
+real usage, where a few users own most of the tasks. They are generated
+and written in batches, so millions of them never sit in memory, through
+``write_tasks`` as the importer does: with COPY on PostgreSQL, otherwise
+with ``bulk_create``. The task counters are updated with each batch.
+"""
+
+import random
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .importer import copy_tasks, use_copy, write_tasks
+from .models import Tag, Task
+from .stats import task_counts, update_counters
+
+DISTRIBUTIONS = ("uniform", "zipf")
+
+# Words of the generated titles and descriptions, so searches match some
+# tasks but not all of them
+WORDS = (
+    "report budget meeting review invoice client draft email call plan "
+    "design deploy release test bug fix refactor docs update backup server "
+    "database migrate schedule order payment contract team hire interview "
+    "training garden groceries laundry dentist doctor insurance taxes "
+    "flight hotel passport birthday gift party dinner recipe cleaning car "
+    "repair paint furniture kitchen window roof garage bike gym run swim "
+    "yoga book course exam homework project slides presentation "
+    "quarterly annual weekly monthly urgent follow renew cancel submit "
+    "prepare organize sign send check pay buy return"
+).split()
+
+
+def tasks_per_user(
+    num_tasks: int, num_users: int, distribution: str = "zipf", exponent=1.1
+) -> list[int]:
+    """
+    Splits ``num_tasks`` over ``num_users`` users: evenly, or with ``zipf``
+    in proportion to ``1 / rank ** exponent``, so the first user owns the
+    most tasks.
+    """
+    if distribution == "uniform":
+        weights = [1.0] * num_users
+    else:
+        weights = [1 / rank**exponent for rank in range(1, num_users + 1)]
+    total = sum(weights)
+    shares = [num_tasks * weight / total for weight in weights]
+    counts = [int(share) for share in shares]
+    # The rounded down tasks go to the largest remainders
+    by_remainder = sorted(range(num_users), key=lambda i: counts[i] - shares[i])
+    for i in by_remainder[: num_tasks - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class Seeder:
+    """
+    Creates ``num_users`` users named ``<prefix><number>``, each with
+    ``tags_per_user`` tags, and ``num_tasks`` tasks over them.
+
+    Each task gets up to ``max_tags_per_task`` of its user's tags, is
+    completed with the probability ``completed_ratio``, and was created
+    within the ``days`` before now; half of them have a due date. The same
+    ``seed`` generates the same data, dates aside.
+    """
+
+    batch_size = 10000
+
+    def __init__(
+        self,
+        prefix: str,
+        num_users: int,
+        num_tasks: int,
+        distribution: str = "zipf",
+        exponent: float = 1.1,
+        tags_per_user: int = 20,
+        max_tags_per_task: int = 3,
+        completed_ratio: float = 0.3,
+        days: int = 365,
+        seed: int = 0,
+        batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[dict[str, Any]], None]] = None,
+    ):
+        self.prefix = prefix
+        self.num_users = num_users
+        self.num_tasks = num_tasks
+        self.distribution = distribution
+        self.exponent = exponent
+        self.tags_per_user = tags_per_user
+        self.max_tags_per_task = min(max_tags_per_task, tags_per_user)
+        self.completed_ratio = completed_ratio
+        self.days = days
+        self.random = random.Random(seed)
+        self.batch_size = batch_size or self.batch_size
+        self.on_batch = on_batch
+        self.now = timezone.now()
+        self.report = {"users": 0, "tags": 0, "tasks": 0, "links": 0}
+
+    def usernames(self) -> list[str]:
+        width = len(str(self.num_users))
+        return [f"{self.prefix}{i:0{width}}" for i in range(1, self.num_users + 1)]
+
+    def run(self) -> dict[str, Any]:
+        users = self.create_users()
+        counts = tasks_per_user(
+            self.num_tasks, self.num_users, self.distribution, self.exponent
+        )
+        for user, num_tasks in zip(users, counts):
+            tag_ids = self.create_tags(user)
+            for start in range(0, num_tasks, self.batch_size):
+                self.write_batch(user, tag_ids, min(self.batch_size, num_tasks - start))
+        return self.report
+
+    def create_users(self) -> list:
+        User = get_user_model()
+        # One unusable password for all, as hashing is slow by design
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(username=username, password=password) for username in self.usernames()
+        )
+        self.report["users"] = len(users)
+        return users
+
+    def create_tags(self, user) -> list[int]:
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name=f"{self.random.choice(WORDS)} {i}")
+            for i in range(self.tags_per_user)
+        )
+        self.report["tags"] += len(tags)
+        return [tag.pk for tag in tags]
+
+    def make_task(self, user) -> Task:
+        rng = self.random
+        created_at = self.now - timedelta(seconds=rng.uniform(0, self.days * 86400))
+        completed = rng.random() < self.completed_ratio
+        return Task(
+            user=user,
+            title=" ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            description=" ".join(rng.choices(WORDS, k=rng.randint(0, 20))),
+            priority=rng.choices((1, 2, 3), weights=(2, 5, 3))[0],
+            completed=completed,
+            created_at=created_at,
+            updated_at=(
+                created_at + timedelta(days=rng.uniform(0, 7))
+                if completed
+                else created_at
+            ),
+            finish_at=(
+                created_at + timedelta(days=rng.uniform(1, 60))
+                if rng.random() < 0.5
+                else None
+            ),
+        )
+
+    def write_batch(self, user, tag_ids: list[int], size: int) -> None:
+        tasks = [self.make_task(user) for _ in range(size)]
+        tags = [
+            set(
+                self.random.sample(
+                    tag_ids, self.random.randint(0, self.max_tags_per_task)
+                )
+            )
+            for _ in tasks
+        ]
+        counts = Counter()
+        for task, task_tag_ids in zip(tasks, tags):
+            counts.update(task_counts(task, task_tag_ids))
+        with transaction.atomic():
+            if use_copy():
+                # Keeps the generated dates, which an INSERT would replace
+                copy_tasks(tasks, tags, pre_save=False)
+            else:
+                dates = [(task.created_at, task.updated_at) for task in tasks]
+                write_tasks(tasks, tags)
+                for task, (created_at, updated_at) in zip(tasks, dates):
+                    task.created_at, task.updated_at = created_at, updated_at
+                Task.objects.bulk_update(
+                    tasks, ["created_at", "updated_at"], batch_size=500
+                )
+            update_counters({user.pk: counts})
+        self.report["tasks"] += len(tasks)
+        self.report["links"] += sum(len(task_tag_ids) for task_tag_ids in tags)
+        if self.on_batch is not None:
+            self.on_batch(self.report)
@@ -1,15 +1,84 @@
-from typing import Any
+import os
+from collections import defaultdict
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Iterable, Optional
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch, QuerySet
+from django.db.models.query import ValuesIterable
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
+from PIL import Image
+from rest_framework import ISO_8601
 from rest_framework.serializers import (
+    BooleanField,
+    CharField,
+    ChoiceField,
     CurrentUserDefault,
+    DateTimeField,
+    DictField,
+    Field,
     HiddenField,
+    ImageField,
+    IntegerField,
+    ListField,
+    ListSerializer,
+    ManyRelatedField,
     ModelSerializer,
     PrimaryKeyRelatedField,
+    Serializer,
     SerializerMethodField,
+    ValidationError,
 )
+from rest_framework.settings import api_settings
 
-from .models import Tag, Task
+from .images import VARIANTS, variant_urls
+from .models import Tag, Task, Upload
+from .renderers import PlainList, is_plain_json
+from .stats import (
+    count_tasks,
+    diff_counts,
+    task_counts,
+    update_counters,
+)
+from .tree import MAX_TREE_DEPTH, delete_subtrees
+
+
+class UploadSerializer(ModelSerializer):
+    user = HiddenField(default=CurrentUserDefault())
+    completed = BooleanField(read_only=True)
+
+    class Meta:
+        model = Upload
+        fields = [
+            "id",
+            "user",
+            "filename",
+            "size",
+            "offset",
+            "completed",
+            "sha256",
+            "file",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["offset", "sha256", "file"]
+
+    def validate_filename(self, value: str) -> str:
+        value = os.path.basename(value.replace("\\", "/"))
+        if not value:
+            raise ValidationError("Expected a file name.")
+        return value
+
+    def validate_size(self, value: int) -> int:
+        if not 0 < value <= settings.API_UPLOAD_MAX_SIZE:
+            raise ValidationError(
+                f"Ensure the size is between 1 and {settings.API_UPLOAD_MAX_SIZE}."
+            )
+        return value
 
 
 class TagSerializer(ModelSerializer):
@@ -21,38 +90,682 @@ class TagSerializer(ModelSerializer):
         read_only_fields = ["id"]
 
 
+class UserTagsField(ManyRelatedField):
+    """Writable list of ids of the request user's tags.
+
+    ``PrimaryKeyRelatedField(many=True)`` runs one query per id and stops at
+    the first unknown one; this field resolves the whole list with a single
+    query and reports every unknown id at once. Tags of other users are
+    unknown ids. Repeated ids are only kept once.
+    """
+
+    default_error_messages = {"does_not_exist": "Tags not found: {pk_values}"}
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            child_relation=PrimaryKeyRelatedField(queryset=Tag.objects.all()),
+            **kwargs,
+        )
+
+    def get_queryset(self) -> QuerySet:
+        return Tag.objects.filter(user=self.context["request"].user)
+
+    def to_internal_value(self, data) -> list[Tag]:
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        pks = list(dict.fromkeys(self.to_pk(value) for value in data))
+        if not pks:
+            return []
+        tags = self.get_queryset().in_bulk(pks)
+        missing = [pk for pk in pks if pk not in tags]
+        if missing:
+            self.fail("does_not_exist", pk_values=sorted(missing))
+        return [tags[pk] for pk in pks]
+
+    def to_pk(self, value) -> int:
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            return Tag._meta.pk.to_python(value)
+        except (TypeError, DjangoValidationError):
+            self.child_relation.fail("incorrect_type", data_type=type(value).__name__)
+
+
+class UserUploadField(PrimaryKeyRelatedField):
+    """Id of one of the request user's finished uploads."""
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=Upload.objects.all(), **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        return Upload.objects.filter(user=self.context["request"].user).exclude(file="")
+
+
+@extend_schema_field(
+    {
+        "type": "object",
+        "nullable": True,
+        "properties": {
+            variant: {"type": "string", "format": "uri"} for variant in VARIANTS
+        },
+    }
+)
+class ImageVariantsField(Field):
+    """URLs of the downscaled variants of a task's image, by variant name."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "image")
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(getattr(value, "name", value), self.context.get("request"))
+
+
 class TaskSerializer(ModelSerializer):
-    tags = PrimaryKeyRelatedField(
-        many=True, queryset=Tag.objects.all(), required=False, write_only=True
+    tags = UserTagsField(required=False, write_only=True)
+    attachment_upload = UserUploadField(
+        required=False,
+        write_only=True,
+        help_text="Finished upload to use as the attachment",
+    )
+    image_upload = UserUploadField(
+        required=False, write_only=True, help_text="Finished upload to use as the image"
     )
 
     tags_detail = SerializerMethodField(read_only=True)
+    image_variants = ImageVariantsField()
     user = HiddenField(default=CurrentUserDefault())
 
     class Meta:
         model = Task
-        fields = "__all__"
-        extra_fields = ["tags_detail"]
-        read_only_fields = ["id", "created_at"]
+        exclude = ["search_vector"]
+        extra_fields = ["tags_detail", "image_variants"]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet) -> QuerySet:
+        """Prefetches tags in a single query for every task in the queryset.
+
+        Tags are stored in ``prefetched_tags`` rather than the default
+        prefetch cache, which DRF clears after an update. The search vector
+        is never serialized, so it is not loaded either.
+        """
+        return queryset.defer("search_vector").prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.all(), to_attr="prefetched_tags")
+        )
 
     @extend_schema_field(TagSerializer(many=True))
     def get_tags_detail(self, obj: Task):
         """Uses SerializerMethodField to return tags as list of dictionaries"""
-        return TagSerializer(obj.tags.all(), many=True).data
+        tags = getattr(obj, "prefetched_tags", None)
+        if tags is None:
+            tags = obj.tags.all()
+        return TagSerializer(tags, many=True).data
 
+    def validate_image_upload(self, upload: Upload) -> Upload:
+        try:
+            with upload.file.open("rb") as file, Image.open(file) as image:
+                image.verify()
+        except Exception:
+            raise ValidationError(ImageField.default_error_messages["invalid_image"])
+        return upload
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        # Uploads are referenced by id and stand in for the file fields
+        for name in ("attachment", "image"):
+            upload = attrs.pop(f"{name}_upload", None)
+            if upload is None:
+                continue
+            if attrs.get(name):
+                raise ValidationError(
+                    {f"{name}_upload": f"Give either {name} or {name}_upload."}
+                )
+            attrs[name] = upload.file.name
+        return attrs
+
+    @transaction.atomic
     def create(self, validated_data: dict[str, Any]) -> Task:
-        """Overwritten to handle tags"""
+        """Overwritten to handle tags and the user's counters"""
         tags_data = validated_data.pop("tags", [])
         task = Task.objects.create(**validated_data)
-        task.tags.set(tags_data)
+        if tags_data:
+            # A new task has no tag rows yet, so skip set()'s diffing SELECT.
+            Task.tags.through.objects.bulk_create(
+                Task.tags.through(task=task, tag=tag) for tag in tags_data
+            )
+        task.prefetched_tags = list(tags_data)
+        update_counters(
+            {task.user_id: task_counts(task, (tag.pk for tag in tags_data))}
+        )
         return task
 
+    @transaction.atomic
     def update(self, instance: Task, validated_data: dict[str, Any]) -> Task:
-        """Overwritten to handle tags"""
+        """Overwritten to handle tags and the user's counters"""
         tags_data = validated_data.pop("tags", None)
+        # The instance was read without a lock, so a concurrent write may
+        # have changed what it counts for: the counted fields and the tags
+        # are read again under a row lock
+        current = (
+            Task.objects.select_for_update()
+            .only("completed", "priority")
+            .get(pk=instance.pk)
+        )
+        instance.completed, instance.priority = current.completed, current.priority
+        old_tag_ids, new_tags = set(), []
+        if tags_data is not None:
+            old_tag_ids = set(
+                Task.tags.through.objects.filter(task=instance).values_list(
+                    "tag_id", flat=True
+                )
+            )
+            new_tags = tags_data
+        before = task_counts(instance, old_tag_ids)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         if tags_data is not None:
-            instance.tags.set(tags_data)
+            self._replace_tags(instance, old_tag_ids, new_tags)
+            instance.prefetched_tags = list(tags_data)
         instance.save()
+        after = task_counts(instance, (tag.pk for tag in new_tags))
+        update_counters(
+            diff_counts({instance.user_id: before}, {instance.user_id: after})
+        )
         return instance
+
+    @staticmethod
+    def _replace_tags(task: Task, old_ids: set[int], new_tags: list[Tag]) -> None:
+        """Diffs the tag rows of the task against its current ``old_ids``,
+        touching only the changes."""
+        through = Task.tags.through
+        new_ids = {tag.pk for tag in new_tags}
+        if old_ids - new_ids:
+            through.objects.filter(task=task, tag_id__in=old_ids - new_ids).delete()
+        if new_ids - old_ids:
+            through.objects.bulk_create(
+                through(task=task, tag_id=tag_id) for tag_id in new_ids - old_ids
+            )
+
+
+class TaskRowIterable(ValuesIterable):
+    """
+    Yields ``.values()`` rows of tasks, each with the ``(id, name,
+    updated_at)`` tuples of its tags under ``tags``.
+
+    Tags are read with one query for all the rows, or per ``chunk_size``
+    rows when iterating with ``iterator()``, like a prefetch would.
+    """
+
+    def __iter__(self):
+        rows = super().__iter__()
+        chunk_size = self.chunk_size if self.chunked_fetch else None
+        while chunk := list(islice(rows, chunk_size)):
+            tags = defaultdict(list)
+            for task_id, *tag in (
+                Tag.objects.using(self.queryset.db)
+                .filter(task__in=[row["id"] for row in chunk])
+                .values_list("task", "id", "name", "updated_at")
+            ):
+                tags[task_id].append(tuple(tag))
+            for row in chunk:
+                row["tags"] = tags.get(row["id"], [])
+            yield from chunk
+
+
+class TaskRowListSerializer(ListSerializer):
+    """
+    Read-only ``TaskSerializer(many=True)`` for the rows of ``setup_values``.
+
+    Building model instances and running DRF's per-field
+    ``to_representation`` made up most of the time spent listing tasks.
+    This builds the same dicts straight from ``.values()`` rows instead;
+    its output must stay identical to TaskSerializer's, and the tests
+    compare the two on every field.
+    """
+
+    FIELDS = [
+        "id",
+        "title",
+        "description",
+        "priority",
+        "completed",
+        "created_at",
+        "updated_at",
+        "finish_at",
+        "attachment",
+        "related_url",
+        "image",
+        "extra_data",
+        "parent_task",
+    ]
+    # Columns read by fields that are not columns themselves
+    SOURCES = {"image_variants": "image"}
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("child", TaskSerializer())
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def setup_values(
+        queryset: QuerySet, fields: Optional[Iterable[str]] = None, keys=()
+    ) -> QuerySet:
+        """Turns a task queryset into one of rows for ``fields`` (all of them
+        by default).
+
+        Only the columns of ``fields`` and ``keys`` are selected, and tags are
+        only read for ``tags_detail``. Annotations (e.g. the search rank) are
+        kept in the rows, as the pagination cursor may be built from them.
+        """
+        if fields is not None:
+            fields = set(fields)
+            fields.update(
+                TaskRowListSerializer.SOURCES[name]
+                for name in fields & TaskRowListSerializer.SOURCES.keys()
+            )
+        columns = [
+            name
+            for name in TaskRowListSerializer.FIELDS
+            if fields is None or name == "id" or name in fields or name in keys
+        ]
+        queryset = queryset.prefetch_related(None).values(
+            *columns, *queryset.query.annotations
+        )
+        if fields is None or "tags_detail" in fields:
+            queryset._iterable_class = TaskRowIterable
+        return queryset
+
+    @property
+    def data(self):
+        # Kept as built: ListSerializer.data copies it into a ReturnList,
+        # which FastJSONRenderer would have to check item by item
+        return super(ListSerializer, self).data
+
+    def to_representation(self, data):
+        request = self.context.get("request")
+        represent_datetime = self.get_datetime_representation()
+
+        def datetime_getter(name):
+            return lambda row: represent_datetime(row[name])
+
+        def file_getter(name):
+            storage = Task._meta.get_field(name).storage
+
+            def represent(row):
+                if not row[name] or not api_settings.UPLOADED_FILES_USE_URL:
+                    return row[name] or None
+                url = storage.url(row[name])
+                if request is None:
+                    return url
+                return request.build_absolute_uri(url)
+
+            return represent
+
+        rows = list(data)
+        tags = {}
+        for row in rows:
+            for tag_id, name, updated_at in row.get("tags", ()):
+                if tag_id not in tags:
+                    tags[tag_id] = {
+                        "id": tag_id,
+                        "name": name,
+                        "updated_at": represent_datetime(updated_at),
+                    }
+        getters = {
+            "id": itemgetter("id"),
+            "tags_detail": lambda row: [tags[tag[0]] for tag in row["tags"]],
+            "title": itemgetter("title"),
+            "description": itemgetter("description"),
+            "priority": itemgetter("priority"),
+            "completed": itemgetter("completed"),
+            "created_at": datetime_getter("created_at"),
+            "updated_at": datetime_getter("updated_at"),
+            "finish_at": datetime_getter("finish_at"),
+            "attachment": file_getter("attachment"),
+            "related_url": itemgetter("related_url"),
+            "image": file_getter("image"),
+            "image_variants": lambda row: variant_urls(row["image"], request),
+            "extra_data": itemgetter("extra_data"),
+            "parent_task": itemgetter("parent_task"),
+        }
+        # The child's fields, which a view may have trimmed to a sparse
+        # fieldset
+        fields = [
+            (name, getters[name])
+            for name, field in self.child.fields.items()
+            if not field.write_only
+        ]
+        representation = [{name: get(row) for name, get in fields} for row in rows]
+        if all(is_plain_json(row.get("extra_data")) for row in rows):
+            return PlainList(representation)
+        return representation
+
+    @staticmethod
+    def get_datetime_representation():
+        """Returns ``DateTimeField().to_representation``, minus its per-call
+        lookups of the settings and the current timezone."""
+        if api_settings.DATETIME_FORMAT != ISO_8601 or not settings.USE_TZ:
+            return DateTimeField().to_representation
+        current_timezone = timezone.get_current_timezone()
+
+        def represent(value):
+            if value is None:
+                return None
+            value = value.astimezone(current_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return represent
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """TaskSerializer for bulk writes.
+
+    Relations are taken as plain ids so validating an item never queries the
+    database; TaskBulkSerializer resolves them for the whole batch at once.
+    """
+
+    tags = ListField(child=IntegerField(), required=False)
+    parent_task = IntegerField(required=False, allow_null=True)
+    attachment_upload = None
+    image_upload = None
+
+    class Meta(TaskSerializer.Meta):
+        exclude = ["search_vector", "attachment", "image"]
+
+
+class TaskTreeSerializer(TaskSerializer):
+    """TaskSerializer nesting the ``subtasks`` loaded by ``get_subtree``."""
+
+    children = SerializerMethodField()
+
+    @extend_schema_field(
+        {"type": "array", "items": {"$ref": "#/components/schemas/TaskTree"}}
+    )
+    def get_children(self, obj: Task):
+        # Reuses this serializer for the whole tree instead of building one
+        # per task
+        return [self.to_representation(task) for task in getattr(obj, "subtasks", [])]
+
+
+class TaskTreeQuerySerializer(Serializer):
+    depth = IntegerField(
+        min_value=0,
+        max_value=MAX_TREE_DEPTH,
+        default=MAX_TREE_DEPTH,
+        help_text="Levels of subtasks to include",
+    )
+
+
+class SparseFieldsQuerySerializer(Serializer):
+    fields = CharField(
+        required=False, help_text="Comma-separated fields to return, e.g. id,title"
+    )
+    omit = CharField(required=False, help_text="Comma-separated fields to leave out")
+
+    def validate_fields(self, value):
+        return _split_names(value)
+
+    def validate_omit(self, value):
+        return _split_names(value)
+
+
+def _split_names(value: str) -> list[str]:
+    names = [name for name in (name.strip() for name in value.split(",")) if name]
+    if not names:
+        raise ValidationError("Expected a comma-separated list of field names.")
+    return names
+
+
+class TagCountSerializer(Serializer):
+    id = IntegerField()
+    name = CharField()
+    tasks = IntegerField()
+
+
+class TaskStatsSerializer(Serializer):
+    total = IntegerField()
+    completed = IntegerField()
+    open = IntegerField()
+    overdue = IntegerField(help_text="Open tasks past their finish_at")
+    by_priority = DictField(child=IntegerField())
+    tags = TagCountSerializer(many=True)
+
+
+class TaskCompleteSerializer(Serializer):
+    MAX_IDS = 1000
+
+    ids = ListField(
+        child=IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_IDS,
+        help_text="Tasks to update, else every task matching the filters",
+    )
+    completed = BooleanField(default=True, help_text="False reopens the tasks")
+
+
+class TaskImportSerializer(TaskSerializer):
+    """TaskSerializer for imported rows.
+
+    Tags are given by name and resolved by TaskImporter for a whole batch.
+    Ids are read-only, so exported rows are imported as new tasks.
+    """
+
+    tags = ListField(
+        child=CharField(max_length=Tag._meta.get_field("name").max_length),
+        required=False,
+    )
+    user = None
+    attachment_upload = None
+    image_upload = None
+
+    class Meta(TaskSerializer.Meta):
+        exclude = ["search_vector", "attachment", "image", "parent_task", "user"]
+
+    def to_internal_value(self, data):
+        # Rows written by TaskExportView carry their tags in tags_detail
+        if "tags" not in data and isinstance(data.get("tags_detail"), list):
+            data = {
+                **data,
+                "tags": [
+                    tag["name"]
+                    for tag in data["tags_detail"]
+                    if isinstance(tag, dict) and "name" in tag
+                ],
+            }
+        return super().to_internal_value(data)
+
+
+class TaskImportReportSerializer(Serializer):
+    processed = IntegerField()
+    created = IntegerField()
+    failed = IntegerField()
+    errors = ListField(child=DictField())
+    errors_truncated = BooleanField()
+
+
+class TaskBulkOperationSerializer(Serializer):
+    OPERATIONS = ["create", "update", "delete", "complete"]
+
+    op = ChoiceField(choices=OPERATIONS)
+    id = IntegerField(required=False)
+    data = DictField(required=False)
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        op = attrs["op"]
+        if op != "create" and "id" not in attrs:
+            raise ValidationError({"id": "This field is required."})
+        if op in ("create", "update"):
+            item = TaskBulkItemSerializer(
+                data=attrs.get("data", {}),
+                partial=op == "update",
+                context=self.context,
+            )
+            if not item.is_valid():
+                raise ValidationError({"data": item.errors})
+            attrs["data"] = item.validated_data
+        return attrs
+
+
+class TaskBulkSerializer(Serializer):
+    """Validates and applies a batch of task operations in one transaction.
+
+    Ownership of every referenced task and tag is checked with one query
+    each, and the batch is written with bulk_create/bulk_update and
+    set-based UPDATE/DELETE statements, so the number of queries does not
+    grow with the number of operations.
+    """
+
+    MAX_OPERATIONS = 1000
+
+    operations = TaskBulkOperationSerializer(
+        many=True, allow_empty=False, max_length=MAX_OPERATIONS, write_only=True
+    )
+    results = ListField(child=DictField(), read_only=True)
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        user = self.context["request"].user
+        operations = attrs["operations"]
+        errors = [{} for _ in operations]
+
+        task_ids, tag_ids, seen = set(), set(), {}
+        for index, operation in enumerate(operations):
+            data = operation.get("data", {})
+            if "id" in operation:
+                if operation["id"] in seen:
+                    errors[index][
+                        "id"
+                    ] = "Task is referenced by more than one operation."
+                seen[operation["id"]] = index
+                task_ids.add(operation["id"])
+            if data.get("parent_task") is not None:
+                task_ids.add(data["parent_task"])
+            tag_ids.update(data.get("tags", []))
+
+        tasks = Task.objects.filter(user=user).defer("search_vector").in_bulk(task_ids)
+        owned_tags = set(
+            Tag.objects.filter(user=user, pk__in=tag_ids).values_list("pk", flat=True)
+        )
+
+        for index, operation in enumerate(operations):
+            data = operation.get("data", {})
+            if "id" in operation and operation["id"] not in tasks:
+                errors[index].setdefault("id", "Task not found")
+            parent = data.get("parent_task")
+            if parent is not None and parent not in tasks:
+                errors[index]["parent_task"] = "Task not found"
+            missing = sorted(set(data.get("tags", [])) - owned_tags)
+            if missing:
+                errors[index]["tags"] = f"Tags not found: {missing}"
+
+        if any(errors):
+            raise ValidationError({"operations": errors})
+        attrs["tasks"] = tasks
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        operations = validated_data["operations"]
+        tasks = validated_data["tasks"]
+        through = Task.tags.through
+
+        # bulk_update() and update() skip auto_now, so stamp updated_at here
+        now = timezone.now()
+        created, updated, update_fields, tag_sets = [], [], {"updated_at"}, {}
+        completed_ids, deleted_ids = [], []
+        for operation in operations:
+            op, data = operation["op"], dict(operation.get("data", {}))
+            tags = data.pop("tags", None)
+            if "parent_task" in data:
+                data["parent_task_id"] = data.pop("parent_task")
+            if op == "create":
+                task = Task(**data)
+                # Repeated ids would insert the same link row twice
+                created.append((task, list(dict.fromkeys(tags or []))))
+            elif op == "update":
+                task = tasks[operation["id"]]
+                for attr, value in data.items():
+                    setattr(task, attr, value)
+                task.updated_at = now
+                update_fields.update(data)
+                updated.append(task)
+                if tags is not None:
+                    tag_sets[task.pk] = set(tags)
+            elif op == "complete":
+                completed_ids.append(operation["id"])
+            else:
+                deleted_ids.append(operation["id"])
+
+        # Counted before and after the writes, so only the changes that
+        # were actually made reach the counters
+        changed_ids = [task.pk for task in updated] + completed_ids
+        changed = Task.objects.filter(pk__in=changed_ids)
+        before = count_tasks(changed) if changed_ids else {}
+
+        Task.objects.bulk_create([task for task, _ in created], batch_size=500)
+        through.objects.bulk_create(
+            [
+                through(task_id=task.pk, tag_id=tag_id)
+                for task, tags in created
+                for tag_id in tags
+            ],
+            batch_size=1000,
+        )
+        if updated:
+            Task.objects.bulk_update(updated, sorted(update_fields), batch_size=500)
+        if tag_sets:
+            self._replace_tags(tag_sets)
+        if completed_ids:
+            Task.objects.filter(pk__in=completed_ids).update(
+                completed=True, updated_at=now
+            )
+
+        deltas = diff_counts(before, count_tasks(changed) if changed_ids else {})
+        for task, tags in created:
+            deltas[task.user_id].update(task_counts(task, tags))
+        update_counters(deltas)
+        if deleted_ids:
+            delete_subtrees(deleted_ids)
+
+        created_ids = iter(task.pk for task, _ in created)
+        return {
+            "results": [
+                {
+                    "op": operation["op"],
+                    "id": (
+                        next(created_ids)
+                        if operation["op"] == "create"
+                        else operation["id"]
+                    ),
+                }
+                for operation in operations
+            ]
+        }
+
+    @staticmethod
+    def _replace_tags(tag_sets: dict[int, set[int]]) -> None:
+        """Diffs the tag rows of the given tasks, touching only the changes."""
+        through = Task.tags.through
+        existing = through.objects.filter(task_id__in=tag_sets).values_list(
+            "pk", "task_id", "tag_id"
+        )
+        stale, current = [], set()
+        for pk, task_id, tag_id in existing:
+            if tag_id in tag_sets[task_id]:
+                current.add((task_id, tag_id))
+            else:
+                stale.append(pk)
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        through.objects.bulk_create(
+            [
+                through(task_id=task_id, tag_id=tag_id)
+                for task_id, tags in tag_sets.items()
+                for tag_id in tags
+                if (task_id, tag_id) not in current
+            ],
+            batch_size=1000,
+        )
@@ -0,0 +1,99 @@
+from typing import Optional
+
+from drf_spectacular.openapi import AutoSchema
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import ListSerializer
+
+from .serializers import SparseFieldsQuerySerializer
+
+
+class SparseFieldsSchema(AutoSchema):
+    """Documents the ``?fields=``/``?omit=`` parameters of GET requests."""
+
+    def get_override_parameters(self):
+        parameters = super().get_override_parameters()
+        if self.method == "GET":
+            return [*parameters, SparseFieldsQuerySerializer]
+        return parameters
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET requests pick the fields of the response with ``?fields=a,b``,
+    or drop some with ``?omit=a,b``; unknown names are rejected with a 400.
+
+    The serializer is trimmed to the requested fields, and ``filter_queryset``
+    only loads the model columns they (and ``sparse_required_fields``, e.g.
+    the pagination keys) are read from. Prefetches are skipped unless a
+    requested field is computed from the whole object, like ``tags_detail``.
+    """
+
+    schema = SparseFieldsSchema()
+    # Model fields loaded whatever the requested fields
+    sparse_required_fields = []
+
+    def get_sparse_fields(self) -> Optional[set[str]]:
+        """Returns the requested fields, or None when all of them are."""
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = None
+            if self.request.method in ("GET", "HEAD"):
+                self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self) -> Optional[set[str]]:
+        query = SparseFieldsQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        if not query.validated_data:
+            return None
+        available = list(self.get_readable_fields())
+        for param, names in query.validated_data.items():
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError(
+                    {
+                        param: [
+                            f"Unknown fields: {', '.join(unknown)}. "
+                            f"Available fields: {', '.join(available)}."
+                        ]
+                    }
+                )
+        fields = set(query.validated_data.get("fields", available))
+        return fields.difference(query.validated_data.get("omit", []))
+
+    def get_readable_fields(self) -> dict:
+        """Returns the serializer's readable fields by name."""
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return {
+            name: field
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        }
+
+    def get_serializer(self, *args, **kwargs):
+        return self.trim_serializer(super().get_serializer(*args, **kwargs))
+
+    def trim_serializer(self, serializer):
+        """Drops the readable fields that were not requested."""
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = (
+                serializer.child
+                if isinstance(serializer, ListSerializer)
+                else serializer
+            )
+            for name, field in list(target.fields.items()):
+                if name not in fields and not field.write_only:
+                    del target.fields[name]
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        readable = self.get_readable_fields()
+        sources = {readable[name].source for name in fields}
+        if "*" not in sources:
+            queryset = queryset.prefetch_related(None)
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        return queryset.only(*(sources & model_fields), *self.sparse_required_fields)
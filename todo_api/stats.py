@@ -0,0 +1,174 @@
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+
+from .models import Tag, Task, TaskCounter
+
+TOTAL = "total"
+COMPLETED = "completed"
+
+# Rows per upsert statement, keeping it under SQLite's 999 parameters
+UPSERT_BATCH_SIZE = 300
+
+
+def priority_counter(priority: int) -> str:
+    return f"priority:{priority}"
+
+
+def tag_counter(tag_id: int) -> str:
+    return f"tag:{tag_id}"
+
+
+def task_counts(task: Task, tag_ids: Iterable[int] = ()) -> Counter:
+    """Returns what ``task``, tagged with ``tag_ids``, adds to the counters."""
+    counts = Counter({TOTAL: 1, priority_counter(task.priority): 1})
+    if task.completed:
+        counts[COMPLETED] += 1
+    counts.update(tag_counter(tag_id) for tag_id in tag_ids)
+    return counts
+
+
+def count_tasks(tasks: QuerySet) -> dict[int, Counter]:
+    """Counts ``tasks`` by user with two aggregate queries."""
+    counts = defaultdict(Counter)
+    rows = (
+        tasks.order_by()
+        .values_list("user_id", "completed", "priority")
+        .annotate(count=Count("pk"))
+    )
+    for user_id, completed, priority, count in rows:
+        counts[user_id][TOTAL] += count
+        counts[user_id][priority_counter(priority)] += count
+        if completed:
+            counts[user_id][COMPLETED] += count
+    rows = (
+        Task.tags.through.objects.filter(task__in=tasks.order_by().values("pk"))
+        .values_list("task__user_id", "tag_id")
+        .annotate(count=Count("pk"))
+    )
+    for user_id, tag_id, count in rows:
+        counts[user_id][tag_counter(tag_id)] += count
+    return counts
+
+
+def diff_counts(
+    before: dict[int, Counter], after: dict[int, Counter]
+) -> dict[int, Counter]:
+    deltas = defaultdict(Counter)
+    for user_id, counts in after.items():
+        deltas[user_id].update(counts)
+    for user_id, counts in before.items():
+        deltas[user_id].subtract(counts)
+    return deltas
+
+
+def update_counters(deltas: dict[int, Counter]) -> None:
+    """
+    Adds ``deltas``, by user, to the counters.
+
+    Each batch is one ``INSERT ... ON CONFLICT DO UPDATE`` incrementing the
+    rows in place, so concurrent writers never lose an update. Rows are
+    written in a fixed order to keep writers from deadlocking on each other.
+    """
+    rows = sorted(
+        (user_id, name, value)
+        for user_id, counts in deltas.items()
+        for name, value in counts.items()
+        if value
+    )
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    meta = TaskCounter._meta
+    table = qn(meta.db_table)
+    user, name, value = (
+        qn(meta.get_field(field).column) for field in ("user", "name", "value")
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start : start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({user}, {name}, {value}) VALUES "
+                + ", ".join(["(%s, %s, %s)"] * len(batch))
+                + f" ON CONFLICT ({user}, {name}) DO UPDATE "
+                f"SET {value} = {table}.{value} + excluded.{value}",
+                [param for row in batch for param in row],
+            )
+
+
+def get_stats(user) -> dict:
+    """
+    Reads the user's stats in three queries, whatever the number of tasks.
+
+    Whether a task is overdue changes with the clock rather than with
+    writes, so overdue tasks are counted on read, from the partial index on
+    open tasks' ``finish_at``.
+    """
+    counters = dict(TaskCounter.objects.filter(user=user).values_list("name", "value"))
+    overdue = Task.objects.filter(
+        user=user, completed=False, finish_at__lt=timezone.now()
+    ).count()
+    tags = Tag.objects.filter(user=user).order_by("name", "id").values("id", "name")
+    total, completed = counters.get(TOTAL, 0), counters.get(COMPLETED, 0)
+    return {
+        "total": total,
+        "completed": completed,
+        "open": total - completed,
+        "overdue": overdue,
+        "by_priority": {
+            str(priority): counters.get(priority_counter(priority), 0)
+            for priority, _ in Task.PRIORITY_CHOICES
+        },
+        "tags": [
+            {**tag, "tasks": counters.get(tag_counter(tag["id"]), 0)} for tag in tags
+        ],
+    }
+
+
+def rebuild_counters(
+    users: Optional[QuerySet] = None, dry_run: bool = False
+) -> dict[int, Counter]:
+    """
+    Recounts the counters of ``users`` (everyone by default) from their
+    tasks and replaces the stored ones, unless ``dry_run``. Returns the
+    drift, the stored minus the recounted values, by user.
+
+    On PostgreSQL the counters table is locked for the recount, so writes
+    racing with it wait and then apply their deltas on top of the new rows.
+    """
+    tasks, counters = Task.objects.all(), TaskCounter.objects.all()
+    if users is not None:
+        tasks, counters = tasks.filter(user__in=users), counters.filter(user__in=users)
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            table = connection.ops.quote_name(TaskCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+        stored = defaultdict(Counter)
+        for user_id, name, value in counters.values_list("user_id", "name", "value"):
+            stored[user_id][name] = value
+        recounted = count_tasks(tasks)
+        if dry_run:
+            return _drift(stored, recounted)
+        counters.delete()
+        TaskCounter.objects.bulk_create(
+            [
+                TaskCounter(user_id=user_id, name=name, value=value)
+                for user_id, counts in recounted.items()
+                for name, value in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return _drift(stored, recounted)
+
+
+def _drift(stored: dict[int, Counter], recounted: dict[int, Counter]):
+    drift = diff_counts(recounted, stored)
+    return {
+        user_id: Counter({name: value for name, value in counts.items() if value})
+        for user_id, counts in drift.items()
+        if any(counts.values())
+    }
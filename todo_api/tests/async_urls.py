@@ -0,0 +1,6 @@
+from django.urls import include, path
+
+from todo_api import async_views
+from todo_api.urls import get_urlpatterns
+
+urlpatterns = [path("api/", include(get_urlpatterns(async_views)))]
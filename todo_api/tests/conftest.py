@@ -0,0 +1,51 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from todo_api.models import Tag, Task
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for each in caches.all():
+        each.clear()
+
+
+@pytest.fixture
+def authenticated_user():
+    User = get_user_model()
+    return User.objects.create_user(
+        username="testuser", email="test@example.com", password="testpass123"
+    )
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def create_task(db):
+    def _create_task(user=None):
+        return Task.objects.create(title="Test Task", user=user)
+
+    return _create_task
+
+
+@pytest.fixture
+def create_tasks(db):
+    def _create_tasks(user, num_tasks):
+        for i in range(num_tasks):
+            Task.objects.create(title=f"Task {i}", user=user)
+
+    return _create_tasks
+
+
+@pytest.fixture
+def create_tags(db):
+    def _create_tags(user, num_tags):
+        for i in range(num_tags):
+            Tag.objects.create(name=f"Tag {i}", user=user)
+
+    return _create_tags
@@ -0,0 +1,167 @@
+import pytest
+from django.core.cache import cache
+from rest_framework import status
+
+from todo_api import async_views
+from todo_api.models import Tag, Task
+
+ASYNC_URLS = "todo_api.tests.async_urls"
+
+
+@pytest.fixture
+def tagged_tasks(authenticated_user):
+    tags = [
+        Tag.objects.create(name=f"Tag {i}", user=authenticated_user) for i in range(3)
+    ]
+    for i in range(5):
+        task = Task.objects.create(
+            title=f"Task {i}", priority=i % 3 + 1, user=authenticated_user
+        )
+        task.tags.set(tags[: i % 3])
+    return Task.objects.order_by("pk")
+
+
+@pytest.mark.parametrize(
+    "view",
+    [
+        async_views.TaskListCreate,
+        async_views.TaskRetrieveUpdateDestroy,
+        async_views.MarkTaskAsCompletedView,
+        async_views.TagListCreate,
+        async_views.TagRetrieveUpdateDestroy,
+    ],
+)
+def test_async_views_are_async(view):
+    assert view.view_is_async
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/tasks/",
+        "/api/tasks/?page_size=2",
+        "/api/tasks/?ordering=priority&completed=false",
+        "/api/tasks/?search=task",
+        "/api/tasks/?fields=id,title&ordering=finish_at&page_size=2",
+        "/api/tags/",
+        "/api/tags/?omit=updated_at",
+    ],
+)
+def test_async_list_matches_sync(
+    authenticated_user, api_client, tagged_tasks, settings, url
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    sync_response = api_client.get(url)
+    cache.clear()
+    settings.ROOT_URLCONF = ASYNC_URLS
+
+    # Act
+    response = api_client.get(url)
+    next_response = (
+        api_client.get(response.data["next"]) if response.data["next"] else None
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == sync_response.data
+    assert response["ETag"] == sync_response["ETag"]
+    if next_response is not None:
+        assert next_response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(ASYNC_URLS)
+def test_async_list_query_count(
+    authenticated_user, api_client, tagged_tasks, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # ETag fingerprints (tasks, tags) + tasks page + tags prefetch
+    with django_assert_num_queries(4):
+        response = api_client.get("/api/tasks/")
+    with django_assert_num_queries(0):
+        cached = api_client.get("/api/tasks/", HTTP_IF_NONE_MATCH=response["ETag"])
+
+    # Assert
+    assert len(response.data["results"]) == 5
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(ASYNC_URLS)
+def test_async_retrieve(authenticated_user, api_client, tagged_tasks):
+    # Arrange
+    task = tagged_tasks.last()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{task.pk}/")
+    cache.clear()
+    not_modified = api_client.get(
+        f"/api/tasks/{task.pk}/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    missing = api_client.get("/api/tasks/999999/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["title"] == task.title
+    assert len(response.data["tags_detail"]) == task.tags.count()
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(ASYNC_URLS)
+def test_async_mark_as_completed(
+    authenticated_user, api_client, tagged_tasks, django_capture_on_commit_callbacks
+):
+    # Arrange
+    task = tagged_tasks.last()
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get(f"/api/tasks/{task.pk}/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(f"/api/tasks/{task.pk}/complete/")
+    detail = api_client.get(f"/api/tasks/{task.pk}/")
+    missing = api_client.post("/api/tasks/999999/complete/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["completed"]
+    assert detail.data["completed"]
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(ASYNC_URLS)
+def test_async_writes(
+    authenticated_user, api_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        created = api_client.post("/api/tasks/", {"title": "New"}, format="json")
+    url = f"/api/tasks/{created.data['id']}/"
+    etag = api_client.get(url)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        updated = api_client.patch(
+            url, {"title": "Renamed"}, format="json", HTTP_IF_MATCH=etag
+        )
+    stale = api_client.delete(url, HTTP_IF_MATCH=etag)
+    with django_capture_on_commit_callbacks(execute=True):
+        deleted = api_client.delete(url, HTTP_IF_MATCH=updated["ETag"])
+    listed = api_client.get("/api/tasks/")
+
+    # Assert
+    assert created.status_code == status.HTTP_201_CREATED
+    assert updated.data["title"] == "Renamed"
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert deleted.status_code == status.HTTP_204_NO_CONTENT
+    assert listed.data["results"] == []
@@ -0,0 +1,164 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from todo_api.authentication import forget_user
+
+USER_TABLE = get_user_model()._meta.db_table
+
+
+@pytest.fixture
+def token_client(authenticated_user, api_client):
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(authenticated_user)}"
+    )
+    return api_client
+
+
+def _user_queries(client, method, url, **kwargs):
+    """Returns the response and how many queries read the user table."""
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, **kwargs)
+    return response, sum(USER_TABLE in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_writes_read_the_user_once(token_client):
+    # Act
+    first, first_queries = _user_queries(
+        token_client, "post", "/api/tags/", data={"name": "A"}
+    )
+    second, second_queries = _user_queries(
+        token_client, "post", "/api/tags/", data={"name": "B"}
+    )
+
+    # Assert
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert (first_queries, second_queries) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_reads_do_not_query_the_cached_user(
+    authenticated_user, token_client, create_tasks
+):
+    # Arrange
+    create_tasks(authenticated_user, 2)
+
+    # Act
+    first, first_queries = _user_queries(token_client, "get", "/api/tasks/")
+    second, second_queries = _user_queries(token_client, "get", "/api/tasks/")
+
+    # Assert
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert len(second.data["results"]) == 2
+    assert (first_queries, second_queries) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_cached_user_holds_no_password(authenticated_user, token_client):
+    # Act
+    token_client.get("/api/tasks/")
+
+    # Assert
+    assert caches[settings.API_USER_CACHE_ALIAS].get(
+        f"todo:user:{authenticated_user.pk}"
+    ) == {"id": authenticated_user.pk, "username": "testuser", "is_active": True}
+
+
+@pytest.mark.django_db
+def test_reads_of_other_views_load_the_user(token_client):
+    # Act
+    response, queries = _user_queries(token_client, "get", "/api/auth/user/")
+
+    # Assert
+    assert response.data["username"] == "testuser"
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(
+    authenticated_user, token_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    token_client.post("/api/tags/", {"name": "A"})
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_user.is_active = False
+        authenticated_user.save()
+    read = token_client.get("/api/tags/")
+    write = token_client.post("/api/tags/", {"name": "B"})
+
+    # Assert
+    assert read.status_code == write.status_code == status.HTTP_401_UNAUTHORIZED
+    assert read.data["code"] == "user_inactive"
+
+
+@pytest.mark.django_db
+def test_deleted_user_is_rejected(
+    authenticated_user, token_client, django_capture_on_commit_callbacks
+):
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_user.delete()
+    response = token_client.get("/api/tasks/")
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.data["code"] == "user_not_found"
+
+
+@pytest.mark.django_db
+def test_evicted_user_is_read_again(
+    authenticated_user, token_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_user.is_active = False
+        authenticated_user.save()
+
+    # Act
+    caches[settings.API_USER_CACHE_ALIAS].clear()
+    response, queries = _user_queries(token_client, "get", "/api/tasks/")
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.data["code"] == "user_inactive"
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_forget_user_rereads_the_user(authenticated_user, token_client):
+    # Arrange
+    token_client.post("/api/tags/", {"name": "A"})
+    get_user_model().objects.filter(pk=authenticated_user.pk).update(is_active=False)
+
+    # Act
+    forget_user(authenticated_user.pk)
+    response = token_client.post("/api/tags/", {"name": "B"})
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_revoked_tokens_are_checked_against_the_user(
+    authenticated_user, token_client, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(api_settings, "CHECK_REVOKE_TOKEN", True)
+    authenticated_user.set_password("changed")
+    authenticated_user.save()
+
+    # Act
+    response, queries = _user_queries(token_client, "get", "/api/tasks/")
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert queries == 1
@@ -0,0 +1,164 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from todo_api.background import BACKOFF, claim_jobs, enqueue, job, run_job
+from todo_api.models import Job, Tag
+
+skip_locked_only = pytest.mark.skipif(
+    not connection.features.has_select_for_update_skip_locked,
+    reason="SKIP LOCKED is not supported by this database",
+)
+
+
+@job
+def create_tag(user_id, name):
+    Tag.objects.create(user_id=user_id, name=name)
+
+
+@job(max_attempts=2)
+def create_tag_and_fail(user_id, name):
+    create_tag(user_id, name)
+    raise ValueError("Failed on purpose")
+
+
+def not_a_job():
+    pass
+
+
+@pytest.mark.django_db
+def test_enqueued_jobs_are_claimed_once_until_their_timeout(settings):
+    # Arrange
+    settings.API_JOB_TIMEOUT = 60
+    first = enqueue(create_tag, user_id=1, name="First")
+    later = enqueue(create_tag, delay=timedelta(hours=1), user_id=1, name="Later")
+    now = timezone.now()
+
+    # Act
+    claimed = claim_jobs(10, now=now)
+    while_claimed = claim_jobs(10, now=now + timedelta(seconds=59))
+    after_timeout = claim_jobs(10, now=now + timedelta(seconds=61))
+
+    # Assert
+    assert [(job.pk, job.attempts) for job in claimed] == [(first.pk, 1)]
+    assert claimed[0].kwargs == {"user_id": 1, "name": "First"}
+    assert while_claimed == []
+    assert [(job.pk, job.attempts) for job in after_timeout] == [(first.pk, 2)]
+    assert Job.objects.get(pk=later.pk).attempts == 0
+
+
+@pytest.mark.django_db
+def test_jobs_of_a_rolled_back_transaction_are_dropped():
+    # Act
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            enqueue(create_tag, user_id=1, name="Rolled back")
+            raise ValueError
+
+    # Assert
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+def test_successful_job_is_deleted(authenticated_user):
+    # Arrange
+    enqueue(create_tag, user_id=authenticated_user.pk, name="Done")
+    (claimed,) = claim_jobs(1)
+
+    # Act
+    succeeded = run_job(claimed)
+
+    # Assert
+    assert succeeded
+    assert not Job.objects.exists()
+    assert Tag.objects.get().name == "Done"
+
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_with_backoff_then_kept_as_failed(authenticated_user):
+    # Arrange
+    enqueue(create_tag_and_fail, user_id=authenticated_user.pk, name="Undone")
+    (claimed,) = claim_jobs(1)
+
+    # Act
+    first = run_job(claimed)
+    retried = Job.objects.get()
+    (reclaimed,) = claim_jobs(1, now=retried.run_at)
+    second = run_job(reclaimed)
+    failed = Job.objects.get()
+
+    # Assert
+    assert not first and not second
+    # The job's writes are rolled back with it
+    assert not Tag.objects.exists()
+    assert retried.run_at >= timezone.now() + BACKOFF - timedelta(seconds=5)
+    assert retried.locked_until is None
+    assert "Failed on purpose" in retried.last_error
+    assert failed.attempts == 2
+    assert failed.failed_at is not None
+    assert claim_jobs(1, now=timezone.now() + timedelta(days=1)) == []
+
+
+@pytest.mark.django_db
+def test_only_job_functions_are_run():
+    # Arrange
+    Job.objects.create(
+        name=f"{__name__}.not_a_job", run_at=timezone.now(), max_attempts=1
+    )
+    (claimed,) = claim_jobs(1)
+
+    # Act
+    succeeded = run_job(claimed)
+
+    # Assert
+    assert not succeeded
+    assert "is not a @job function" in Job.objects.get().last_error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_runworker_runs_the_due_jobs(authenticated_user):
+    # Arrange
+    for i in range(5):
+        enqueue(create_tag, user_id=authenticated_user.pk, name=f"Tag {i}")
+
+    # Act
+    call_command("runworker", "--once", "--concurrency", "2", stdout=None)
+
+    # Assert
+    assert not Job.objects.exists()
+    assert Tag.objects.count() == 5
+
+
+@skip_locked_only
+@pytest.mark.django_db(transaction=True)
+def test_claims_skip_jobs_locked_by_other_workers():
+    # Arrange
+    locked, free = (
+        enqueue(create_tag, user_id=1, name=name) for name in ("Locked", "Free")
+    )
+    holding, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with transaction.atomic():
+            Job.objects.select_for_update().get(pk=locked.pk)
+            holding.set()
+            release.wait(10)
+        connection.close()
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    holding.wait(10)
+
+    # Act
+    try:
+        claimed = claim_jobs(10)
+    finally:
+        release.set()
+        thread.join()
+
+    # Assert
+    assert [job.pk for job in claimed] == [free.pk]
@@ -0,0 +1,191 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+from todo_api.stats import rebuild_counters
+
+
+@pytest.fixture
+def other_user(db):
+    return get_user_model().objects.create_user(username="other", password="pass1234")
+
+
+@pytest.mark.django_db
+def test_task_bulk_applies_mixed_operations(authenticated_user, api_client):
+    # Arrange
+    tags = [
+        Tag.objects.create(name=f"Tag {i}", user=authenticated_user) for i in range(3)
+    ]
+    to_update, to_complete, to_delete = (
+        Task.objects.create(title=f"Task {i}", user=authenticated_user)
+        for i in range(3)
+    )
+    to_update.tags.set(tags[:2])
+    api_client.force_authenticate(user=authenticated_user)
+    operations = [
+        {"op": "create", "data": {"title": "New", "tags": [tags[0].pk, tags[2].pk]}},
+        {
+            "op": "update",
+            "id": to_update.pk,
+            "data": {
+                "title": "Renamed",
+                "priority": 1,
+                "tags": [tags[1].pk, tags[2].pk],
+            },
+        },
+        {"op": "complete", "id": to_complete.pk},
+        {"op": "delete", "id": to_delete.pk},
+    ]
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/bulk/", {"operations": operations}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data["results"]
+    assert [result["op"] for result in results] == [
+        "create",
+        "update",
+        "complete",
+        "delete",
+    ]
+    created = Task.objects.get(pk=results[0]["id"])
+    assert created.user == authenticated_user
+    assert set(created.tags.values_list("pk", flat=True)) == {tags[0].pk, tags[2].pk}
+    to_update.refresh_from_db()
+    assert (to_update.title, to_update.priority) == ("Renamed", 1)
+    assert set(to_update.tags.values_list("pk", flat=True)) == {tags[1].pk, tags[2].pk}
+    assert Task.objects.get(pk=to_complete.pk).completed
+    assert not Task.objects.filter(pk=to_delete.pk).exists()
+
+
+@pytest.mark.django_db
+def test_task_bulk_rejects_foreign_tags_and_tasks(
+    authenticated_user, other_user, api_client
+):
+    # Arrange
+    foreign_tag = Tag.objects.create(name="Theirs", user=other_user)
+    foreign_task = Task.objects.create(title="Theirs", user=other_user)
+    api_client.force_authenticate(user=authenticated_user)
+    operations = [
+        {"op": "create", "data": {"title": "Fine"}},
+        {"op": "create", "data": {"title": "Tagged", "tags": [foreign_tag.pk]}},
+        {"op": "complete", "id": foreign_task.pk},
+        {"op": "update", "id": 999, "data": {"title": "Missing"}},
+    ]
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/bulk/", {"operations": operations}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    errors = response.data["operations"]
+    assert errors[0] == {}
+    assert "tags" in errors[1]
+    assert errors[2] == {"id": "Task not found"}
+    assert errors[3] == {"id": "Task not found"}
+    assert not Task.objects.filter(user=authenticated_user).exists()
+    assert not Task.objects.get(pk=foreign_task.pk).completed
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "operation, field",
+    [
+        ({"op": "create", "data": {"title": ""}}, "data"),
+        ({"op": "create", "data": {"title": "x", "priority": 7}}, "data"),
+        ({"op": "update", "data": {"title": "No id"}}, "id"),
+        ({"op": "archive", "id": 1}, "op"),
+    ],
+)
+def test_task_bulk_validates_items(authenticated_user, api_client, operation, field):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/bulk/", {"operations": [operation]}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert field in response.data["operations"][0]
+
+
+@pytest.mark.django_db
+def test_task_bulk_rejects_duplicate_ids(authenticated_user, api_client, create_task):
+    # Arrange
+    task = create_task(authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    operations = [{"op": "complete", "id": task.pk}, {"op": "delete", "id": task.pk}]
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/bulk/", {"operations": operations}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "id" in response.data["operations"][1]
+    assert Task.objects.filter(pk=task.pk).exists()
+
+
+@pytest.mark.django_db
+def test_task_bulk_create_ignores_repeated_tags(authenticated_user, api_client):
+    # Arrange
+    tag = Tag.objects.create(name="Tag", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    operations = [{"op": "create", "data": {"title": "New", "tags": [tag.pk, tag.pk]}}]
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/bulk/", {"operations": operations}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    created = Task.objects.get(pk=response.data["results"][0]["id"])
+    assert list(created.tags.all()) == [tag]
+    assert rebuild_counters(dry_run=True) == {}
+
+
+@pytest.mark.django_db
+def test_task_bulk_query_count_does_not_grow_with_batch(authenticated_user, api_client):
+    # Arrange
+    tags = [
+        Tag.objects.create(name=f"Tag {i}", user=authenticated_user) for i in range(5)
+    ]
+    api_client.force_authenticate(user=authenticated_user)
+
+    def run(size):
+        existing = Task.objects.bulk_create(
+            Task(title=f"Old {i}", user=authenticated_user) for i in range(3 * size)
+        )
+        operations = []
+        for i in range(size):
+            tag_ids = [tag.pk for tag in tags[i % 3 : i % 3 + 2]]
+            operations += [
+                {"op": "create", "data": {"title": f"New {i}", "tags": tag_ids}},
+                {"op": "update", "id": existing[i].pk, "data": {"tags": tag_ids}},
+                {"op": "complete", "id": existing[size + i].pk},
+                {"op": "delete", "id": existing[2 * size + i].pk},
+            ]
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(
+                "/api/tasks/bulk/", {"operations": operations}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        return len(context.captured_queries)
+
+    # Act
+    small, large = run(2), run(40)
+
+    # Assert
+    assert small == large
@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/tasks/", "/api/tags/"])
+def test_repeated_list_is_served_from_cache(
+    authenticated_user, api_client, create_tasks, django_assert_num_queries, url
+):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+    first = api_client.get(url)
+
+    # Act
+    with django_assert_num_queries(0):
+        second = api_client.get(url)
+
+    # Assert
+    assert second.status_code == status.HTTP_200_OK
+    assert second.data == first.data
+
+
+@pytest.mark.django_db
+def test_cache_key_normalizes_query_params(
+    authenticated_user, api_client, create_tasks, django_assert_num_queries
+):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/?priority=2&ordering=created_at")
+
+    # Act
+    with django_assert_num_queries(0):
+        response = api_client.get("/api/tasks/?ordering=created_at&priority=2")
+    filtered = api_client.get("/api/tasks/?priority=1")
+
+    # Assert
+    assert len(response.data["results"]) == 3
+    assert filtered.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_cache_is_per_user(authenticated_user, api_client, create_tasks):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other", password="x12345!")
+    create_tasks(authenticated_user, 2)
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+
+    # Act
+    api_client.force_authenticate(user=other)
+    response = api_client.get("/api/tasks/")
+
+    # Assert
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_task_writes_invalidate_cache(
+    authenticated_user, api_client, create_task, django_capture_on_commit_callbacks
+):
+    # Arrange
+    task = create_task(authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+    api_client.get(f"/api/tasks/{task.pk}/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post("/api/tasks/", {"title": "New"}, format="json")
+    listed = api_client.get("/api/tasks/")
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(f"/api/tasks/{task.pk}/complete/")
+    detail = api_client.get(f"/api/tasks/{task.pk}/")
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.delete(f"/api/tasks/{task.pk}/")
+    after_delete = api_client.get(f"/api/tasks/{task.pk}/")
+
+    # Assert
+    assert len(listed.data["results"]) == 2
+    assert detail.data["completed"]
+    assert after_delete.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_tag_rename_invalidates_task_list(
+    authenticated_user, api_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    tag = Tag.objects.create(name="Home", user=authenticated_user)
+    Task.objects.create(title="Dishes", user=authenticated_user).tags.add(tag)
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.patch(f"/api/tags/{tag.pk}/", {"name": "Work"}, format="json")
+    response = api_client.get("/api/tasks/")
+
+    # Assert
+    assert response.data["results"][0]["tags_detail"][0]["name"] == "Work"
+
+
+@pytest.mark.django_db
+def test_bulk_invalidates_cache(
+    authenticated_user, api_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(
+            "/api/tasks/bulk/",
+            {"operations": [{"op": "create", "data": {"title": "Bulk"}}]},
+            format="json",
+        )
+    response = api_client.get("/api/tasks/")
+
+    # Assert
+    assert [task["title"] for task in response.data["results"]] == ["Bulk"]
@@ -0,0 +1,208 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+from todo_api.models import Task
+from todo_api.stats import rebuild_counters
+
+
+@pytest.fixture
+def tasks(authenticated_user):
+    """Six tasks of priorities 1-3, created on the 1st to the 6th of January."""
+    tasks = []
+    for i in range(6):
+        task = Task.objects.create(
+            title=f"Task {i}", priority=i % 3 + 1, user=authenticated_user
+        )
+        Task.objects.filter(pk=task.pk).update(
+            created_at=datetime(2030, 1, i + 1, tzinfo=timezone.utc)
+        )
+        tasks.append(task)
+    rebuild_counters()
+    return tasks
+
+
+def _completed(user):
+    return set(
+        Task.objects.filter(user=user, completed=True).values_list("title", flat=True)
+    )
+
+
+def _assert_no_drift():
+    assert rebuild_counters(dry_run=True) == {}
+
+
+@pytest.mark.django_db
+def test_complete_returns_the_updated_task(
+    authenticated_user, api_client, tasks, django_capture_on_commit_callbacks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    before = Task.objects.get(pk=tasks[0].pk)
+    api_client.get(f"/api/tasks/{tasks[0].pk}/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(f"/api/tasks/{tasks[0].pk}/complete/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    task = Task.objects.get(pk=tasks[0].pk)
+    assert task.completed
+    assert task.updated_at > before.updated_at
+    assert task.title == before.title and task.created_at == before.created_at
+    assert response.data == api_client.get(f"/api/tasks/{task.pk}/").data
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_complete_completed_task_does_not_write(
+    authenticated_user, api_client, tasks, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.post(f"/api/tasks/{tasks[0].pk}/complete/")
+    updated_at = Task.objects.get(pk=tasks[0].pk).updated_at
+
+    # Act
+    # the update matching nothing, in a savepoint, then task + tags
+    with django_assert_num_queries(1 + 2 + 2):
+        response = api_client.post(f"/api/tasks/{tasks[0].pk}/complete/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["completed"]
+    assert Task.objects.get(pk=tasks[0].pk).updated_at == updated_at
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_complete_other_users_task(authenticated_user, api_client, tasks):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    response = api_client.post(f"/api/tasks/{tasks[0].pk}/complete/")
+
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert not _completed(authenticated_user)
+
+
+@pytest.mark.django_db
+def test_bulk_complete_ids(
+    authenticated_user, api_client, tasks, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    ids = [task.pk for task in tasks[:3]]
+
+    # Act
+    # update + counters upsert, in a savepoint
+    with django_assert_num_queries(2 + 2):
+        response = api_client.post("/api/tasks/complete/", {"ids": ids}, format="json")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"updated": 3}
+    assert _completed(authenticated_user) == {"Task 0", "Task 1", "Task 2"}
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_bulk_complete_by_filter(authenticated_user, api_client, tasks):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/complete/?priority=3&created_at__lt=2030-01-05T00:00:00Z"
+    )
+
+    # Assert
+    assert response.data == {"updated": 1}
+    assert _completed(authenticated_user) == {"Task 2"}
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_bulk_reopen_counts_only_changed_tasks(authenticated_user, api_client, tasks):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.post("/api/tasks/complete/?priority=1")
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/complete/?created_at__gte=2030-01-03T00:00:00Z",
+        {"completed": False},
+        format="json",
+    )
+
+    # Assert
+    assert response.data == {"updated": 1}
+    assert _completed(authenticated_user) == {"Task 0"}
+    assert api_client.get("/api/tasks/stats/").data["completed"] == 1
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_bulk_complete_invalidates_cached_lists(
+    authenticated_user, api_client, tasks, django_capture_on_commit_callbacks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/?completed=true")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post("/api/tasks/complete/?priority=2")
+
+    # Assert
+    listed = api_client.get("/api/tasks/?completed=true").data["results"]
+    assert {task["title"] for task in listed} == {"Task 1", "Task 4"}
+
+
+@pytest.mark.django_db
+def test_bulk_complete_skips_other_users_tasks(authenticated_user, api_client, tasks):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    by_ids = api_client.post(
+        "/api/tasks/complete/", {"ids": [tasks[0].pk]}, format="json"
+    )
+    by_filter = api_client.post("/api/tasks/complete/?priority=1")
+
+    # Assert
+    assert by_ids.data == by_filter.data == {"updated": 0}
+    assert not _completed(authenticated_user)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url, data, field",
+    [
+        ("/api/tasks/complete/", {}, "ids"),
+        ("/api/tasks/complete/?ordering=priority", {}, "ids"),
+        # Blank filters are ignored by django-filter
+        ("/api/tasks/complete/?priority=", {}, "ids"),
+        ("/api/tasks/complete/?completed=", {"completed": False}, "ids"),
+        ("/api/tasks/complete/", {"ids": []}, "ids"),
+        ("/api/tasks/complete/?created_at__lt=yesterday", {}, "created_at__lt"),
+    ],
+)
+def test_bulk_complete_invalid(authenticated_user, api_client, tasks, url, data, field):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(url, data, format="json")
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert field in response.data
+    assert not _completed(authenticated_user)
@@ -0,0 +1,309 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from todo_api.models import Tag, Task
+
+
+def _etag(client, url):
+    """Fetches ``url`` bypassing the response cache and returns its ETag."""
+    cache.clear()
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return response["ETag"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/tasks/", "/api/tags/"])
+def test_list_not_modified_skips_serialization(
+    authenticated_user, api_client, create_tasks, django_assert_num_queries, url
+):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = _etag(api_client, url)
+    cache.clear()
+
+    # Act
+    with django_assert_num_queries(2 if url == "/api/tasks/" else 1):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_list_not_modified_from_cache(
+    authenticated_user, api_client, create_tasks, django_assert_num_queries
+):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = api_client.get("/api/tasks/")["ETag"]
+
+    # Act
+    with django_assert_num_queries(0):
+        response = api_client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_task_list_etag_tracks_changes(authenticated_user, api_client):
+    # Arrange
+    tag = Tag.objects.create(name="Home", user=authenticated_user)
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    other = Task.objects.create(title="Laundry", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    etags = [_etag(api_client, "/api/tasks/")]
+
+    # Act
+    api_client.patch(f"/api/tasks/{task.pk}/", {"tags": [tag.pk]}, format="json")
+    etags.append(_etag(api_client, "/api/tasks/"))
+    api_client.patch(f"/api/tags/{tag.pk}/", {"name": "Work"}, format="json")
+    etags.append(_etag(api_client, "/api/tasks/"))
+    api_client.delete(f"/api/tasks/{other.pk}/")
+    etags.append(_etag(api_client, "/api/tasks/"))
+    api_client.post(
+        "/api/tasks/bulk/",
+        {"operations": [{"op": "complete", "id": task.pk}]},
+        format="json",
+    )
+    etags.append(_etag(api_client, "/api/tasks/"))
+
+    # Assert
+    assert len(set(etags)) == len(etags)
+    assert _etag(api_client, "/api/tasks/") == etags[-1]
+
+
+@pytest.mark.django_db
+def test_list_etag_depends_on_query(authenticated_user, api_client, create_tasks):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    etags = {
+        _etag(api_client, "/api/tasks/"),
+        _etag(api_client, "/api/tasks/?page_size=2"),
+        _etag(api_client, "/api/tasks/?completed=true"),
+    }
+
+    # Assert
+    assert len(etags) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("resource", ["tasks", "tags"])
+def test_detail_supports_conditional_get(authenticated_user, api_client, resource):
+    # Arrange
+    if resource == "tasks":
+        obj = Task.objects.create(title="Dishes", user=authenticated_user)
+    else:
+        obj = Tag.objects.create(name="Home", user=authenticated_user)
+    # Last-Modified is only sent once it is a second old
+    type(obj).objects.filter(pk=obj.pk).update(
+        updated_at=timezone.now() - timedelta(minutes=1)
+    )
+    url = f"/api/{resource}/{obj.pk}/"
+    api_client.force_authenticate(user=authenticated_user)
+    first = api_client.get(url)
+    cache.clear()
+
+    # Act
+    by_etag = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    by_date = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+    # Assert
+    assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+    assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_task_detail_etag_tracks_tag_rename(authenticated_user, api_client):
+    # Arrange
+    tag = Tag.objects.create(name="Home", user=authenticated_user)
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    task.tags.add(tag)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = _etag(api_client, f"/api/tasks/{task.pk}/")
+
+    # Act
+    tag.name = "Work"
+    tag.save()
+
+    # Assert
+    assert _etag(api_client, f"/api/tasks/{task.pk}/") != etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["put", "patch"])
+def test_update_with_stale_if_match_fails(authenticated_user, api_client, method):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = _etag(api_client, f"/api/tasks/{task.pk}/")
+    Task.objects.filter(pk=task.pk).update(
+        title="Changed elsewhere", updated_at=timezone.now()
+    )
+
+    # Act
+    response = getattr(api_client, method)(
+        f"/api/tasks/{task.pk}/",
+        {"title": "Mine"},
+        format="json",
+        HTTP_IF_MATCH=etag,
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    task.refresh_from_db()
+    assert task.title == "Changed elsewhere"
+
+
+@pytest.mark.django_db
+def test_update_with_current_if_match_returns_new_etag(authenticated_user, api_client):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = _etag(api_client, f"/api/tasks/{task.pk}/")
+
+    # Act
+    response = api_client.patch(
+        f"/api/tasks/{task.pk}/",
+        {"title": "Mine"},
+        format="json",
+        HTTP_IF_MATCH=etag,
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert response["ETag"] == _etag(api_client, f"/api/tasks/{task.pk}/")
+
+
+@pytest.mark.django_db
+def test_delete_with_stale_if_match_fails(authenticated_user, api_client):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    stale = api_client.delete(f"/api/tasks/{task.pk}/", HTTP_IF_MATCH='"stale"')
+    current = api_client.delete(
+        f"/api/tasks/{task.pk}/",
+        HTTP_IF_MATCH=_etag(api_client, f"/api/tasks/{task.pk}/"),
+    )
+
+    # Assert
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert current.status_code == status.HTTP_204_NO_CONTENT
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_update_with_if_match_already_used_fails(authenticated_user, api_client):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    etag = _etag(api_client, f"/api/tasks/{task.pk}/")
+
+    # Act
+    responses = [
+        api_client.patch(
+            f"/api/tasks/{task.pk}/",
+            {"title": title},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        for title in ("First", "Second")
+    ]
+
+    # Assert
+    assert [response.status_code for response in responses] == [
+        status.HTTP_200_OK,
+        status.HTTP_412_PRECONDITION_FAILED,
+    ]
+    task.refresh_from_db()
+    assert task.title == "First"
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason="SELECT ... FOR UPDATE is not supported by this database",
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_updates_with_one_if_match(authenticated_user):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    client = APIClient()
+    client.force_authenticate(user=authenticated_user)
+    etag = _etag(client, f"/api/tasks/{task.pk}/")
+    statuses = []
+
+    def update(title):
+        client = APIClient()
+        client.force_authenticate(user=authenticated_user)
+        response = client.patch(
+            f"/api/tasks/{task.pk}/",
+            {"title": title},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        statuses.append(response.status_code)
+        connection.close()
+
+    threads = [
+        threading.Thread(target=update, args=(title,)) for title in ("First", "Second")
+    ]
+
+    # Act
+    # Both requests have read the row before either writes it, unless they
+    # wait for its lock
+    with transaction.atomic():
+        Task.objects.select_for_update().get(pk=task.pk)
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert sorted(statuses) == [
+        status.HTTP_200_OK,
+        status.HTTP_412_PRECONDITION_FAILED,
+    ]
+
+
+@pytest.mark.django_db
+def test_if_unmodified_since_fails_within_the_modified_second(
+    authenticated_user, api_client, monkeypatch
+):
+    # Arrange
+    task = Task.objects.create(title="Dishes", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    # Another write may still follow within the second of the last one
+    monkeypatch.setattr(timezone, "now", lambda: task.updated_at)
+    detail = api_client.get(f"/api/tasks/{task.pk}/")
+
+    # Act
+    response = api_client.delete(
+        f"/api/tasks/{task.pk}/",
+        HTTP_IF_UNMODIFIED_SINCE=http_date(task.updated_at.timestamp()),
+    )
+
+    # Assert
+    assert "Last-Modified" not in detail
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert Task.objects.exists()
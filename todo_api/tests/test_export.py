@@ -0,0 +1,152 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+from todo_api.views import TaskExportView
+
+
+@pytest.fixture
+def tagged_tasks(authenticated_user):
+    tags = [
+        Tag.objects.create(name=f"Tag {i}", user=authenticated_user) for i in range(3)
+    ]
+    for i in range(7):
+        task = Task.objects.create(
+            title=f"Task {i}",
+            priority=i % 3 + 1,
+            completed=i % 2 == 0,
+            extra_data={"source": "test"} if i == 0 else None,
+            user=authenticated_user,
+        )
+        task.tags.set(tags[: i % 4])
+    return Task.objects.order_by("created_at", "id")
+
+
+def _export(client, query=""):
+    response = client.get(f"/api/tasks/export/?{query}")
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(response, StreamingHttpResponse)
+    return response, b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_ndjson_matches_api_representation(
+    authenticated_user, api_client, tagged_tasks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    listed = api_client.get("/api/tasks/?ordering=created_at").data["results"]
+
+    # Act
+    response, content = _export(api_client)
+
+    # Assert
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert response["Content-Disposition"].endswith('.ndjson"')
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert rows == json.loads(json.dumps(listed))
+
+
+@pytest.mark.django_db
+def test_export_csv(authenticated_user, api_client, tagged_tasks):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response, content = _export(api_client, "format=csv")
+
+    # Assert
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(StringIO(content)))
+    assert [row["title"] for row in rows] == [task.title for task in tagged_tasks]
+    assert "tags" not in rows[0] and "user" not in rows[0]
+    assert json.loads(rows[0]["extra_data"]) == {"source": "test"}
+    assert [tag["name"] for tag in json.loads(rows[3]["tags_detail"])] == [
+        "Tag 0",
+        "Tag 1",
+        "Tag 2",
+    ]
+
+
+@pytest.mark.django_db
+def test_export_csv_without_tasks_has_header(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    _, content = _export(api_client, "format=csv")
+
+    # Assert
+    assert content.startswith("id,tags_detail,")
+    assert len(content.splitlines()) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("completed=true", ["Task 0", "Task 2", "Task 4", "Task 6"]),
+        ("priority=1&completed=false", ["Task 3"]),
+        ("search=Task 5", ["Task 5"]),
+        ("ordering=-created_at", [f"Task {i}" for i in reversed(range(7))]),
+    ],
+)
+def test_export_honors_list_filters(
+    authenticated_user, api_client, tagged_tasks, query, expected
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    _, content = _export(api_client, query)
+
+    # Assert
+    assert [json.loads(line)["title"] for line in content.splitlines()] == expected
+
+
+@pytest.mark.django_db
+def test_export_is_scoped_to_user(authenticated_user, api_client, tagged_tasks):
+    # Arrange
+    other = type(authenticated_user).objects.create_user(username="other")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    _, content = _export(api_client)
+
+    # Assert
+    assert content == ""
+
+
+@pytest.mark.django_db
+def test_export_prefetches_tags_per_chunk(
+    authenticated_user,
+    api_client,
+    tagged_tasks,
+    django_assert_num_queries,
+    monkeypatch,
+):
+    # Arrange
+    monkeypatch.setattr(TaskExportView, "chunk_size", 3)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get("/api/tasks/export/")
+    with django_assert_num_queries(1 + 3):  # tasks + one tag query per chunk
+        lines = b"".join(response.streaming_content).splitlines()
+
+    # Assert
+    assert len(lines) == 7
+
+
+@pytest.mark.django_db
+def test_export_requires_authentication(api_client):
+    # Act
+    response = api_client.get("/api/tasks/export/")
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
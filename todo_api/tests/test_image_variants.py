@@ -0,0 +1,205 @@
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from PIL import Image
+from rest_framework import status
+
+from todo_api.background import run_job
+from todo_api.images import (
+    VARIANTS,
+    evict_variants,
+    missing_variants,
+    render_variants,
+    renderer,
+    schedule_variants,
+    variant_name,
+)
+from todo_api.jobs import render_image_variants
+from todo_api.models import Job, Task
+
+IMAGE = "tasks/images/photo.png"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.API_IMAGE_VARIANT_WORKERS = 0
+    return tmp_path
+
+
+def _save_image(name=IMAGE, size=(2000, 1000), mode="RGB", color="red"):
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new(mode, size, color).save(path)
+    return path
+
+
+def test_render_variants_fits_each_variant_in_its_size(media_root):
+    # Arrange
+    source = _save_image(mode="RGBA", color=(255, 0, 0, 128))
+    targets = missing_variants(IMAGE)
+
+    # Act
+    written = render_variants(source, targets)
+
+    # Assert
+    assert set(targets) == set(VARIANTS)
+    assert written == sum(os.path.getsize(path) for path in targets.values())
+    for variant, path in targets.items():
+        with Image.open(path) as image:
+            size = VARIANTS[variant].size
+            assert image.format == "WEBP"
+            assert image.size == (size, size // 2)
+            assert image.mode == "RGBA"
+    assert missing_variants(IMAGE) == {}
+
+
+@pytest.mark.django_db
+def test_task_output_links_image_variants(authenticated_user, api_client):
+    # Arrange
+    _save_image()
+    with_image = Task.objects.create(
+        title="Photo", image=IMAGE, user=authenticated_user
+    )
+    Task.objects.create(title="Plain", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    detail = api_client.get(f"/api/tasks/{with_image.pk}/")
+    listed = api_client.get("/api/tasks/", {"ordering": "created_at"})
+    sparse = api_client.get("/api/tasks/", {"fields": "id,image_variants"})
+
+    # Assert
+    assert detail.data["image_variants"] == {
+        variant: f"http://testserver/api/images/{variant}/{IMAGE}"
+        for variant in VARIANTS
+    }
+    assert listed.data["results"][0] == detail.data
+    assert listed.data["results"][1]["image_variants"] is None
+    assert {task["id"]: task["image_variants"] for task in sparse.data["results"]} == {
+        task["id"]: task["image_variants"] for task in listed.data["results"]
+    }
+
+
+@pytest.mark.django_db
+def test_variant_is_rendered_and_then_served_from_disk(authenticated_user, api_client):
+    # Arrange
+    _save_image()
+    Task.objects.create(title="Photo", image=IMAGE, user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    path = default_storage.path(variant_name(IMAGE, "thumbnail"))
+
+    # Act
+    first = api_client.get(f"/api/images/thumbnail/{IMAGE}")
+    os.utime(path, (0, 0))
+    second = api_client.get(f"/api/images/thumbnail/{IMAGE}")
+
+    # Assert
+    for response in (first, second):
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "image/webp"
+        assert response["Cache-Control"] == "private, max-age=86400"
+    assert b"".join(second.streaming_content) == open(path, "rb").read()
+    # Served variants are kept the longest by eviction
+    assert os.path.getmtime(path) > 0
+
+
+@pytest.mark.django_db
+def test_original_is_served_until_the_variant_is_rendered(
+    authenticated_user, api_client, settings, monkeypatch
+):
+    # Arrange
+    settings.API_IMAGE_VARIANT_WORKERS = 1
+    scheduled = []
+    monkeypatch.setattr(renderer, "schedule", scheduled.append)
+    _save_image()
+    Task.objects.create(title="Photo", image=IMAGE, user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/images/preview/{IMAGE}")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "image/png"
+    assert response["Cache-Control"] == "private, no-cache"
+    assert scheduled == [IMAGE]
+
+
+@pytest.mark.django_db
+def test_variants_are_only_served_to_the_task_owner(authenticated_user, api_client):
+    # Arrange
+    _save_image()
+    Task.objects.create(title="Photo", image=IMAGE, user=authenticated_user)
+    other = get_user_model().objects.create_user(username="other", password="pass")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    foreign = api_client.get(f"/api/images/thumbnail/{IMAGE}")
+    api_client.force_authenticate(user=authenticated_user)
+    unknown = api_client.get(f"/api/images/poster/{IMAGE}")
+
+    # Assert
+    assert foreign.status_code == status.HTTP_404_NOT_FOUND
+    assert unknown.status_code == status.HTTP_404_NOT_FOUND
+    assert missing_variants(IMAGE).keys() == VARIANTS.keys()
+
+
+@pytest.mark.django_db
+def test_saving_an_image_queues_the_rendering_of_its_variants(authenticated_user):
+    # Arrange
+    _save_image()
+
+    # Act
+    task = Task.objects.create(title="Photo", image=IMAGE, user=authenticated_user)
+    job = Job.objects.get()
+    run_job(job)
+    task.save()
+
+    # Assert
+    assert job.name == render_image_variants.job_name
+    assert job.kwargs == {"image_name": IMAGE}
+    assert missing_variants(IMAGE) == {}
+    # Nothing left to render
+    assert not Job.objects.exists()
+
+
+def test_variants_are_rendered_in_the_process_pool(settings):
+    # Arrange
+    settings.API_IMAGE_VARIANT_WORKERS = 1
+    _save_image()
+
+    # Act
+    try:
+        future = schedule_variants(IMAGE)
+        written = future.result(timeout=60)
+        again = schedule_variants(IMAGE)
+    finally:
+        renderer.shutdown()
+
+    # Assert
+    assert written > 0
+    assert again is None
+    assert missing_variants(IMAGE) == {}
+
+
+def test_eviction_deletes_the_least_recently_served_variants():
+    # Arrange
+    paths = []
+    for index in range(4):
+        path = default_storage.path(variant_name(f"{index}.png", "thumbnail"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"x" * 100)
+        os.utime(path, (index, index))
+        paths.append(path)
+    os.utime(paths[0], (10, 10))
+
+    # Act
+    freed = evict_variants(300)
+
+    # Assert
+    assert freed == 200
+    assert [os.path.exists(path) for path in paths] == [True, False, False, True]
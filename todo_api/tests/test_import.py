@@ -0,0 +1,268 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+
+from todo_api.importer import TaskImporter
+from todo_api.models import Tag, Task
+from todo_api.parsers import iter_ndjson
+
+
+def _ndjson(*rows):
+    return "".join(
+        (row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows
+    )
+
+
+def _import(client, body, content_type="application/x-ndjson"):
+    return client.post("/api/tasks/import/", data=body, content_type=content_type)
+
+
+@pytest.mark.django_db
+def test_import_ndjson_creates_tasks_and_tags(authenticated_user, api_client):
+    # Arrange
+    existing = Tag.objects.create(name="work", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    body = _ndjson(
+        {"title": "Write report", "priority": 1, "tags": ["work", "urgent"]},
+        {"title": "Buy milk", "completed": True, "extra_data": {"store": "corner"}},
+        {"title": "Call", "finish_at": "2030-01-01T10:00:00Z", "tags": ["urgent"]},
+    )
+
+    # Act
+    response = _import(api_client, body)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        "processed": 3,
+        "created": 3,
+        "failed": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    tasks = {task.title: task for task in Task.objects.filter(user=authenticated_user)}
+    assert tasks["Write report"].priority == 1
+    assert tasks["Buy milk"].completed is True
+    assert tasks["Buy milk"].extra_data == {"store": "corner"}
+    assert tasks["Call"].finish_at.year == 2030
+    urgent = Tag.objects.get(name="urgent", user=authenticated_user)
+    assert set(tasks["Write report"].tags.all()) == {existing, urgent}
+    assert list(tasks["Call"].tags.all()) == [urgent]
+    assert Tag.objects.filter(user=authenticated_user).count() == 2
+
+
+@pytest.mark.django_db
+def test_import_reports_invalid_rows_and_keeps_valid_ones(
+    authenticated_user, api_client
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    body = _ndjson(
+        {"title": "Valid"},
+        "",
+        "{not json",
+        "[1, 2]",
+        {"title": "Bad priority", "priority": 7},
+        {"description": "No title"},
+        {"title": "Also valid", "id": 999},
+    )
+
+    # Act
+    response = _import(api_client, body)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["processed"] == 6
+    assert response.data["created"] == 2
+    assert response.data["failed"] == 4
+    errors = {error["line"]: error["errors"] for error in response.data["errors"]}
+    assert sorted(errors) == [3, 4, 5, 6]
+    assert errors[3].startswith("Invalid JSON")
+    assert "priority" in errors[5]
+    assert "title" in errors[6]
+    assert sorted(Task.objects.values_list("title", flat=True)) == [
+        "Also valid",
+        "Valid",
+    ]
+    assert not Task.objects.filter(pk=999).exists()
+
+
+@pytest.mark.django_db
+def test_import_csv(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    body = (
+        "title,priority,completed,tags,extra_data\r\n"
+        'First,1,true,"home, errands","{""a"": 1}"\r\n'
+        'Second,,false,"[""home""]",\r\n'
+        "\r\n"
+        "Third,9,,,\r\n"
+    )
+
+    # Act
+    response = _import(api_client, body, content_type="text/csv")
+
+    # Assert
+    assert response.data["created"] == 2
+    assert [error["line"] for error in response.data["errors"]] == [5]
+    first = Task.objects.get(title="First")
+    assert first.completed is True
+    assert first.extra_data == {"a": 1}
+    assert sorted(first.tags.values_list("name", flat=True)) == ["errands", "home"]
+    second = Task.objects.get(title="Second")
+    assert second.priority == 2
+    assert list(second.tags.values_list("name", flat=True)) == ["home"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_import_round_trips_export(authenticated_user, api_client, fmt):
+    # Arrange
+    tag = Tag.objects.create(name="Tag", user=authenticated_user)
+    task = Task.objects.create(
+        title="Exported",
+        description="With tags",
+        priority=3,
+        extra_data={"nested": [1, 2]},
+        related_url="https://example.com",
+        user=authenticated_user,
+    )
+    task.tags.set([tag])
+    api_client.force_authenticate(user=authenticated_user)
+    exported = b"".join(
+        api_client.get(f"/api/tasks/export/?format={fmt}").streaming_content
+    )
+
+    # Act
+    response = _import(
+        api_client,
+        exported,
+        content_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+    )
+
+    # Assert
+    assert response.data["created"] == 1, response.data
+    imported = Task.objects.exclude(pk=task.pk).get()
+    for field in ["title", "description", "priority", "extra_data", "related_url"]:
+        assert getattr(imported, field) == getattr(task, field)
+    assert list(imported.tags.all()) == [tag]
+
+
+@pytest.mark.django_db
+def test_import_multipart_file(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    upload = SimpleUploadedFile("tasks.csv", b"title\r\nUploaded\r\n")
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/import/", {"file": upload}, format="multipart"
+    )
+
+    # Assert
+    assert response.data["created"] == 1
+    assert Task.objects.get().title == "Uploaded"
+
+
+@pytest.mark.django_db
+def test_import_multipart_without_file(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post("/api/tasks/import/", {}, format="multipart")
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "file" in response.data
+
+
+@pytest.mark.django_db
+def test_import_invalidates_cached_lists(
+    authenticated_user, api_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    assert api_client.get("/api/tasks/").data["results"] == []
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        _import(api_client, _ndjson({"title": "Imported"}))
+
+    # Assert
+    results = api_client.get("/api/tasks/").data["results"]
+    assert [task["title"] for task in results] == ["Imported"]
+
+
+@pytest.mark.django_db
+def test_import_unsupported_media_type(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post("/api/tasks/import/", [], format="json")
+
+    # Assert
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+
+@pytest.mark.django_db
+def test_import_requires_authentication(api_client):
+    # Act
+    response = _import(api_client, _ndjson({"title": "Anonymous"}))
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_importer_writes_in_batches(
+    authenticated_user, django_assert_max_num_queries, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(TaskImporter, "max_errors", 1)
+    progress = []
+    importer = TaskImporter(
+        authenticated_user,
+        batch_size=4,
+        on_batch=lambda report: progress.append(report["created"]),
+    )
+    body = _ndjson(
+        *({"title": f"Task {i}", "tags": [f"Tag {i % 3}"]} for i in range(10)),
+        {"priority": 1},
+        {"priority": 2},
+    )
+
+    # Act
+    with django_assert_max_num_queries(3 * 8):  # per batch, whatever its size
+        report = importer.run(iter_ndjson(body.encode().splitlines(keepends=True)))
+
+    # Assert
+    assert progress == [4, 8, 10]
+    assert report["failed"] == 2
+    assert len(report["errors"]) == 1
+    assert report["errors_truncated"] is True
+    assert Task.objects.count() == 10
+    assert Tag.objects.count() == 3
+    assert Task.tags.through.objects.count() == 10
+
+
+@pytest.mark.django_db
+def test_import_tasks_command(authenticated_user, tmp_path):
+    # Arrange
+    path = tmp_path / "tasks.csv"
+    path.write_text("title,tags\nFrom file,cli\n,\nNo tags,\n")
+    out, err = StringIO(), StringIO()
+
+    # Act
+    call_command("import_tasks", "testuser", str(path), stdout=out, stderr=err)
+
+    # Assert
+    assert "Imported 2 of 2 rows (0 failed)." in out.getvalue()
+    assert err.getvalue() == ""
+    assert Task.objects.get(title="From file").tags.get().name == "cli"
@@ -0,0 +1,159 @@
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+from todo_api.logs import (
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    ProcessSafeRotatingFileHandler,
+)
+
+
+class BlockingHandler(logging.Handler):
+    """Keeps the records it handles, once ``unblocked`` is set."""
+
+    def __init__(self, name):
+        super().__init__()
+        self.set_name(name)
+        self.unblocked = threading.Event()
+        self.records = []
+
+    def emit(self, record):
+        self.unblocked.wait(10)
+        self.records.append(record)
+
+
+def _record(message, level=logging.INFO, **extra):
+    logger = logging.getLogger("todo_api.tests")
+    return logger.makeRecord(
+        logger.name, level, __file__, 1, message, (), None, extra=extra
+    )
+
+
+@pytest.fixture
+def blocking_handler():
+    handler = BlockingHandler("blocking")
+    yield handler
+    handler.unblocked.set()
+    handler.close()
+
+
+def test_json_formatter_writes_one_line_with_extra_values():
+    # Arrange
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = _record("Failed for %s", logging.ERROR, user_id=7)
+        record.args = ("someone",)
+        record.exc_info = sys.exc_info()
+
+    # Act
+    line = JSONFormatter().format(record)
+
+    # Assert
+    assert "\n" not in line
+    data = json.loads(line)
+    assert data["level"] == "ERROR"
+    assert data["logger"] == "todo_api.tests"
+    assert data["message"] == "Failed for someone"
+    assert data["user_id"] == 7
+    assert "ZeroDivisionError" in data["exception"]
+
+
+def test_processes_share_and_rotate_one_file(tmp_path):
+    # Arrange
+    path = tmp_path / "debug.log"
+    # As if opened by two server processes
+    handlers = [
+        ProcessSafeRotatingFileHandler(str(path), maxBytes=1000, backupCount=50)
+        for _ in range(2)
+    ]
+    for handler in handlers:
+        handler.setFormatter(JSONFormatter())
+
+    # Act
+    for i in range(0, 100, 10):
+        for j in range(i, i + 5):
+            handlers[0].handle(_record(f"Record {j}"))
+        # As the listener passes them on
+        handlers[1].handle_batch([_record(f"Record {j}") for j in range(i + 5, i + 10)])
+    for handler in handlers:
+        handler.close()
+
+    # Assert
+    files = sorted(tmp_path.glob("debug.log*"))
+    lines = [
+        json.loads(line)["message"]
+        for file in files
+        if not file.name.endswith(".lock")
+        for line in file.read_text().splitlines()
+    ]
+    assert sorted(lines) == sorted(f"Record {i}" for i in range(100))
+    assert len(files) > 3
+    assert all(
+        file.stat().st_size <= 1000 for file in files if not file.name.endswith(".lock")
+    )
+
+
+def test_queue_handler_drops_records_instead_of_blocking(blocking_handler):
+    # Arrange
+    handler = NonBlockingQueueHandler(["blocking"], queue_size=4, sample_rate=2)
+
+    # Act
+    try:
+        # The listener takes the first record and blocks in the handler
+        handler.handle(_record("First"))
+        while handler.queue.qsize():
+            pass
+        for i in range(20):
+            handler.handle(_record(f"Record {i}"))
+        handler.handle(_record("Warning", logging.WARNING))
+        dropped = handler.dropped
+        blocking_handler.unblocked.set()
+        while handler.queue.qsize():
+            pass
+        handler.handle(_record("Last"))
+    finally:
+        handler.close()
+
+    # Assert
+    messages = [record.getMessage() for record in blocking_handler.records]
+    assert messages[0] == "First"
+    # Two records, then one in two below WARNING, until the queue was full
+    assert messages[1:5] == ["Record 0", "Record 1", "Record 3", "Record 5"]
+    assert "Warning" not in messages
+    assert dropped == 17
+    assert messages[-2:] == ["Last", "Dropped 17 log records to keep up with the load"]
+    assert len(messages) == 1 + 4 + 2
+
+
+def test_queue_handler_leaves_the_record_to_other_handlers(blocking_handler):
+    # Arrange
+    logger = logging.getLogger("todo_api.tests.shared")
+    handler = NonBlockingQueueHandler(["blocking"])
+    records = []
+    other = logging.Handler()
+    other.emit = records.append
+    logger.addHandler(handler)
+    logger.addHandler(other)
+    blocking_handler.unblocked.set()
+
+    # Act
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Failed for %s", "someone")
+    finally:
+        logger.removeHandler(handler)
+        logger.removeHandler(other)
+        handler.close()
+
+    # Assert
+    assert records[0].exc_info[0] is ZeroDivisionError
+    assert records[0].args == ("someone",)
+    queued = blocking_handler.records[0]
+    assert queued.getMessage() == "Failed for someone"
+    assert "ZeroDivisionError" in queued.exc_text
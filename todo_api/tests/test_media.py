@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from rest_framework import status
+
+from todo_api.images import variant_name
+from todo_api.models import Task, Upload
+
+ATTACHMENT = "tasks/attachments/my notes.txt"
+IMAGE = "tasks/images/photo.png"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.API_MEDIA_ACCEL_REDIRECT = ""
+    return tmp_path
+
+
+def _store(name, content):
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+@pytest.fixture
+def task(authenticated_user):
+    _store(ATTACHMENT, b"notes")
+    _store(IMAGE, b"not really a png")
+    return Task.objects.create(
+        title="Files", attachment=ATTACHMENT, image=IMAGE, user=authenticated_user
+    )
+
+
+@pytest.mark.django_db
+def test_owner_downloads_task_files_with_one_query(
+    task, api_client, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=task.user)
+    links = api_client.get(f"/api/tasks/{task.pk}/").data
+
+    # Act
+    with django_assert_num_queries(1):
+        attachment = api_client.get(links["attachment"])
+    image = api_client.get(links["image"])
+
+    # Assert
+    assert attachment.status_code == status.HTTP_200_OK
+    assert b"".join(attachment.streaming_content) == b"notes"
+    assert attachment["Content-Type"] == "text/plain"
+    assert attachment["Content-Disposition"] == 'attachment; filename="my notes.txt"'
+    assert image["Content-Type"] == "image/png"
+    assert image["Content-Disposition"] == 'inline; filename="photo.png"'
+
+
+@pytest.mark.django_db
+def test_files_of_other_users_are_not_found(task, api_client):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other", password="pass")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    foreign = api_client.get(f"/api/media/{ATTACHMENT}")
+    unknown = api_client.get("/api/media/tasks/attachments/missing.txt")
+
+    # Assert
+    assert foreign.status_code == status.HTTP_404_NOT_FOUND
+    assert foreign.data == {"error": "File not found"}
+    assert unknown.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_upload_owner_downloads_the_upload(authenticated_user, api_client):
+    # Arrange
+    _store("uploads/ab/abc.txt", b"uploaded")
+    Upload.objects.create(
+        user=authenticated_user,
+        filename="a.txt",
+        size=8,
+        offset=8,
+        file="uploads/ab/abc.txt",
+    )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get("/api/media/uploads/ab/abc.txt")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert b"".join(response.streaming_content) == b"uploaded"
+
+
+@pytest.mark.django_db
+def test_accel_redirect_hands_the_file_to_nginx(task, api_client, settings):
+    # Arrange
+    settings.API_MEDIA_ACCEL_REDIRECT = "/protected-media/"
+    api_client.force_authenticate(user=task.user)
+    _store(variant_name(IMAGE, "thumbnail"), b"webp")
+
+    # Act
+    attachment = api_client.get(f"/api/media/{ATTACHMENT}")
+    thumbnail = api_client.get(f"/api/images/thumbnail/{IMAGE}")
+
+    # Assert
+    assert attachment.status_code == status.HTTP_200_OK
+    assert attachment.content == b""
+    assert attachment["X-Accel-Redirect"] == (
+        "/protected-media/tasks/attachments/my%20notes.txt"
+    )
+    assert attachment["Content-Type"] == "text/plain"
+    assert attachment["Cache-Control"] == "private, max-age=86400"
+    assert thumbnail["X-Accel-Redirect"] == "/protected-media/" + variant_name(
+        IMAGE, "thumbnail"
+    )
+    assert thumbnail["Content-Type"] == "image/webp"
@@ -0,0 +1,148 @@
+import re
+
+import pytest
+from rest_framework import status
+
+from todo_api.metrics import (
+    REQUEST_DURATION,
+    REQUESTS,
+    MmapStore,
+    collect,
+    get_store,
+    inc,
+    observe,
+    render_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.API_METRICS_DIR = str(tmp_path)
+    settings.API_METRICS_TOKEN = "scraper-token"
+    return tmp_path
+
+
+def _samples(text):
+    return {
+        name: float(value)
+        for name, value in re.findall(r"^(\S+) (\S+)$", text, re.MULTILINE)
+    }
+
+
+def _sample(name, **labels):
+    pairs = ",".join(f'{label}="{value}"' for label, value in labels.items())
+    return f"{name}{{{pairs}}}"
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_by_view(
+    authenticated_user, api_client, create_tasks, client
+):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+    api_client.get("/api/tasks/")
+    api_client.post("/api/tasks/", {"title": "New"}, format="json")
+    api_client.get("/api/tasks/0/")
+
+    # Act
+    response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer scraper-token")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.content.decode())
+    requests = "todo_api_requests_total"
+    listed = {"view": "task-list-create", "method": "GET"}
+    assert samples[_sample(requests, **listed, status=200)] == 2
+    assert (
+        samples[_sample(requests, view="task-list-create", method="POST", status=201)]
+        == 1
+    )
+    assert (
+        samples[
+            _sample(requests, view="task-get-update-delete", method="GET", status=404)
+        ]
+        == 1
+    )
+    assert samples[_sample("todo_api_request_duration_seconds_count", **listed)] == 2
+    assert samples[_sample("todo_api_request_duration_seconds_sum", **listed)] > 0
+    assert samples[_sample("todo_api_request_queries_total", **listed)] >= 2
+    assert samples[_sample("todo_api_request_query_seconds_total", **listed)] > 0
+    assert samples[_sample("todo_api_response_bytes_total", **listed)] > 0
+
+
+@pytest.mark.parametrize(
+    "token, authorization, expected",
+    [
+        ("", "Bearer ", status.HTTP_404_NOT_FOUND),
+        ("scraper-token", None, status.HTTP_403_FORBIDDEN),
+        ("scraper-token", "Bearer other-token", status.HTTP_403_FORBIDDEN),
+        ("scraper-token", "scraper-token", status.HTTP_403_FORBIDDEN),
+    ],
+)
+def test_metrics_require_the_token(client, settings, token, authorization, expected):
+    # Arrange
+    settings.API_METRICS_TOKEN = token
+    headers = {} if authorization is None else {"HTTP_AUTHORIZATION": authorization}
+
+    # Act
+    response = client.get("/metrics", **headers)
+
+    # Assert
+    assert response.status_code == expected
+    assert b"todo_api_requests_total" not in response.content
+
+
+def test_histogram_buckets_are_cumulative(metrics_dir):
+    # Arrange
+    labels = {"view": "task-list-create", "method": "GET"}
+    for value in (0.001, 0.02, 0.02, 30):
+        observe(get_store(), REQUEST_DURATION, tuple(labels.values()), value)
+
+    # Act
+    samples = _samples(render_metrics(collect(str(metrics_dir))))
+
+    # Assert
+    bucket = "todo_api_request_duration_seconds_bucket"
+    assert samples[_sample(bucket, **labels, le=0.005)] == 1
+    assert samples[_sample(bucket, **labels, le=0.01)] == 1
+    assert samples[_sample(bucket, **labels, le=0.025)] == 3
+    assert samples[_sample(bucket, **labels, le=10.0)] == 3
+    assert samples[_sample(bucket, **labels, le="+Inf")] == 4
+    assert samples[_sample("todo_api_request_duration_seconds_count", **labels)] == 4
+
+
+def test_values_of_all_processes_are_summed(metrics_dir):
+    # Arrange
+    labels = ("task-stats", "GET", "200")
+    inc(get_store(), REQUESTS, labels, 2)
+    other = MmapStore(str(metrics_dir / "12345.db"))
+    # Enough keys to grow the other process's file
+    for index in range(MmapStore.INITIAL_SIZE // 32):
+        inc(other, REQUESTS, (f"view-{index}", "GET", "200"))
+    inc(other, REQUESTS, labels, 3)
+    other.close()
+
+    # Act
+    values = collect(str(metrics_dir))
+    reopened = MmapStore(str(metrics_dir / "12345.db"))
+
+    # Assert
+    assert values[(REQUESTS.name, labels)] == 5
+    assert values[(REQUESTS.name, ("view-0", "GET", "200"))] == 1
+    assert len(reopened.positions) == MmapStore.INITIAL_SIZE // 32 + 1
+
+
+def test_label_values_are_escaped(metrics_dir):
+    # Arrange
+    inc(get_store(), REQUESTS, ('a"b\\c', "GET", "200"))
+
+    # Act
+    text = render_metrics(collect(str(metrics_dir)))
+
+    # Assert
+    assert (
+        r'todo_api_requests_total{view="a\"b\\c",method="GET",status="200"} 1' in text
+    )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from todo_api.models import Task
+
+
+def _collect_pages(client, url):
+    """Follow ``next`` links and return every page of results."""
+    pages = []
+    while url:
+        assert len(pages) < 100, "pagination does not terminate"
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data["results"])
+        url = response.data["next"]
+    return pages
+
+
+@pytest.mark.django_db
+def test_task_list_paginates_every_task_once(
+    authenticated_user, api_client, create_tasks
+):
+    # Arrange
+    create_tasks(authenticated_user, 7)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    pages = _collect_pages(api_client, "/api/tasks/?page_size=3")
+
+    # Assert
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [task["id"] for page in pages for task in page]
+    expected = list(
+        Task.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+    )
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_task_list_cursor_is_stable_on_ties(authenticated_user, api_client):
+    # Arrange
+    for i in range(9):
+        Task.objects.create(
+            title=f"Task {i}", priority=i % 3 + 1, user=authenticated_user
+        )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    pages = _collect_pages(api_client, "/api/tasks/?ordering=priority&page_size=2")
+
+    # Assert
+    ids = [task["id"] for page in pages for task in page]
+    expected = list(
+        Task.objects.order_by("priority", "id").values_list("id", flat=True)
+    )
+    assert ids == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["finish_at", "-finish_at"])
+def test_task_list_cursor_handles_null_values(authenticated_user, api_client, ordering):
+    # Arrange
+    now = timezone.now()
+    for i in range(6):
+        Task.objects.create(
+            title=f"Task {i}",
+            finish_at=now + timedelta(days=i) if i % 2 else None,
+            user=authenticated_user,
+        )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    pages = _collect_pages(api_client, f"/api/tasks/?ordering={ordering}&page_size=2")
+
+    # Assert
+    finish_at = [task["finish_at"] for page in pages for task in page]
+    assert len(finish_at) == 6
+    dated, undated = finish_at[:3], finish_at[3:]
+    if ordering.startswith("-"):
+        dated, undated = finish_at[3:], finish_at[:3]
+        dated.reverse()
+    assert undated == [None, None, None]
+    assert dated == sorted(dated)
+
+
+@pytest.mark.django_db
+def test_task_list_previous_link_returns_previous_page(
+    authenticated_user, api_client, create_tasks
+):
+    # Arrange
+    create_tasks(authenticated_user, 5)
+    api_client.force_authenticate(user=authenticated_user)
+    first = api_client.get("/api/tasks/?page_size=2")
+    second = api_client.get(first.data["next"])
+
+    # Act
+    response = api_client.get(second.data["previous"])
+
+    # Assert
+    assert first.data["previous"] is None
+    assert response.data["results"] == first.data["results"]
+    assert response.data["next"] is not None
+
+
+@pytest.mark.django_db
+def test_task_list_cursor_keeps_filters(authenticated_user, api_client):
+    # Arrange
+    for i in range(6):
+        Task.objects.create(
+            title=f"Errand {i}", completed=bool(i % 2), user=authenticated_user
+        )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    pages = _collect_pages(
+        api_client, "/api/tasks/?completed=true&search=Errand&page_size=1"
+    )
+
+    # Assert
+    assert len(pages) == 3
+    assert all(page[0]["completed"] for page in pages)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, test_id",
+    [
+        ("cursor=not-a-cursor", "garbage-cursor"),
+        ("cursor=eyJvIjpbImlkIl0sInAiOlsxXX0=", "cursor-for-other-ordering"),
+    ],
+)
+def test_task_list_invalid_cursor(authenticated_user, api_client, query, test_id):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/?{query}")
+
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_tag_list_paginates_by_name(authenticated_user, api_client, create_tags):
+    # Arrange
+    create_tags(authenticated_user, 5)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    pages = _collect_pages(api_client, "/api/tags/?page_size=2")
+
+    # Assert
+    names = [tag["name"] for page in pages for tag in page]
+    assert names == [f"Tag {i}" for i in range(5)]
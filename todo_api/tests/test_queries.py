@@ -0,0 +1,243 @@
+import pytest
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+
+
+def _create_tagged_tasks(user, num_tasks, num_tags):
+    tags = [Tag.objects.create(name=f"Tag {i}", user=user) for i in range(num_tags)]
+    for i in range(num_tasks):
+        Task.objects.create(title=f"Task {i}", user=user).tags.set(tags)
+    return tags
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_tasks, num_tags", [(1, 1), (5, 3), (20, 10)])
+def test_task_list_query_count_is_constant(
+    authenticated_user, api_client, django_assert_num_queries, num_tasks, num_tags
+):
+    # Arrange
+    _create_tagged_tasks(authenticated_user, num_tasks, num_tags)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # ETag fingerprints (tasks, tags) + tasks page + tags prefetch
+    with django_assert_num_queries(4):
+        response = api_client.get("/api/tasks/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == num_tasks
+    assert all(len(t["tags_detail"]) == num_tags for t in response.data["results"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_tags", [1, 10])
+def test_task_retrieve_query_count_is_constant(
+    authenticated_user, api_client, django_assert_num_queries, num_tags
+):
+    # Arrange
+    _create_tagged_tasks(authenticated_user, 1, num_tags)
+    task = Task.objects.get()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with django_assert_num_queries(2):
+        response = api_client.get(f"/api/tasks/{task.pk}/")
+
+    # Assert
+    assert len(response.data["tags_detail"]) == num_tags
+
+
+@pytest.mark.django_db
+def test_task_create_response_does_not_requery(
+    authenticated_user, api_client, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # insert + counters upsert, in a savepoint under the test's transaction
+    with django_assert_num_queries(2 + 2):
+        response = api_client.post("/api/tasks/", {"title": "Groceries"}, format="json")
+
+    # Assert
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["tags_detail"] == []
+
+
+@pytest.mark.django_db
+def test_task_create_with_tags_returns_tags(authenticated_user, api_client):
+    # Arrange
+    tags = _create_tagged_tasks(authenticated_user, 0, 3)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/",
+        {"title": "Groceries", "tags": [tag.pk for tag in tags]},
+        format="json",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [t["name"] for t in response.data["tags_detail"]] == [
+        tag.name for tag in tags
+    ]
+    assert Task.objects.get().tags.count() == 3
+
+
+@pytest.mark.django_db
+def test_task_partial_update_keeps_prefetched_tags(
+    authenticated_user, api_client, django_assert_num_queries
+):
+    # Arrange
+    _create_tagged_tasks(authenticated_user, 1, 5)
+    task = Task.objects.get()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # task + tags prefetch + locked task + update, in a savepoint; no
+    # counter changed
+    with django_assert_num_queries(4 + 2):
+        response = api_client.patch(
+            f"/api/tasks/{task.pk}/", {"title": "Renamed"}, format="json"
+        )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["tags_detail"]) == 5
+
+
+@pytest.mark.django_db
+def test_task_update_returns_new_tags(authenticated_user, api_client):
+    # Arrange
+    tags = _create_tagged_tasks(authenticated_user, 1, 3)
+    task = Task.objects.get()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.patch(
+        f"/api/tasks/{task.pk}/", {"tags": [tags[0].pk]}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert [t["id"] for t in response.data["tags_detail"]] == [tags[0].pk]
+    assert list(task.tags.values_list("pk", flat=True)) == [tags[0].pk]
+
+
+@pytest.mark.django_db
+def test_task_mark_as_completed_query_count(
+    authenticated_user, api_client, django_assert_num_queries
+):
+    # Arrange
+    _create_tagged_tasks(authenticated_user, 1, 4)
+    task = Task.objects.get()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # update returning the task + counters upsert, in a savepoint, then tags
+    with django_assert_num_queries(2 + 2 + 1):
+        response = api_client.post(f"/api/tasks/{task.pk}/complete/")
+
+    # Assert
+    assert response.data["completed"]
+    assert len(response.data["tags_detail"]) == 4
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_tags", [1, 50])
+def test_task_create_with_tags_query_count_is_constant(
+    authenticated_user, api_client, django_assert_num_queries, num_tags
+):
+    # Arrange
+    tags = _create_tagged_tasks(authenticated_user, 0, num_tags)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # tags lookup, then task + tag rows + counters upsert, in a savepoint
+    with django_assert_num_queries(4 + 2):
+        response = api_client.post(
+            "/api/tasks/",
+            {"title": "Groceries", "tags": [tag.pk for tag in tags]},
+            format="json",
+        )
+
+    # Assert
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(response.data["tags_detail"]) == num_tags
+    assert Task.objects.get().tags.count() == num_tags
+
+
+@pytest.mark.django_db
+def test_task_create_reports_every_unknown_tag(authenticated_user, api_client):
+    # Arrange
+    own = Tag.objects.create(name="Own", user=authenticated_user)
+    other = type(authenticated_user).objects.create_user(username="other")
+    foreign = Tag.objects.create(name="Foreign", user=other)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/",
+        {"title": "Groceries", "tags": [own.pk, foreign.pk, 9999, own.pk]},
+        format="json",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["tags"] == [f"Tags not found: {[foreign.pk, 9999]}"]
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("tags", ["1", [True], ["x"], [{"id": 1}]])
+def test_task_create_rejects_malformed_tags(authenticated_user, api_client, tags):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/", {"title": "Groceries", "tags": tags}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "tags" in response.data
+
+
+@pytest.mark.django_db
+def test_task_update_only_writes_changed_tags(
+    authenticated_user, api_client, django_assert_num_queries
+):
+    # Arrange
+    tags = _create_tagged_tasks(authenticated_user, 1, 4)
+    task = Task.objects.get()
+    kept = set(Task.tags.through.objects.filter(tag__in=tags[:2]).values_list("pk"))
+    extra = Tag.objects.create(name="Extra", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    # task + tags prefetch + tags lookup + locked task + current tags +
+    # delete + insert + update + counters upsert, in a savepoint
+    with django_assert_num_queries(9 + 2):
+        response = api_client.patch(
+            f"/api/tasks/{task.pk}/",
+            {"tags": [tags[0].pk, tags[1].pk, extra.pk]},
+            format="json",
+        )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert {t["id"] for t in response.data["tags_detail"]} == {
+        tags[0].pk,
+        tags[1].pk,
+        extra.pk,
+    }
+    assert kept <= set(Task.tags.through.objects.values_list("pk"))
+    assert set(task.tags.values_list("pk", flat=True)) == {
+        tags[0].pk,
+        tags[1].pk,
+        extra.pk,
+    }
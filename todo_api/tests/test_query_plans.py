@@ -0,0 +1,137 @@
+import json
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from todo_api.models import Task
+from todo_api.tree import MAX_TREE_DEPTH, subtree_cte
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Query plans are PostgreSQL specific"
+)
+
+NUM_USERS = 50
+TASKS_PER_USER = 400
+FORBIDDEN_NODES = {"Seq Scan", "Sort", "Incremental Sort"}
+
+
+@pytest.fixture(scope="module")
+def seeded_user(django_db_setup, django_db_blocker):
+    """Seeds a large dataset outside the per-test transaction and ANALYZEs it."""
+    with django_db_blocker.unblock():
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(username=f"plan-user-{i}") for i in range(NUM_USERS)
+        )
+        rng = random.Random(0)
+        now = timezone.now()
+        tasks = [
+            Task(
+                user=user,
+                title=f"Task {i}",
+                priority=rng.randint(1, 3),
+                completed=rng.random() < 0.5,
+                finish_at=(
+                    now + timedelta(hours=rng.randint(-500, 500))
+                    if rng.random() < 0.7
+                    else None
+                ),
+            )
+            for user in users
+            for i in range(TASKS_PER_USER)
+        ]
+        Task.objects.bulk_create(tasks, batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE todo_api_task")
+        try:
+            yield users[0]
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+
+def _plan_nodes(plan):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def _explain_page_query(client, url):
+    """
+    Runs the request and EXPLAINs the SQL that fingerprinted and loaded the
+    page of tasks.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    task_queries = [
+        query["sql"]
+        for query in context.captured_queries
+        if 'FROM "todo_api_task"' in query["sql"]
+    ]
+    assert len(task_queries) == 2  # ETag fingerprint + page
+    return response, [_explain(sql) for sql in task_queries]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "ordering=created_at",
+        "ordering=priority",
+        "ordering=-priority",
+        "ordering=finish_at",
+        "ordering=-finish_at",
+        "completed=false",
+        "completed=true",
+        "priority=1",
+        "completed=false&priority=1",
+        "completed=true&priority=3&ordering=created_at",
+        "completed=false&ordering=finish_at",
+    ],
+)
+def test_task_list_plans_use_indexes(seeded_user, query):
+    # Arrange
+    client = APIClient()
+    client.force_authenticate(user=seeded_user)
+    url = f"/api/tasks/?{query}"
+
+    # Act
+    first_response, first_plans = _explain_page_query(client, url)
+    _, next_plans = _explain_page_query(client, first_response.data["next"])
+
+    # Assert
+    for plan in first_plans + next_plans:
+        nodes = set(_plan_nodes(plan))
+        assert not nodes & FORBIDDEN_NODES, json.dumps(plan, indent=2)
+
+
+@pytest.mark.django_db
+def test_subtree_walk_uses_indexes(seeded_user):
+    # Arrange
+    root = Task.objects.filter(user=seeded_user).first()
+    cte, params = subtree_cte([root.pk], seeded_user.pk, MAX_TREE_DEPTH)
+    with connection.cursor() as cursor:
+        sql = cursor.mogrify(f"{cte} SELECT id FROM subtree", params)
+
+    # Act
+    plan = _explain(sql.decode() if isinstance(sql, bytes) else sql)
+
+    # Assert
+    assert "Seq Scan" not in set(_plan_nodes(plan)), json.dumps(plan, indent=2)
@@ -0,0 +1,142 @@
+import pytest
+from django.db import connection
+from rest_framework import status
+
+from todo_api.models import Task
+from todo_api.search import has_trigram
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Full-text search is PostgreSQL only"
+)
+
+
+def _search(client, query):
+    response = client.get(f"/api/tasks/?{query}")
+    assert response.status_code == status.HTTP_200_OK
+    return [task["title"] for task in response.data["results"]]
+
+
+@pytest.fixture
+def searchable_tasks(authenticated_user):
+    for title, description in [
+        ("Groceries", "Buy milk and cheese"),
+        ("Running shoes", "Return the old pair"),
+        ("Call plumber", "Kitchen sink is leaking"),
+        ("Dentist", "Ask about groceries budget"),
+    ]:
+        Task.objects.create(
+            title=title, description=description, user=authenticated_user
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "search, expected",
+    [
+        ("plumber", ["Call plumber"]),
+        ("milk", ["Groceries"]),
+        ("groc", ["Groceries", "Dentist"]),
+        ("sink leaking", ["Call plumber"]),
+        ("nothing-matches", []),
+    ],
+)
+def test_task_search_matches_title_and_description(
+    authenticated_user, api_client, searchable_tasks, search, expected
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    titles = _search(api_client, f"search={search}")
+
+    # Assert
+    assert sorted(titles) == sorted(expected)
+
+
+@pytest.mark.django_db
+@postgres_only
+def test_task_search_stems_words(authenticated_user, api_client, searchable_tasks):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    titles = _search(api_client, "search=run")
+
+    # Assert
+    assert titles == ["Running shoes"]
+
+
+@pytest.mark.django_db
+@postgres_only
+def test_task_search_ranks_title_matches_first(
+    authenticated_user, api_client, searchable_tasks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    titles = _search(api_client, "search=groceries")
+
+    # Assert
+    assert titles == ["Groceries", "Dentist"]
+
+
+@pytest.mark.django_db
+@postgres_only
+def test_task_search_ordering_overrides_rank(
+    authenticated_user, api_client, searchable_tasks
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    titles = _search(api_client, "search=groceries&ordering=-created_at")
+
+    # Assert
+    assert titles == ["Dentist", "Groceries"]
+
+
+@pytest.mark.django_db
+def test_task_search_paginates_ranked_results(authenticated_user, api_client):
+    # Arrange
+    for i in range(5):
+        Task.objects.create(
+            title="Errand" if i % 2 else f"Task {i}",
+            description="errand",
+            user=authenticated_user,
+        )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    first = api_client.get("/api/tasks/?search=errand&page_size=2")
+    second = api_client.get(first.data["next"])
+    third = api_client.get(second.data["next"])
+
+    # Assert
+    ids = [
+        task["id"]
+        for response in (first, second, third)
+        for task in response.data["results"]
+    ]
+    assert sorted(ids) == sorted(Task.objects.values_list("id", flat=True))
+    assert third.data["next"] is None
+
+
+@pytest.mark.django_db
+@postgres_only
+def test_task_search_tolerates_typos(authenticated_user, api_client, searchable_tasks):
+    # Arrange
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            pytest.skip("pg_trgm is not available")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    has_trigram.cache_clear()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    titles = _search(api_client, "search=plumbr")
+
+    # Assert
+    has_trigram.cache_clear()
+    assert titles == ["Call plumber"]
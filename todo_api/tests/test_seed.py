@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.utils import timezone
+
+from todo_api.models import Tag, Task
+from todo_api.seeding import tasks_per_user
+from todo_api.stats import rebuild_counters
+
+
+def _seed(prefix, *args):
+    call_command("seed_tasks", "--prefix", prefix, *args, stdout=None)
+    return get_user_model().objects.filter(username__startswith=prefix)
+
+
+def test_tasks_are_split_over_users_by_distribution():
+    # Act
+    uniform = tasks_per_user(1000, 7, "uniform")
+    zipf = tasks_per_user(1000, 7, "zipf", exponent=1.1)
+
+    # Assert
+    assert sum(uniform) == sum(zipf) == 1000
+    assert max(uniform) - min(uniform) <= 1
+    assert zipf == sorted(zipf, reverse=True)
+    assert zipf[0] > 3 * zipf[-1]
+
+
+@pytest.mark.django_db
+def test_seed_tasks_creates_consistent_data():
+    # Act
+    users = _seed("seed-", "--users", "3", "--tasks", "250", "--batch-size", "40")
+
+    # Assert
+    assert users.count() == 3
+    tasks = Task.objects.filter(user__in=users)
+    assert tasks.count() == 250
+    assert Tag.objects.filter(user__in=users).count() == 60
+    links = Task.tags.through.objects.filter(task__in=tasks)
+    assert links.exists()
+    assert not links.exclude(tag__user=F("task__user")).exists()
+    # Dates are spread over the past year, not set at insert time
+    assert tasks.filter(created_at__lt=timezone.now() - timedelta(days=30)).exists()
+    assert rebuild_counters(users, dry_run=True) == {}
+
+
+@pytest.mark.django_db
+def test_seed_tasks_is_reproducible():
+    # Act
+    first = _seed("first-", "--users", "2", "--tasks", "50", "--seed", "7")
+    second = _seed("second-", "--users", "2", "--tasks", "50", "--seed", "7")
+
+    # Assert
+    def titles(users):
+        return list(
+            Task.objects.filter(user__in=users)
+            .order_by("user__username", "pk")
+            .values_list("title", "priority", "completed")
+        )
+
+    assert titles(first) == titles(second)
+
+
+@pytest.mark.django_db
+def test_seed_tasks_refuses_existing_users():
+    # Arrange
+    _seed("seed-", "--users", "1", "--tasks", "1")
+
+    # Act / Assert
+    with pytest.raises(CommandError, match="already exist"):
+        _seed("seed-", "--users", "1", "--tasks", "1")
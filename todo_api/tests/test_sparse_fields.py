@@ -0,0 +1,183 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+
+
+@pytest.fixture
+def tagged_task(authenticated_user):
+    tag = Tag.objects.create(name="Tag", user=authenticated_user)
+    task = Task.objects.create(
+        title="Task",
+        description="Long description",
+        extra_data={"key": "value"},
+        user=authenticated_user,
+    )
+    task.tags.set([tag])
+    return task
+
+
+def _task_query(queries):
+    table = Task._meta.db_table
+    return next(
+        query["sql"]
+        for query in queries
+        if f'FROM "{table}"' in query["sql"] and "MAX(" not in query["sql"]
+    )
+
+
+@pytest.mark.django_db
+def test_task_list_fields(authenticated_user, api_client, tagged_task):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/tasks/?fields=id,title,completed")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [
+        {"id": tagged_task.pk, "title": "Task", "completed": False}
+    ]
+    # Fingerprints of tasks and tags, then the page, without reading tags
+    assert len(queries) == 3
+    sql = _task_query(queries.captured_queries)
+    assert '"description"' not in sql
+    assert '"extra_data"' not in sql
+
+
+@pytest.mark.django_db
+def test_task_list_omit(authenticated_user, api_client, tagged_task):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    full = api_client.get("/api/tasks/").data["results"][0]
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/tasks/?omit=description,extra_data")
+
+    # Assert
+    task = response.data["results"][0]
+    assert list(task) == [
+        name for name in full if name not in ("description", "extra_data")
+    ]
+    assert task["tags_detail"] == full["tags_detail"]
+    assert '"description"' not in _task_query(queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_task_list_fields_and_omit(authenticated_user, api_client, tagged_task):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get("/api/tasks/?fields=id,title,priority&omit=priority")
+
+    # Assert
+    assert list(response.data["results"][0]) == ["id", "title"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["finish_at", "-priority", "created_at"])
+def test_task_list_sparse_pages(authenticated_user, api_client, create_tasks, ordering):
+    # Arrange
+    create_tasks(authenticated_user, 5)
+    api_client.force_authenticate(user=authenticated_user)
+    url = f"/api/tasks/?fields=title&ordering={ordering}&page_size=2"
+
+    # Act
+    titles = []
+    while url:
+        response = api_client.get(url)
+        titles += [task["title"] for task in response.data["results"]]
+        url = response.data["next"]
+
+    # Assert
+    assert sorted(titles) == [f"Task {i}" for i in range(5)]
+
+
+@pytest.mark.django_db
+def test_task_detail_fields(
+    authenticated_user, api_client, tagged_task, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    url = f"/api/tasks/{tagged_task.pk}/?fields=title,completed"
+
+    # Act
+    with django_assert_num_queries(1):  # the task, without its tags
+        response = api_client.get(url)
+    not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    # Assert
+    assert response.data == {"title": "Task", "completed": False}
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    full = api_client.get(f"/api/tasks/{tagged_task.pk}/")
+    assert full["ETag"] != response["ETag"]
+
+
+@pytest.mark.django_db
+def test_task_detail_with_tags(authenticated_user, api_client, tagged_task):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{tagged_task.pk}/?fields=tags_detail")
+
+    # Assert
+    assert [tag["name"] for tag in response.data["tags_detail"]] == ["Tag"]
+
+
+@pytest.mark.django_db
+def test_task_update_ignores_fields(authenticated_user, api_client, tagged_task):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.patch(
+        f"/api/tasks/{tagged_task.pk}/?fields=title", {"completed": True}
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["completed"] is True
+    assert "description" in response.data
+
+
+@pytest.mark.django_db
+def test_tag_fields(authenticated_user, api_client, tagged_task):
+    # Arrange
+    tag = tagged_task.tags.get()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    listed = api_client.get("/api/tags/?fields=name")
+    detail = api_client.get(f"/api/tags/{tag.pk}/?omit=updated_at")
+
+    # Assert
+    assert listed.data["results"] == [{"name": "Tag"}]
+    assert detail.data == {"id": tag.pk, "name": "Tag"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, param",
+    [
+        ("fields=title,secret", "fields"),
+        ("omit=tags", "omit"),
+        ("fields=,", "fields"),
+    ],
+)
+def test_unknown_sparse_fields(authenticated_user, api_client, query, param):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/?{query}")
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert param in response.data
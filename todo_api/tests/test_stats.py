@@ -0,0 +1,277 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from todo_api.models import Tag, Task, TaskCounter
+from todo_api.serializers import TaskSerializer
+from todo_api.stats import rebuild_counters
+
+
+def _stats(client):
+    response = client.get("/api/tasks/stats/")
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def _assert_no_drift():
+    assert rebuild_counters(dry_run=True) == {}
+
+
+@pytest.mark.django_db
+def test_stats_follow_api_writes(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    work, home = (
+        api_client.post("/api/tags/", {"name": name}, format="json").data["id"]
+        for name in ("work", "home")
+    )
+
+    # Act
+    first = api_client.post(
+        "/api/tasks/", {"title": "A", "priority": 1, "tags": [work]}, format="json"
+    ).data
+    second = api_client.post(
+        "/api/tasks/", {"title": "B", "tags": [work, home]}, format="json"
+    ).data
+    api_client.post(
+        "/api/tasks/", {"title": "C", "priority": 3, "parent_task": second["id"]}
+    )
+    api_client.patch(
+        f"/api/tasks/{first['id']}/", {"priority": 3, "tags": [home]}, format="json"
+    )
+    api_client.post(f"/api/tasks/{first['id']}/complete/")
+    api_client.post(f"/api/tasks/{first['id']}/complete/")
+    api_client.delete(f"/api/tasks/{second['id']}/")
+
+    # Assert
+    assert _stats(api_client) == {
+        "total": 1,
+        "completed": 1,
+        "open": 0,
+        "overdue": 0,
+        "by_priority": {"1": 0, "2": 0, "3": 1},
+        "tags": [
+            {"id": home, "name": "home", "tasks": 1},
+            {"id": work, "name": "work", "tasks": 0},
+        ],
+    }
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_stats_follow_bulk_operations(authenticated_user, api_client):
+    # Arrange
+    tag = Tag.objects.create(name="Tag", user=authenticated_user)
+    api_client.force_authenticate(user=authenticated_user)
+    created = api_client.post(
+        "/api/tasks/bulk/",
+        {
+            "operations": [
+                {"op": "create", "data": {"title": f"Task {i}", "tags": [tag.pk]}}
+                for i in range(4)
+            ]
+        },
+        format="json",
+    ).data["results"]
+    ids = [result["id"] for result in created]
+
+    # Act
+    api_client.post(
+        "/api/tasks/bulk/",
+        {
+            "operations": [
+                {"op": "update", "id": ids[0], "data": {"priority": 1, "tags": []}},
+                {"op": "complete", "id": ids[1]},
+                {"op": "delete", "id": ids[2]},
+                {"op": "create", "data": {"title": "New", "completed": True}},
+            ]
+        },
+        format="json",
+    )
+
+    # Assert
+    stats = _stats(api_client)
+    assert (stats["total"], stats["completed"]) == (4, 2)
+    assert stats["by_priority"] == {"1": 1, "2": 3, "3": 0}
+    assert stats["tags"][0]["tasks"] == 2
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_stats_follow_imports_and_tree_deletes(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.post(
+        "/api/tasks/import/",
+        data=(
+            '{"title": "Root", "tags": ["x"]}\n'
+            '{"title": "Other", "completed": true}\n'
+        ),
+        content_type="application/x-ndjson",
+    )
+    root = Task.objects.get(title="Root")
+    Task.objects.create(title="Child", parent_task=root, user=authenticated_user)
+    rebuild_counters()
+
+    # Act
+    before = _stats(api_client)
+    api_client.delete(f"/api/tasks/{root.pk}/tree/")
+
+    # Assert
+    assert (before["total"], before["tags"][0]["tasks"]) == (3, 1)
+    stats = _stats(api_client)
+    assert (stats["total"], stats["completed"]) == (1, 1)
+    assert stats["tags"][0]["tasks"] == 0
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_update_counts_from_the_current_row(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    tag = Tag.objects.create(name="work", user=authenticated_user)
+    task_id = api_client.post("/api/tasks/", {"title": "Task"}, format="json").data[
+        "id"
+    ]
+    # Read before the concurrent writes below, as get_object() would
+    stale = Task.objects.get(pk=task_id)
+    stale.prefetched_tags = []
+    api_client.post(f"/api/tasks/{task_id}/complete/")
+    Task.tags.through.objects.create(task_id=task_id, tag=tag)
+    rebuild_counters()
+
+    # Act
+    request = APIRequestFactory().patch(f"/api/tasks/{task_id}/")
+    request.user = authenticated_user
+    serializer = TaskSerializer(
+        stale,
+        data={"completed": True, "tags": [tag.pk]},
+        partial=True,
+        context={"request": request},
+    )
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+
+    # Assert
+    assert _stats(api_client)["completed"] == 1
+    assert list(Task.objects.get(pk=task_id).tags.all()) == [tag]
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_deleting_tag_drops_its_counter(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    tag = api_client.post("/api/tags/", {"name": "Tag"}, format="json").data["id"]
+    api_client.post("/api/tasks/", {"title": "A", "tags": [tag]}, format="json")
+
+    # Act
+    api_client.delete(f"/api/tags/{tag}/")
+
+    # Assert
+    assert not TaskCounter.objects.filter(name=f"tag:{tag}").exists()
+    assert _stats(api_client)["tags"] == []
+    _assert_no_drift()
+
+
+@pytest.mark.django_db
+def test_stats_count_overdue_open_tasks(authenticated_user, api_client):
+    # Arrange
+    now = timezone.now()
+    for finish_at, completed in [
+        (now - timedelta(days=1), False),
+        (now - timedelta(days=1), True),
+        (now + timedelta(days=1), False),
+        (None, False),
+    ]:
+        Task.objects.create(
+            title="Task",
+            finish_at=finish_at,
+            completed=completed,
+            user=authenticated_user,
+        )
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    stats = _stats(api_client)
+
+    # Assert
+    assert stats["overdue"] == 1
+
+
+@pytest.mark.django_db
+def test_stats_read_cost_does_not_grow(
+    authenticated_user, api_client, create_tasks, create_tags, django_assert_num_queries
+):
+    # Arrange
+    create_tasks(authenticated_user, 30)
+    create_tags(authenticated_user, 5)
+    rebuild_counters()
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with django_assert_num_queries(3):  # counters, overdue, tags
+        stats = _stats(api_client)
+
+    # Assert
+    assert stats["total"] == 30
+    assert len(stats["tags"]) == 5
+
+
+@pytest.mark.django_db
+def test_stats_are_scoped_to_user(authenticated_user, api_client, create_tasks):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    rebuild_counters()
+    other = type(authenticated_user).objects.create_user(username="other")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    stats = _stats(api_client)
+
+    # Assert
+    assert stats["total"] == 0
+    assert stats["by_priority"] == {"1": 0, "2": 0, "3": 0}
+
+
+@pytest.mark.django_db
+def test_stats_require_authentication(api_client):
+    # Act
+    response = api_client.get("/api/tasks/stats/")
+
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_rebuild_task_stats_command(authenticated_user, create_tasks, capsys):
+    # Arrange
+    create_tasks(authenticated_user, 3)
+    rebuild_counters()
+    TaskCounter.objects.filter(name="total").update(value=5)
+    TaskCounter.objects.create(user=authenticated_user, name="tag:999", value=1)
+
+    # Act
+    with pytest.raises(CommandError, match="drift in the counters of 1 users"):
+        call_command("rebuild_task_stats", "--check")
+    checked = capsys.readouterr().out
+    call_command("rebuild_task_stats", "--user", "testuser")
+    rebuilt = capsys.readouterr().out
+
+    # Assert
+    assert "testuser: tag:999 off by +1" in checked
+    assert "testuser: total off by +2" in checked
+    assert "fixed drift for 1 users" in rebuilt
+    assert TaskCounter.objects.get(name="total").value == 3
+    assert not TaskCounter.objects.filter(name="tag:999").exists()
+    call_command("rebuild_task_stats", "--check")
+
+
+@pytest.mark.django_db
+def test_rebuild_task_stats_unknown_user():
+    with pytest.raises(CommandError, match="Unknown users: nobody"):
+        call_command("rebuild_task_stats", "--user", "nobody")
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from todo_api.models import Tag, Task
+from todo_api.renderers import FastJSONRenderer, PlainList
+from todo_api.serializers import TaskRowListSerializer, TaskSerializer
+
+
+@pytest.fixture
+def varied_tasks(authenticated_user):
+    """Tasks exercising every field TaskSerializer represents."""
+    work = Tag.objects.create(name="work", user=authenticated_user)
+    home = Tag.objects.create(name="home ✓", user=authenticated_user)
+    parent = Task.objects.create(title="Parent", user=authenticated_user)
+    child = Task.objects.create(
+        title='Child   "quoted" \\ ünïcode',
+        description="Line\nbreak\ttab",
+        priority=1,
+        completed=True,
+        finish_at=datetime(2030, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        parent_task=parent,
+        attachment="tasks/attachments/notes.txt",
+        image="tasks/images/photo.png",
+        related_url="https://example.com/path?q=1",
+        extra_data={"nested": [1, True, None, {"key": " "}], "big": 2**62},
+        user=authenticated_user,
+    )
+    on_the_hour = Task.objects.create(
+        title="On the hour",
+        finish_at=datetime(2031, 6, 1, tzinfo=timezone.utc),
+        extra_data=[],
+        user=authenticated_user,
+    )
+    parent.tags.set([work, home])
+    child.tags.set([work])
+    return [parent, child, on_the_hour]
+
+
+def _legacy_data(tasks, request):
+    tasks = TaskSerializer.setup_eager_loading(
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).order_by("id")
+    )
+    return TaskSerializer(tasks, many=True, context={"request": request}).data
+
+
+def _row_data(tasks, request):
+    rows = TaskRowListSerializer.setup_values(
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).order_by("id")
+    )
+    return TaskRowListSerializer(rows, context={"request": request}).data
+
+
+@pytest.mark.django_db
+def test_task_rows_match_task_serializer(varied_tasks):
+    # Arrange
+    request = APIRequestFactory().get("/api/tasks/")
+
+    # Act
+    legacy = _legacy_data(varied_tasks, request)
+    rows = _row_data(varied_tasks, request)
+
+    # Assert
+    assert isinstance(rows, PlainList)
+    assert [list(task) for task in rows] == [list(task) for task in legacy]
+    assert rows == legacy
+    assert rows[1]["attachment"] == (
+        "http://testserver/api/media/tasks/attachments/notes.txt"
+    )
+    assert FastJSONRenderer().render(rows) == JSONRenderer().render(legacy)
+
+
+@pytest.mark.django_db
+def test_task_rows_with_floats_are_rendered_by_json_renderer(varied_tasks):
+    # Arrange
+    Task.objects.filter(pk=varied_tasks[0].pk).update(
+        extra_data={"ratio": 1e-05, "large": 1e16}
+    )
+
+    # Act
+    legacy = _legacy_data(varied_tasks, None)
+    rows = _row_data(varied_tasks, None)
+
+    # Assert
+    assert not isinstance(rows, PlainList)
+    assert rows == legacy
+    assert FastJSONRenderer().render(rows) == JSONRenderer().render(legacy)
+    assert b'"ratio":1e-05' in FastJSONRenderer().render(rows)
+
+
+@pytest.mark.django_db
+def test_task_list_response_matches_task_serializer(
+    authenticated_user, api_client, varied_tasks, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with django_assert_num_queries(4):  # task and tag fingerprints, tasks, tags
+        response = api_client.get("/api/tasks/?ordering=finish_at")
+
+    # Assert
+    request = response.wsgi_request
+    legacy = {task["id"]: task for task in _legacy_data(varied_tasks, request)}
+    results = response.data["results"]
+    assert [task["id"] for task in results] == [
+        varied_tasks[1].pk,
+        varied_tasks[2].pk,
+        varied_tasks[0].pk,
+    ]
+    assert results == [legacy[task["id"]] for task in results]
+    assert response.content == JSONRenderer().render(response.data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"plain": ["text   ", 1, -(2**63), True, None, {"a": []}]},
+        [{"float": 0.1}, {"small": 1e-05}, {"large": 1e16}],
+        [2**64],
+        {1: "integer key"},
+        {"date": datetime(2030, 1, 1, 0, 0, 0, 123456, tzinfo=timezone.utc)},
+        {"delta": timedelta(days=1), "decimal": Decimal("1.10")},
+        {"detail": ErrorDetail("Invalid.", code="invalid")},
+        ("tuple", "of", "strings"),
+        PlainList([{"id": 1}]),
+        None,
+    ],
+)
+def test_fast_json_renderer_matches_json_renderer(data):
+    # Act
+    rendered = FastJSONRenderer().render(data)
+
+    # Assert
+    assert rendered == JSONRenderer().render(data)
+
+
+def test_fast_json_renderer_indents_like_json_renderer():
+    # Arrange
+    data = {"results": PlainList([{"id": 1, "title": "Task"}])}
+
+    # Act
+    rendered = FastJSONRenderer().render(data, "application/json; indent=2")
+
+    # Assert
+    assert rendered == JSONRenderer().render(data, "application/json; indent=2")
+    assert b"\n" in rendered
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from todo_api.tokens import BloomFilter, RefreshToken, blacklist_filter
+
+
+@pytest.fixture(autouse=True)
+def clear_blacklist_filter():
+    blacklist_filter.clear()
+    yield
+    blacklist_filter.clear()
+
+
+def _refresh(client, token):
+    return client.post("/api/token/refresh/", {"refresh": str(token)}, format="json")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    # Arrange
+    bloom = BloomFilter(1000, error_rate=0.01)
+    added = [f"jti-{i}" for i in range(1000)]
+
+    # Act
+    for key in added:
+        bloom.add(key)
+
+    # Assert
+    assert all(key in bloom for key in added)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+def test_refresh_rotates_and_blacklists(
+    authenticated_user, api_client, django_assert_num_queries
+):
+    # Arrange
+    token = RefreshToken.for_user(authenticated_user)
+    blacklist_filter.get()
+
+    # Act
+    # user, outstanding token, blacklist insert in a savepoint, new token
+    with django_assert_num_queries(1 + 1 + 3 + 1):
+        response = _refresh(api_client, token)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert {"access", "refresh"} <= set(response.data)
+    assert BlacklistedToken.objects.get().token.jti == token["jti"]
+    assert OutstandingToken.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_rotated_token_is_rejected(
+    authenticated_user, api_client, django_capture_on_commit_callbacks
+):
+    # Arrange
+    token = RefreshToken.for_user(authenticated_user)
+    with django_capture_on_commit_callbacks(execute=True):
+        rotated = _refresh(api_client, token).data["refresh"]
+
+    # Act
+    reused = _refresh(api_client, token)
+
+    # Assert
+    assert token["jti"] in blacklist_filter
+    assert reused.status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refresh(api_client, rotated).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_token_blacklisted_by_another_process_is_rejected(
+    authenticated_user, api_client
+):
+    # Arrange
+    token = RefreshToken.for_user(authenticated_user)
+    blacklist_filter.get()
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get())
+
+    # Act
+    response = _refresh(api_client, token)
+
+    # Assert
+    assert token["jti"] not in blacklist_filter
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert BlacklistedToken.objects.count() == 1
+    assert OutstandingToken.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_blacklist_filter_loads_unexpired_blacklisted_tokens(authenticated_user):
+    # Arrange
+    live, expired, open_ = (RefreshToken.for_user(authenticated_user) for _ in "abc")
+    live.blacklist()
+    expired.blacklist()
+    OutstandingToken.objects.filter(jti=expired["jti"]).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    # Assert
+    assert live["jti"] in blacklist_filter
+    assert expired["jti"] not in blacklist_filter
+    assert open_["jti"] not in blacklist_filter
+
+
+@pytest.mark.django_db
+def test_prune_tokens_deletes_expired_tokens_in_batches(authenticated_user, capsys):
+    # Arrange
+    tokens = [RefreshToken.for_user(authenticated_user) for _ in range(7)]
+    for token in tokens[:4]:
+        token.blacklist()
+    OutstandingToken.objects.filter(
+        jti__in=[token["jti"] for token in tokens[1:6]]
+    ).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    # Act
+    call_command("prune_tokens", "--batch-size", "2", verbosity=2)
+
+    # Assert
+    output = capsys.readouterr().out
+    assert "Deleted 2 tokens so far." in output
+    assert "Deleted 5 expired tokens." in output
+    assert set(OutstandingToken.objects.values_list("jti", flat=True)) == {
+        tokens[0]["jti"],
+        tokens[6]["jti"],
+    }
+    assert BlacklistedToken.objects.get().token.jti == tokens[0]["jti"]
@@ -0,0 +1,200 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+from todo_api.models import Tag, Task
+from todo_api.tree import MAX_TREE_DEPTH
+
+
+@pytest.fixture
+def tree(authenticated_user):
+    """root -> (a -> (a1 -> a11), b), tagged a, as a dict of tasks by title."""
+    tasks = {}
+
+    def add(title, parent=None):
+        tasks[title] = Task.objects.create(
+            title=title, parent_task=parent, user=authenticated_user
+        )
+        return tasks[title]
+
+    root = add("root")
+    a = add("a", root)
+    add("a11", add("a1", a))
+    add("b", root)
+    tag = Tag.objects.create(name="Tag", user=authenticated_user)
+    a.tags.set([tag])
+    return tasks
+
+
+def _titles(node):
+    return {node["title"]: [_titles(child) for child in node["children"]]}
+
+
+@pytest.mark.django_db
+def test_task_tree_nests_subtasks(
+    authenticated_user, api_client, tree, django_assert_num_queries
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    with django_assert_num_queries(2):  # the recursive CTE, then tags
+        response = api_client.get(f"/api/tasks/{tree['root'].pk}/tree/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert _titles(response.data) == {
+        "root": [{"a": [{"a1": [{"a11": []}]}]}, {"b": []}]
+    }
+    a = response.data["children"][0]
+    assert a["parent_task"] == tree["root"].pk
+    assert [tag["name"] for tag in a["tags_detail"]] == ["Tag"]
+    listed = api_client.get(f"/api/tasks/{tree['a'].pk}/").data
+    assert {key: a[key] for key in listed} == listed
+
+
+@pytest.mark.django_db
+def test_task_tree_of_subtask(authenticated_user, api_client, tree):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{tree['a1'].pk}/tree/")
+
+    # Assert
+    assert _titles(response.data) == {"a1": [{"a11": []}]}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "depth, expected",
+    [
+        (0, {"root": []}),
+        (1, {"root": [{"a": []}, {"b": []}]}),
+        (2, {"root": [{"a": [{"a1": []}]}, {"b": []}]}),
+    ],
+)
+def test_task_tree_depth_limit(authenticated_user, api_client, tree, depth, expected):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{tree['root'].pk}/tree/?depth={depth}")
+
+    # Assert
+    assert _titles(response.data) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("depth", ["-1", str(MAX_TREE_DEPTH + 1), "x"])
+def test_task_tree_invalid_depth(authenticated_user, api_client, tree, depth):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{tree['root'].pk}/tree/?depth={depth}")
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "depth" in response.data
+
+
+@pytest.mark.django_db
+def test_task_tree_stops_on_cycles(authenticated_user, api_client, tree):
+    # Arrange
+    Task.objects.filter(pk=tree["root"].pk).update(parent_task=tree["a11"])
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.get(f"/api/tasks/{tree['a'].pk}/tree/")
+
+    # Assert
+    assert _titles(response.data) == {"a": [{"a1": [{"a11": [{"root": [{"b": []}]}]}]}]}
+
+
+@pytest.mark.django_db
+def test_task_tree_skips_other_users_tasks(authenticated_user, api_client, tree):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other")
+    Task.objects.create(title="foreign", parent_task=tree["b"], user=other)
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    own = api_client.get(f"/api/tasks/{tree['root'].pk}/tree/")
+    api_client.force_authenticate(user=other)
+    foreign = api_client.get(f"/api/tasks/{tree['root'].pk}/tree/")
+
+    # Assert
+    assert "foreign" not in str(_titles(own.data))
+    assert foreign.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_task_tree_delete_removes_subtree(
+    authenticated_user,
+    api_client,
+    tree,
+    django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    api_client.get("/api/tasks/")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        # exists, counts of tasks and tags, tag rows, tasks, counters, and the
+        # atomic block's savepoint
+        with django_assert_max_num_queries(6 + 2):
+            response = api_client.delete(f"/api/tasks/{tree['a'].pk}/tree/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"deleted": 3}
+    assert set(Task.objects.values_list("title", flat=True)) == {"root", "b"}
+    assert not Task.tags.through.objects.exists()
+    assert Tag.objects.exists()
+    listed = api_client.get("/api/tasks/").data["results"]
+    assert {task["title"] for task in listed} == {"root", "b"}
+
+
+@pytest.mark.django_db
+def test_task_tree_delete_with_cycle(authenticated_user, api_client, tree):
+    # Arrange
+    Task.objects.filter(pk=tree["root"].pk).update(parent_task=tree["a11"])
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.delete(f"/api/tasks/{tree['a1'].pk}/tree/")
+
+    # Assert
+    assert response.data == {"deleted": 5}
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_task_tree_delete_other_users_task(authenticated_user, api_client, tree):
+    # Arrange
+    other = get_user_model().objects.create_user(username="other")
+    api_client.force_authenticate(user=other)
+
+    # Act
+    response = api_client.delete(f"/api/tasks/{tree['root'].pk}/tree/")
+
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert Task.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_task_delete_cascades_to_subtasks(authenticated_user, api_client, tree):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.delete(f"/api/tasks/{tree['root'].pk}/")
+
+    # Assert
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not Task.objects.exists()
+    assert not Task.tags.through.objects.exists()
@@ -0,0 +1,261 @@
+import hashlib
+import io
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from PIL import Image
+from rest_framework import status
+
+from todo_api.models import Task, Upload
+from todo_api.uploads import CHUNK_SIZE, append_chunk, part_path
+
+CHUNK_TYPE = "application/offset+octet-stream"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _start(client, content, filename="notes.txt"):
+    response = client.post(
+        "/api/uploads/", {"filename": filename, "size": len(content)}, format="json"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.data["id"]
+
+
+def _send(client, upload_id, offset, chunk):
+    return client.generic(
+        "PATCH",
+        f"/api/uploads/{upload_id}/",
+        chunk,
+        content_type=CHUNK_TYPE,
+        HTTP_UPLOAD_OFFSET=str(offset),
+    )
+
+
+def _upload(client, content, filename="notes.txt", chunk_size=CHUNK_SIZE):
+    upload_id = _start(client, content, filename)
+    for offset in range(0, len(content), chunk_size):
+        response = _send(
+            client, upload_id, offset, content[offset : offset + chunk_size]
+        )
+        assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_chunked_upload_is_stored_by_content_hash(
+    authenticated_user, api_client, media_root
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    content = os.urandom(CHUNK_SIZE * 2 + 100)
+
+    # Act
+    upload = _upload(api_client, content, chunk_size=CHUNK_SIZE + 7)
+
+    # Assert
+    digest = hashlib.sha256(content).hexdigest()
+    assert upload["completed"]
+    assert upload["offset"] == upload["size"] == len(content)
+    assert upload["sha256"] == digest
+    assert upload["file"].endswith(f"/api/media/uploads/{digest[:2]}/{digest}.txt")
+    assert (media_root / "uploads" / digest[:2] / f"{digest}.txt").read_bytes() == (
+        content
+    )
+    assert not os.listdir(media_root / "uploads" / "parts")
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_the_stored_file(
+    authenticated_user, api_client, media_root
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    first = _upload(api_client, b"same bytes", "a.txt")
+
+    # Act
+    second = _upload(api_client, b"same bytes", "b.md")
+
+    # Assert
+    assert second["file"] == first["file"]
+    assert len(list((media_root / "uploads").glob("*/*"))) == 1
+
+
+@pytest.mark.django_db
+def test_interrupted_upload_resumes_from_its_offset(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    content = b"0123456789" * 10
+    upload_id = _start(api_client, content)
+    _send(api_client, upload_id, 0, content[:30])
+
+    # Act
+    status_before = api_client.get(f"/api/uploads/{upload_id}/").data
+    stale = _send(api_client, upload_id, 0, content[:30])
+    resumed = _send(api_client, upload_id, 30, content[30:])
+
+    # Assert
+    assert (status_before["offset"], status_before["completed"]) == (30, False)
+    assert stale.status_code == status.HTTP_409_CONFLICT
+    assert stale.data["offset"] == 30
+    assert resumed.data["completed"]
+    assert resumed.data["sha256"] == hashlib.sha256(content).hexdigest()
+
+
+@pytest.mark.django_db
+def test_partial_chunk_is_kept(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    upload = Upload.objects.create(user=authenticated_user, filename="a", size=100)
+
+    # Act
+    append_chunk(upload, 0, io.BytesIO(b"only forty bytes arrived before the end"), 60)
+
+    # Assert
+    upload.refresh_from_db()
+    assert upload.offset == 39
+    assert not upload.completed
+    with open(part_path(upload), "rb") as part:
+        assert part.read() == b"only forty bytes arrived before the end"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "offset, chunk, content_type, expected",
+    [
+        ("0", b"x" * 11, CHUNK_TYPE, status.HTTP_400_BAD_REQUEST),
+        ("x", b"x", CHUNK_TYPE, status.HTTP_400_BAD_REQUEST),
+        (None, b"x", CHUNK_TYPE, status.HTTP_400_BAD_REQUEST),
+        ("0", b"x", "application/octet-stream", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+    ],
+)
+def test_invalid_chunks_are_rejected(
+    authenticated_user, api_client, offset, chunk, content_type, expected
+):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    upload_id = _start(api_client, b"x" * 10)
+    headers = {} if offset is None else {"HTTP_UPLOAD_OFFSET": offset}
+
+    # Act
+    response = api_client.generic(
+        "PATCH",
+        f"/api/uploads/{upload_id}/",
+        chunk,
+        content_type=content_type,
+        **headers,
+    )
+
+    # Assert
+    assert response.status_code == expected
+    assert Upload.objects.get().offset == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", [0, 11])
+def test_upload_size_is_bounded(authenticated_user, api_client, settings, size):
+    # Arrange
+    settings.API_UPLOAD_MAX_SIZE = 10
+    api_client.force_authenticate(user=authenticated_user)
+
+    # Act
+    response = api_client.post(
+        "/api/uploads/", {"filename": "a.txt", "size": size}, format="json"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "size" in response.data
+
+
+@pytest.mark.django_db
+def test_uploads_are_private(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    upload_id = _start(api_client, b"secret")
+    api_client.force_authenticate(user=get_user_model().objects.create_user("other"))
+
+    # Act
+    read = api_client.get(f"/api/uploads/{upload_id}/")
+    write = _send(api_client, upload_id, 0, b"secret")
+    task = api_client.post(
+        "/api/tasks/", {"title": "T", "attachment_upload": upload_id}, format="json"
+    )
+
+    # Assert
+    assert read.status_code == write.status_code == status.HTTP_404_NOT_FOUND
+    assert task.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_cancelled_upload_removes_its_part(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    upload_id = _start(api_client, b"0123456789")
+    _send(api_client, upload_id, 0, b"01234")
+    path = part_path(Upload.objects.get())
+
+    # Act
+    response = api_client.delete(f"/api/uploads/{upload_id}/")
+
+    # Assert
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not os.path.exists(path)
+    assert not Upload.objects.exists()
+
+
+@pytest.mark.django_db
+def test_task_references_finished_uploads(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    attachment = _upload(api_client, b"report", "report.pdf")
+    image = _upload(api_client, _png(), "photo.png")
+
+    # Act
+    created = api_client.post(
+        "/api/tasks/",
+        {
+            "title": "With files",
+            "attachment_upload": attachment["id"],
+            "image_upload": image["id"],
+        },
+        format="json",
+    )
+
+    # Assert
+    assert created.status_code == status.HTTP_201_CREATED
+    assert created.data["attachment"] == attachment["file"]
+    assert created.data["image"] == image["file"]
+    task = Task.objects.get()
+    assert task.attachment.read() == b"report"
+    assert "attachment_upload" not in created.data
+
+
+@pytest.mark.django_db
+def test_task_rejects_unfinished_and_non_image_uploads(authenticated_user, api_client):
+    # Arrange
+    api_client.force_authenticate(user=authenticated_user)
+    unfinished = _start(api_client, b"0123456789")
+    text = _upload(api_client, b"not an image", "fake.png")["id"]
+
+    # Act
+    response = api_client.post(
+        "/api/tasks/",
+        {"title": "T", "attachment_upload": unfinished, "image_upload": text},
+        format="json",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data) == {"attachment_upload", "image_upload"}
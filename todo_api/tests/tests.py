@@ -1,9 +1,6 @@
 from datetime import datetime, timedelta, timezone
 
-# conftest.py
-# conftest.py o tests.py
 import pytest
-from django.contrib.auth import get_user_model
 from django.utils import timezone as django_timezone
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -11,45 +8,6 @@ from rest_framework.test import APIClient
 from todo_api.models import Tag, Task
 
 
-@pytest.fixture
-def authenticated_user():
-    User = get_user_model()
-    return User.objects.create_user(
-        username="testuser", email="test@example.com", password="testpass123"
-    )
-
-
-@pytest.fixture
-def api_client():
-    return APIClient()
-
-
-@pytest.fixture
-def create_task(db):
-    def _create_task(user=None):
-        return Task.objects.create(title="Test Task", user=user)
-
-    return _create_task
-
-
-@pytest.fixture
-def create_tasks(db):
-    def _create_tasks(user, num_tasks):
-        for i in range(num_tasks):
-            Task.objects.create(title=f"Task {i}", user=user)
-
-    return _create_tasks
-
-
-@pytest.fixture
-def create_tags(db):
-    def _create_tags(user, num_tags):
-        for i in range(num_tags):
-            Tag.objects.create(name=f"Tag {i}", user=user)
-
-    return _create_tags
-
-
 @pytest.mark.django_db
 def test_task_retrieve_success(authenticated_user, create_task):
     # Arrange
@@ -309,7 +267,7 @@ def test_tag_list_authenticated(authenticated_user, create_tags):
 
     # Assert
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 3
+    assert len(response.data["results"]) == 3
 
 
 @pytest.mark.django_db
@@ -378,7 +336,9 @@ def test_get_queryset_authenticated(authenticated_user, create_tasks):
 
     # Assert
     assert response.status_code == 200  # Check for successful response
-    assert len(response.data) == 3  # Check that the correct number of tasks is returned
+    assert (
+        len(response.data["results"]) == 3
+    )  # Check that the correct number of tasks is returned
 
 
 @pytest.mark.django_db
@@ -0,0 +1,189 @@
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib import rest_framework_simplejwt as simplejwt_schema
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed amount of memory: ``in`` never misses an added
+    key, and wrongly finds one that was not added about ``error_rate`` of
+    the time while no more than ``capacity`` keys are added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions out of two 64-bit hashes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return ((first + i * second) % self.size for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class BlacklistFilter:
+    """
+    Process-wide Bloom filter of the jtis of blacklisted, unexpired tokens.
+
+    It is loaded from the database on first use, and then only learns the
+    tokens this process blacklists, so a miss is no proof that a token is
+    not blacklisted: ``RefreshToken.blacklist`` settles that with the
+    unique constraint of the blacklist. Once more tokens than its capacity
+    are added, it is reloaded, twice as large if still needed.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.bloom = None
+        self.lock = threading.Lock()
+
+    def load(self) -> BloomFilter:
+        jtis = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list("token__jti", flat=True)
+        count = jtis.count()
+        while self.capacity < count * 2:
+            self.capacity *= 2
+        bloom = BloomFilter(self.capacity)
+        for jti in jtis.iterator(chunk_size=10000):
+            bloom.add(jti)
+        return bloom
+
+    def get(self) -> BloomFilter:
+        bloom = self.bloom
+        if bloom is None or bloom.count > bloom.capacity:
+            with self.lock:
+                if self.bloom is bloom:
+                    self.bloom = self.load()
+                bloom = self.bloom
+        return bloom
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.get()
+
+    def add(self, jti: str) -> None:
+        self.get().add(jti)
+
+    def clear(self) -> None:
+        self.bloom = None
+
+
+blacklist_filter = BlacklistFilter(settings.API_TOKEN_BLACKLIST_FILTER_CAPACITY)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken checking the blacklist through ``blacklist_filter``, so
+    only tokens the filter finds are looked up in the database.
+
+    Blacklisting inserts the blacklist row directly and rejects the token if
+    it is already there, which is the exact check for tokens blacklisted by
+    other processes.
+    """
+
+    def check_blacklist(self) -> None:
+        if self.payload[api_settings.JTI_CLAIM] in blacklist_filter:
+            super().check_blacklist()
+
+    def blacklist(self) -> BlacklistedToken:
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token, _created = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+                "created_at": self.current_time,
+                "token": str(self),
+                "expires_at": datetime_from_epoch(self.payload["exp"]),
+            },
+        )
+        try:
+            with transaction.atomic():
+                blacklisted = BlacklistedToken.objects.create(token=token)
+        except IntegrityError:
+            raise TokenError(_("Token is blacklisted"))
+        transaction.on_commit(lambda: blacklist_filter.add(jti))
+        return blacklisted
+
+    def outstand(self) -> OutstandingToken:
+        # A new jti is random, so there is nothing to get before creating
+        return OutstandingToken.objects.create(
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            jti=self.payload[api_settings.JTI_CLAIM],
+            token=str(self),
+            created_at=self.current_time,
+            expires_at=datetime_from_epoch(self.payload["exp"]),
+        )
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializerExtension(simplejwt_schema.TokenRefreshSerializerExtension):
+    target_class = TokenRefreshSerializer
+
+
+def prune_tokens(batch_size: int = 5000, now=None):
+    """
+    Deletes expired outstanding tokens and their blacklist rows,
+    ``batch_size`` tokens per transaction, yielding how many tokens each
+    batch deleted.
+
+    Expired tokens are the oldest ones, so reading them in id order finds
+    each batch at the start of the primary key index.
+    """
+    now = now or timezone.now()
+    qn = connection.ops.quote_name
+    outstanding, blacklisted = OutstandingToken._meta, BlacklistedToken._meta
+    while True:
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            params = ", ".join(["%s"] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {qn(blacklisted.db_table)} WHERE "
+                    f"{qn(blacklisted.get_field('token').column)} IN ({params})",
+                    ids,
+                )
+                cursor.execute(
+                    f"DELETE FROM {qn(outstanding.db_table)} "
+                    f"WHERE {qn(outstanding.pk.column)} IN ({params})",
+                    ids,
+                )
+        yield len(ids)
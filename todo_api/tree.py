@@ -0,0 +1,128 @@
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+
+from .cache import invalidate_user
+from .models import Tag, Task
+from .stats import count_tasks, diff_counts, update_counters
+
+MAX_TREE_DEPTH = 32
+
+
+def subtree_cte(
+    root_ids: Iterable[int],
+    user_id: Optional[int] = None,
+    max_depth: Optional[int] = None,
+) -> tuple[str, list]:
+    """
+    Returns ``(sql, params)`` for a ``WITH RECURSIVE subtree (id, depth)``
+    clause holding the root tasks and their descendants, ``depth`` being 0
+    for the roots.
+
+    With ``user_id``, only that user's tasks are followed. ``max_depth``
+    stops the walk at that many levels below the roots.
+
+    Tasks have a single parent, so the first task reached twice in the walk
+    is always a root: never stepping back into one is enough to end on
+    parent cycles, and a root below another root is only listed once.
+    """
+    root_ids = list(root_ids)
+    roots = ", ".join(["%s"] * len(root_ids))
+    qn = connection.ops.quote_name
+    meta = Task._meta
+    table, pk = qn(meta.db_table), qn(meta.pk.column)
+    parent = qn(meta.get_field("parent_task").column)
+    user = qn(meta.get_field("user").column)
+
+    anchor, step = [f"{pk} IN ({roots})"], [f"child.{pk} NOT IN ({roots})"]
+    anchor_params, step_params = list(root_ids), list(root_ids)
+    if user_id is not None:
+        anchor.append(f"{user} = %s")
+        step.append(f"child.{user} = %s")
+        anchor_params.append(user_id)
+        step_params.append(user_id)
+    if max_depth is not None:
+        step.append("subtree.depth < %s")
+        step_params.append(max_depth)
+    sql = (
+        "WITH RECURSIVE subtree (id, depth) AS ("
+        f"SELECT {pk}, 0 FROM {table} WHERE {' AND '.join(anchor)} "
+        "UNION ALL "
+        f"SELECT child.{pk}, subtree.depth + 1 FROM {table} child "
+        f"JOIN subtree ON child.{parent} = subtree.id "
+        f"WHERE {' AND '.join(step)})"
+    )
+    return sql, anchor_params + step_params
+
+
+def get_subtree(user, root_id: int, max_depth: int = MAX_TREE_DEPTH) -> Optional[Task]:
+    """
+    Loads the user's task ``root_id`` and its descendants down to
+    ``max_depth`` levels, or returns None when the user has no such task.
+
+    The tree is read with one query, and the tags of all of its tasks with
+    another. Each task gets its ``depth`` and its children, ordered by
+    creation, in ``subtasks``.
+    """
+    cte, params = subtree_cte([root_id], user.pk, max_depth)
+    qn = connection.ops.quote_name
+    fields = [field for field in Task._meta.concrete_fields if not field.generated]
+    columns = ", ".join(f"task.{qn(field.column)}" for field in fields)
+    tasks = list(
+        Task.objects.raw(
+            f"{cte} SELECT {columns}, subtree.depth FROM {qn(Task._meta.db_table)} "
+            f"task JOIN subtree ON task.{qn(Task._meta.pk.column)} = subtree.id "
+            "ORDER BY subtree.depth, task.created_at, task.id",
+            params,
+        )
+    )
+    if not tasks:
+        return None
+    prefetch_related_objects(
+        tasks, Prefetch("tags", queryset=Tag.objects.all(), to_attr="prefetched_tags")
+    )
+    by_id = {}
+    for task in tasks:
+        task.subtasks = []
+        by_id[task.pk] = task
+        if task.depth:
+            by_id[task.parent_task_id].subtasks.append(task)
+    return tasks[0]
+
+
+def delete_subtrees(root_ids: Iterable[int]) -> int:
+    """
+    Deletes the tasks ``root_ids`` and all of their descendants, returning
+    how many tasks were deleted.
+
+    Mirrors the ON DELETE CASCADE of ``parent_task`` with set-based DELETEs
+    over ``subtree_cte`` instead of Django's collector, which loads every
+    descendant level by level. No delete signals are sent. The counters and
+    data version of every owner of a deleted task are updated.
+    """
+    cte, params = subtree_cte(root_ids)
+    qn = connection.ops.quote_name
+    meta, through = Task._meta, Task.tags.through._meta
+    in_subtree = f"IN ({cte} SELECT id FROM subtree)"
+    with transaction.atomic():
+        counts = count_tasks(
+            Task.objects.filter(pk__in=RawSQL(f"{cte} SELECT id FROM subtree", params))
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(through.db_table)} "
+                f"WHERE {qn(through.get_field('task').column)} {in_subtree}",
+                params,
+            )
+            cursor.execute(
+                f"DELETE FROM {qn(meta.db_table)} "
+                f"WHERE {qn(meta.pk.column)} {in_subtree}",
+                params,
+            )
+            deleted = cursor.rowcount
+        update_counters(diff_counts(counts, {}))
+        for user_id in counts:
+            invalidate_user(user_id)
+    return deleted
@@ -0,0 +1,104 @@
+import fcntl
+import hashlib
+import os
+
+from django.core.files.storage import default_storage
+
+from .models import Upload
+
+# Bytes read from the request or the part file at a time
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadConflict(Exception):
+    """The chunk does not start at the upload's offset, or another chunk of
+    the upload is being written."""
+
+
+def part_path(upload: Upload) -> str:
+    return default_storage.path(f"uploads/parts/{upload.pk}.part")
+
+
+def blob_name(sha256: str, filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    return f"uploads/{sha256[:2]}/{sha256}{extension}"
+
+
+def append_chunk(upload: Upload, offset: int, stream, length: int) -> Upload:
+    """
+    Writes ``length`` bytes read from ``stream`` at ``offset`` of the
+    upload's part file, and stores the file once it is complete.
+
+    Bytes are copied ``CHUNK_SIZE`` at a time, so memory use does not depend
+    on the chunk size. If the stream ends early, e.g. because the client
+    disconnected, the bytes received are kept and the upload can be resumed
+    from its new offset. An exclusive lock on the part file keeps two
+    requests from writing the same upload at once.
+    """
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab+") as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict("Another chunk of this upload is being written.")
+        upload.refresh_from_db(fields=["offset", "file"])
+        if upload.completed or offset != upload.offset:
+            raise UploadConflict(f"Expected a chunk at offset {upload.offset}.")
+        # Bytes past the offset are left over from a write that failed
+        # before the offset was saved
+        part.truncate(offset)
+        written = 0
+        try:
+            while written < length:
+                data = stream.read(min(CHUNK_SIZE, length - written))
+                if not data:
+                    break
+                part.write(data)
+                written += len(data)
+        finally:
+            part.flush()
+            os.fsync(part.fileno())
+            upload.offset = offset + written
+            upload.save(update_fields=["offset", "updated_at"])
+        if upload.offset == upload.size:
+            finish_upload(upload)
+    return upload
+
+
+def finish_upload(upload: Upload) -> None:
+    """
+    Stores the complete part file by its SHA-256, unless an upload with the
+    same content is already stored, in which case both share that file.
+    """
+    path = part_path(upload)
+    digest = hashlib.sha256()
+    with open(path, "rb") as part:
+        while data := part.read(CHUNK_SIZE):
+            digest.update(data)
+    upload.sha256 = digest.hexdigest()
+    existing = (
+        Upload.objects.filter(sha256=upload.sha256)
+        .exclude(file="")
+        .values_list("file", flat=True)
+        .first()
+    )
+    if existing and default_storage.exists(existing):
+        os.remove(path)
+        upload.file.name = existing
+    else:
+        upload.file.name = blob_name(upload.sha256, upload.filename)
+        target = default_storage.path(upload.file.name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+    upload.save(update_fields=["sha256", "file", "updated_at"])
+
+
+def discard_upload(upload: Upload) -> None:
+    """Deletes an unfinished upload's part file. Stored files may be shared
+    with other uploads and tasks, so they are kept."""
+    if not upload.completed:
+        try:
+            os.remove(part_path(upload))
+        except FileNotFoundError:
+            pass
@@ -1,29 +1,48 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import (
-    MarkTaskAsCompletedView,
-    TagListCreate,
-    TagRetrieveUpdateDestroy,
-    TaskListCreate,
-    TaskRetrieveUpdateDestroy,
-)
+from . import async_views, views
 
-urlpatterns = [
-    path("tasks/", TaskListCreate.as_view(), name="task-list-create"),
-    path(
-        "tasks/<int:pk>/",
-        TaskRetrieveUpdateDestroy.as_view(),
-        name="task-get-update-delete",
-    ),
-    path(
-        "tasks/<int:pk>/complete/",
-        MarkTaskAsCompletedView.as_view(),
-        name="task-mark-as-completed",
-    ),
-    path("tags/", TagListCreate.as_view(), name="tag-list-create"),
-    path(
-        "tags/<int:pk>/",
-        TagRetrieveUpdateDestroy.as_view(),
-        name="tag-get-update-delete",
-    ),
-]
+
+def get_urlpatterns(api_views):
+    """Routes the API to ``views`` or to their ``async_views`` versions."""
+    return [
+        path("tasks/", api_views.TaskListCreate.as_view(), name="task-list-create"),
+        path("tasks/bulk/", views.TaskBulkView.as_view(), name="task-bulk"),
+        path(
+            "tasks/complete/",
+            views.TaskBulkCompleteView.as_view(),
+            name="task-bulk-complete",
+        ),
+        path("tasks/export/", views.TaskExportView.as_view(), name="task-export"),
+        path("tasks/import/", views.TaskImportView.as_view(), name="task-import"),
+        path("tasks/stats/", views.TaskStatsView.as_view(), name="task-stats"),
+        path(
+            "tasks/<int:pk>/",
+            api_views.TaskRetrieveUpdateDestroy.as_view(),
+            name="task-get-update-delete",
+        ),
+        path("tasks/<int:pk>/tree/", views.TaskTreeView.as_view(), name="task-tree"),
+        path(
+            "tasks/<int:pk>/complete/",
+            api_views.MarkTaskAsCompletedView.as_view(),
+            name="task-mark-as-completed",
+        ),
+        path("media/<path:name>", views.MediaView.as_view(), name="media"),
+        path(
+            "images/<str:variant>/<path:name>",
+            views.TaskImageVariantView.as_view(),
+            name="task-image-variant",
+        ),
+        path("uploads/", views.UploadCreate.as_view(), name="upload-create"),
+        path("uploads/<int:pk>/", views.UploadDetail.as_view(), name="upload-detail"),
+        path("tags/", api_views.TagListCreate.as_view(), name="tag-list-create"),
+        path(
+            "tags/<int:pk>/",
+            api_views.TagRetrieveUpdateDestroy.as_view(),
+            name="tag-get-update-delete",
+        ),
+    ]
+
+
+urlpatterns = get_urlpatterns(async_views if settings.API_ASYNC_VIEWS else views)
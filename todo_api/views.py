@@ -1,28 +1,84 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework import status
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import (
+    CreateAPIView,
+    GenericAPIView,
+    ListCreateAPIView,
+    RetrieveDestroyAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import is_form_media_type
 from rest_framework.response import Response
+from rest_framework.serializers import IntegerField
 from rest_framework.views import APIView
 
-from .models import Tag, Task
-from .serializers import TagSerializer, TaskSerializer
+from .cache import CachedResponseMixin, invalidate_user
+from .completion import complete_task, set_completed
+from .conditional import ConditionalListMixin, ConditionalObjectMixin
+from .images import VARIANTS, schedule_variants, touch_variant, variant_name
+from .importer import TaskImporter
+from .media import media_response
+from .models import Tag, Task, TaskCounter, Upload
+from .pagination import TagCursorPagination, TaskCursorPagination
+from .parsers import CSVParser, NDJSONParser, UploadChunkParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import TaskSearchFilter
+from .serializers import (
+    TagSerializer,
+    TaskBulkSerializer,
+    TaskCompleteSerializer,
+    TaskImportReportSerializer,
+    TaskImportSerializer,
+    TaskRowListSerializer,
+    TaskSerializer,
+    TaskStatsSerializer,
+    TaskTreeQuerySerializer,
+    TaskTreeSerializer,
+    UploadSerializer,
+)
+from .sparse import SparseFieldsMixin
+from .stats import get_stats, tag_counter
+from .tree import delete_subtrees, get_subtree
+from .uploads import UploadConflict, append_chunk, discard_upload
 
 
-class TaskListCreate(ListCreateAPIView):
+class TaskListCreate(
+    ConditionalListMixin, CachedResponseMixin, SparseFieldsMixin, ListCreateAPIView
+):
     """
     Supports filtering (priority, completed, created_at, finish_at),
-    searching, and ordering.
+    ranked searching, ordering, and sparse fieldsets (?fields=, ?omit=).
+    Results are cursor paginated and carry an ETag for conditional GETs.
     """
 
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["priority", "completed", "created_at", "finish_at"]
+    stateless_auth = True
+    pagination_class = TaskCursorPagination
+    filter_backends = [DjangoFilterBackend, TaskSearchFilter, OrderingFilter]
+    filterset_fields = {
+        "priority": ["exact"],
+        "completed": ["exact"],
+        "created_at": ["exact", "lt", "lte", "gt", "gte"],
+        "finish_at": ["exact", "lt", "lte", "gt", "gte"],
+    }
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "finish_at", "priority"]
+    # The pagination keys
+    sparse_required_fields = ordering_fields
 
     def get_queryset(self):
         """
@@ -33,7 +89,32 @@ class TaskListCreate(ListCreateAPIView):
         """
         if not self.request.user.is_authenticated:
             return Task.objects.none()
-        return Task.objects.filter(user=self.request.user)
+        return TaskSerializer.setup_eager_loading(
+            Task.objects.filter(user=self.request.user)
+        )
+
+    def get_fingerprint_querysets(self):
+        """Tasks embed their tags, so renaming a tag changes the list too."""
+        return [
+            *super().get_fingerprint_querysets(),
+            Tag.objects.filter(user=self.request.user),
+        ]
+
+    def get_rows_queryset(self, queryset):
+        # Pages are read as rows and serialized by TaskRowListSerializer, the
+        # fast equivalent of TaskSerializer(many=True)
+        return TaskRowListSerializer.setup_values(
+            queryset, self.get_sparse_fields(), keys=self.sparse_required_fields
+        )
+
+    def paginate_queryset(self, queryset):
+        return super().paginate_queryset(self.get_rows_queryset(queryset))
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.pop("many", False):
+            kwargs.setdefault("context", self.get_serializer_context())
+            return self.trim_serializer(TaskRowListSerializer(*args, **kwargs))
+        return super().get_serializer(*args, **kwargs)
 
     def perform_create(self, serializer: TaskSerializer):
         """Saves the new task with the authenticated user.
@@ -44,18 +125,80 @@ class TaskListCreate(ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class TaskRetrieveUpdateDestroy(RetrieveUpdateDestroyAPIView):
+class TaskRetrieveUpdateDestroy(
+    ConditionalObjectMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    RetrieveUpdateDestroyAPIView,
+):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
     lookup_field = "pk"
+    # Read by the ETag/Last-Modified validators
+    sparse_required_fields = ["updated_at"]
 
     def get_queryset(self):
         """
         Filters the queryset to return only tasks owned by the current user.
+
+        Tags are only prefetched when the task is going to be serialized.
         """
         if not self.request.user.is_authenticated:
             return Task.objects.none()
-        return Task.objects.filter(user=self.request.user)
+        queryset = Task.objects.filter(user=self.request.user)
+        if self.request.method == "DELETE":
+            return queryset
+        return TaskSerializer.setup_eager_loading(queryset)
+
+    def perform_destroy(self, instance: Task):
+        """Deletes the subtasks with the task in set-based DELETEs."""
+        delete_subtrees([instance.pk])
+
+    def get_versions(self, instance):
+        versions = super().get_versions(instance)
+        fields = self.get_sparse_fields()
+        if fields is not None and "tags_detail" not in fields:
+            return versions
+        tags = getattr(instance, "prefetched_tags", None)
+        if tags is None:
+            tags = instance.tags.all()
+        return [*versions, *((tag.pk, tag.updated_at) for tag in tags)]
+
+
+class TaskTreeView(APIView):
+    """
+    Returns a task with its subtasks nested in ``children``, down to
+    ``?depth=`` levels (``MAX_TREE_DEPTH`` by default), or deletes the task
+    and its whole subtree.
+
+    Both read the tree with a single recursive CTE, see ``todo_api.tree``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    @extend_schema(parameters=[TaskTreeQuerySerializer], responses=TaskTreeSerializer)
+    def get(self, request, pk):
+        query = TaskTreeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        root = get_subtree(request.user, pk, query.validated_data["depth"])
+        if root is None:
+            return Response(
+                {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(TaskTreeSerializer(root).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        responses=inline_serializer("TaskTreeDelete", {"deleted": IntegerField()})
+    )
+    def delete(self, request, pk):
+        if not Task.objects.filter(pk=pk, user=request.user).exists():
+            return Response(
+                {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        deleted = delete_subtrees([pk])
+        return Response({"deleted": deleted}, status=status.HTTP_200_OK)
 
 
 class MarkTaskAsCompletedView(APIView):
@@ -64,9 +207,7 @@ class MarkTaskAsCompletedView(APIView):
     @extend_schema(request=TaskSerializer, responses=TaskSerializer)
     def post(self, request, pk):
         try:
-            task = Task.objects.get(pk=pk, user=request.user)
-            task.completed = True
-            task.save()
+            task = self.complete(pk, request.user)
             serializer = TaskSerializer(task)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Task.DoesNotExist:
@@ -74,18 +215,203 @@ class MarkTaskAsCompletedView(APIView):
                 {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+    @staticmethod
+    def complete(pk, user) -> Task:
+        """Marks the user's task ``pk`` as completed, see ``complete_task``.
+
+        Raises ``Task.DoesNotExist`` when the user has no task ``pk``.
+        """
+        task = complete_task(user, pk)
+        if task is None:
+            # Already completed, so nothing to write
+            return TaskSerializer.setup_eager_loading(Task.objects).get(
+                pk=pk, user=user
+            )
+        prefetch_related_objects(
+            [task],
+            Prefetch("tags", queryset=Tag.objects.all(), to_attr="prefetched_tags"),
+        )
+        return task
+
 
-class TagListCreate(ListCreateAPIView):
+class TaskBulkCompleteView(GenericAPIView):
     """
-    Supports filtering (priority, completed, created_at, finish_at),
-    searching, and ordering.
+    Completes, or reopens with ``"completed": false``, the tasks listed in
+    ``ids``, or else every task matching the filters of the task list, e.g.
+    ``?priority=3&created_at__lt=2030-01-01T00:00:00Z``. Returns how many
+    tasks changed.
+    """
+
+    serializer_class = TaskCompleteSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = TaskListCreate.filterset_fields
+
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return Task.objects.none()
+        return Task.objects.filter(user=self.request.user)
+
+    @extend_schema(
+        # Would collide with the single task complete endpoint's
+        operation_id="tasks_bulk_complete",
+        responses=inline_serializer("TaskCompleteResult", {"updated": IntegerField()}),
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = serializer.validated_data.get("ids")
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        elif not self.is_filtered(queryset):
+            # Guards against updating every task by mistake
+            raise ValidationError({"ids": ["Give ids or filter the tasks to update."]})
+        updated = set_completed(
+            request.user, queryset, serializer.validated_data["completed"]
+        )
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+    def is_filtered(self, queryset) -> bool:
+        # django-filter skips blank values, so ?priority= filters nothing
+        filterset = DjangoFilterBackend().get_filterset(self.request, queryset, self)
+        return filterset.is_valid() and any(
+            value not in (None, "") for value in filterset.form.cleaned_data.values()
+        )
+
+
+class TaskStatsView(APIView):
+    """
+    Returns the user's total, completed, open and overdue tasks, and their
+    tasks by priority and by tag.
+
+    Counts come from counters kept up to date by every write (see
+    ``todo_api.stats``), so reading them does not get slower as tasks are
+    added.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    @extend_schema(responses=TaskStatsSerializer)
+    def get(self, request):
+        return Response(TaskStatsSerializer(get_stats(request.user)).data)
+
+
+class TaskBulkView(APIView):
+    """
+    Applies a batch of create/update/delete/complete operations atomically.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=TaskBulkSerializer, responses=TaskBulkSerializer)
+    def post(self, request):
+        serializer = TaskBulkSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        invalidate_user(request.user.pk)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class TaskExportView(GenericAPIView):
+    """
+    Streams every task matching the ``TaskListCreate`` filters as NDJSON, or
+    as CSV with ``?format=csv``.
+
+    Rows are read through a server-side cursor ``chunk_size`` at a time, with
+    tags prefetched per chunk, so memory use does not grow with the export.
+    """
+
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    pagination_class = None
+    filter_backends = TaskListCreate.filter_backends
+    filterset_fields = TaskListCreate.filterset_fields
+    search_fields = TaskListCreate.search_fields
+    ordering_fields = TaskListCreate.ordering_fields
+    ordering = ["created_at", "id"]
+    chunk_size = 2000
+
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return Task.objects.none()
+        return TaskSerializer.setup_eager_loading(
+            Task.objects.filter(user=self.request.user)
+        )
+
+    @extend_schema(responses=TaskSerializer(many=True))
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        fields = [
+            name for name, field in serializer.fields.items() if not field.write_only
+        ]
+        rows = (
+            serializer.to_representation(task)
+            for task in queryset.iterator(chunk_size=self.chunk_size)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(rows, fields),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        filename = f"tasks-{timezone.now():%Y%m%d%H%M%S}.{renderer.format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TaskImportView(APIView):
+    """
+    Imports tasks from an NDJSON or CSV body, or from a ``file`` uploaded as
+    multipart form data, in the format written by ``TaskExportView``.
+
+    The input is parsed and written in batches as it is read, see
+    ``TaskImporter``; invalid rows are skipped and listed in the report.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [NDJSONParser, CSVParser, MultiPartParser]
+
+    @extend_schema(
+        request=TaskImportSerializer(many=True), responses=TaskImportReportSerializer
+    )
+    def post(self, request):
+        report = TaskImporter(request.user).run(self.get_rows(request))
+        return Response(TaskImportReportSerializer(report).data)
+
+    def get_rows(self, request):
+        if not is_form_media_type(request.content_type):
+            return request.data
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        if upload.content_type == CSVParser.media_type or upload.name.endswith(".csv"):
+            return CSVParser().parse(upload)
+        return NDJSONParser().parse(upload)
+
+
+class TagListCreate(
+    ConditionalListMixin, CachedResponseMixin, SparseFieldsMixin, ListCreateAPIView
+):
+    """
+    Supports filtering (name, user), searching, ordering, and sparse
+    fieldsets (?fields=, ?omit=). Results are cursor paginated and carry an
+    ETag for conditional GETs.
     """
 
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
+    pagination_class = TagCursorPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["name", "user"]
     search_fields = ["name", "user"]
+    # The pagination keys
+    sparse_required_fields = ["name", "updated_at"]
 
     def get_queryset(self):
         """
@@ -107,10 +433,18 @@ class TagListCreate(ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class TagRetrieveUpdateDestroy(RetrieveUpdateDestroyAPIView):
+class TagRetrieveUpdateDestroy(
+    ConditionalObjectMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    RetrieveUpdateDestroyAPIView,
+):
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
     lookup_field = "pk"
+    # Read by the ETag/Last-Modified validators
+    sparse_required_fields = ["updated_at"]
 
     def get_queryset(self):
         """
@@ -119,3 +453,156 @@ class TagRetrieveUpdateDestroy(RetrieveUpdateDestroyAPIView):
         if not self.request.user.is_authenticated:
             return Tag.objects.none()
         return Tag.objects.filter(user=self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance: Tag):
+        """Deletes the tag along with its count of tasks."""
+        TaskCounter.objects.filter(
+            user=instance.user_id, name=tag_counter(instance.pk)
+        ).delete()
+        instance.delete()
+
+
+class MediaView(APIView):
+    """
+    Sends a task's attachment or image, as linked from the task's
+    ``attachment`` and ``image``, to the owner of the task only. The file of
+    a finished upload is sent to the owner of the upload as well.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    @extend_schema(responses={(200, "*/*"): OpenApiTypes.BINARY})
+    def get(self, request, name):
+        tasks = Task.objects.filter(
+            Q(attachment=name) | Q(image=name), user=request.user
+        )
+        uploads = Upload.objects.filter(file=name, user=request.user)
+        # One query, which stops at the first match
+        if not tasks.values("pk").union(uploads.values("pk"), all=True).exists():
+            return Response(
+                {"error": "File not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            response = media_response(name)
+        except FileNotFoundError:
+            return Response(
+                {"error": "File not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        # Stored files are never overwritten, as names are never reused
+        response["Cache-Control"] = "private, max-age=86400"
+        return response
+
+
+class TaskImageVariantView(APIView):
+    """
+    Serves a downscaled WebP variant of the image of one of the user's
+    tasks, as linked from the task's ``image_variants``. While the variant
+    is not rendered yet, its rendering is queued and the original image is
+    served instead.
+    """
+
+    permission_classes = [IsAuthenticated]
+    stateless_auth = True
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("variant", str, OpenApiParameter.PATH, enum=list(VARIANTS))
+        ],
+        responses={(200, "image/*"): OpenApiTypes.BINARY},
+    )
+    def get(self, request, variant, name):
+        if (
+            variant not in VARIANTS
+            or not Task.objects.filter(user=request.user, image=name).exists()
+        ):
+            return Response(
+                {"error": "Image not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        stored = variant_name(name, variant)
+        path = default_storage.path(stored)
+        if not os.path.exists(path):
+            schedule_variants(name)
+        try:
+            if os.path.exists(path):
+                touch_variant(path)
+                response = media_response(stored, VARIANTS[variant].content_type)
+                # A variant never changes, as image names are never reused
+                response["Cache-Control"] = "private, max-age=86400"
+            else:
+                response = media_response(name)
+                response["Cache-Control"] = "private, no-cache"
+        except FileNotFoundError:
+            return Response(
+                {"error": "Image not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return response
+
+
+class UploadCreate(CreateAPIView):
+    """
+    Starts a chunked upload of a ``size`` bytes file. Its bytes are then
+    sent to the upload's endpoint, and the finished upload is given to a
+    task by id, as ``attachment_upload`` or ``image_upload``.
+    """
+
+    serializer_class = UploadSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class UploadDetail(RetrieveDestroyAPIView):
+    """
+    GET returns the upload, whose ``offset`` is where an interrupted upload
+    resumes. PATCH appends the request body, sent as
+    ``application/offset+octet-stream`` with an ``Upload-Offset`` header
+    equal to that offset. DELETE cancels the upload.
+    """
+
+    serializer_class = UploadSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [UploadChunkParser]
+
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return Upload.objects.none()
+        return Upload.objects.filter(user=self.request.user)
+
+    @extend_schema(
+        request={UploadChunkParser.media_type: OpenApiTypes.BINARY},
+        parameters=[
+            OpenApiParameter(
+                "Upload-Offset",
+                int,
+                OpenApiParameter.HEADER,
+                required=True,
+                description="Offset of the chunk, the upload's current offset",
+            )
+        ],
+        responses=UploadSerializer,
+    )
+    def patch(self, request, *args, **kwargs):
+        upload = self.get_object()
+        if request.content_type.split(";")[0].strip() != UploadChunkParser.media_type:
+            raise UnsupportedMediaType(request.content_type)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            raise ValidationError({"Upload-Offset": ["Expected the chunk's offset."]})
+        if offset < 0 or length > upload.size - offset:
+            raise ValidationError(
+                {"Upload-Offset": [f"The chunk must end within {upload.size} bytes."]}
+            )
+        try:
+            append_chunk(upload, offset, request.stream, length)
+        except UploadConflict as exc:
+            return Response(
+                {"error": str(exc), "offset": upload.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+    def perform_destroy(self, instance: Upload):
+        discard_upload(instance)
+        instance.delete()
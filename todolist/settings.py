@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party apps
     "django_filters",
     "drf_spectacular",
@@ -61,6 +64,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it times the other middleware too
+    "todo_api.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Mantained for non-dockerized deployment
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,12 +103,57 @@ WSGI_APPLICATION = "todolist.wsgi.application"
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Serve the task and tag endpoints with the views in todo_api.async_views.
+# Meant for ASGI deployments (see entrypoint.prod.sh).
+API_ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS", "False") == "True"
+
 DATABASES = {"default": dj_database_url.parse(DATABASE_URL, conn_max_age=600)}
+if API_ASYNC_VIEWS and DATABASES["default"]["ENGINE"].endswith("postgresql"):
+    # Under ASGI every request runs its sync code in a thread of its own, so
+    # persistent connections would pile up, one per in-flight request.
+    # Share a bounded per-process pool instead.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": 2,
+        "max_size": int(os.getenv("DJANGO_DB_POOL_SIZE", 10)),
+        "timeout": 30,
+    }
 DATABASES["default"]["TEST"] = {
     "NAME": "invera_todo_test",
     "CHARSET": "UTF8",
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory by default. It is per process, so multi-worker deployments
+# must point DJANGO_CACHE_BACKEND/LOCATION at a shared backend (file based,
+# Memcached or Redis) for version bumps to reach every worker.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "todo-api"),
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("DJANGO_CACHE_MAX_ENTRIES", 10000))},
+    },
+    # Users resolved from access tokens, see todo_api.authentication. Never
+    # culled, as an evicted deactivation would let the user's tokens in;
+    # entries expire with the tokens instead
+    "users": {
+        "BACKEND": os.getenv(
+            "DJANGO_USER_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("DJANGO_USER_CACHE_LOCATION", "todo-api-users"),
+        "OPTIONS": {"MAX_ENTRIES": sys.maxsize},
+    },
+}
+
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -126,7 +176,7 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "todo_api.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
@@ -134,6 +184,10 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "todo_api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 # Authentication settings
@@ -142,8 +196,19 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_REFRESH_SERIALIZER": "todo_api.tokens.TokenRefreshSerializer",
 }
 
+# Blacklisted refresh tokens the in-memory blacklist filter is sized for; it
+# grows past that when needed
+API_TOKEN_BLACKLIST_FILTER_CAPACITY = int(
+    os.getenv("API_TOKEN_BLACKLIST_FILTER_CAPACITY", 100000)
+)
+
+# Users resolved from access tokens are cached for as long as a token lives
+API_USER_CACHE_ALIAS = "users"
+API_USER_CACHE_TIMEOUT = int(SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds())
+
 REST_USE_JWT = True
 JWT_AUTH_COOKIE = "jwt-auth-token"
 JWT_AUTH_REFRESH_COOKIE = "jwt-refresh-token"
@@ -175,8 +240,34 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
-MEDIA_URL = "/media/"
+# Served by todo_api.views.MediaView to the owners of the files only
+MEDIA_URL = "/api/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Internal nginx location aliasing MEDIA_ROOT. When set, media responses hand
+# the file over to nginx with X-Accel-Redirect instead of sending it
+API_MEDIA_ACCEL_REDIRECT = os.getenv("API_MEDIA_ACCEL_REDIRECT", "")
+
+# Largest file accepted by the chunked upload API, in bytes
+API_UPLOAD_MAX_SIZE = int(os.getenv("API_UPLOAD_MAX_SIZE", 1024**3))
+
+# Memory-mapped metric files, one per server process, summed by /metrics
+API_METRICS_DIR = os.getenv(
+    "API_METRICS_DIR", os.path.join(tempfile.gettempdir(), "todo_api_metrics")
+)
+# Bearer token Prometheus sends to /metrics; the endpoint is off without one
+API_METRICS_TOKEN = os.getenv("API_METRICS_TOKEN", "")
+
+# Jobs each `manage.py runworker` runs at once
+API_JOB_CONCURRENCY = int(os.getenv("API_JOB_CONCURRENCY", 4))
+# Seconds a job may run before another worker may claim it again
+API_JOB_TIMEOUT = int(os.getenv("API_JOB_TIMEOUT", 600))
+
+# Processes rendering the image variants of each server process, 0 to render
+# them in the request's thread instead
+API_IMAGE_VARIANT_WORKERS = int(os.getenv("API_IMAGE_VARIANT_WORKERS", 2))
+# Disk space of the image variants, in bytes, before the least recently
+# served are deleted
+API_IMAGE_VARIANT_CACHE_SIZE = int(os.getenv("API_IMAGE_VARIANT_CACHE_SIZE", 1024**3))
 
 
 STORAGES = {
@@ -191,6 +282,15 @@ STORAGES = {
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Records are written by a listener thread, see todo_api.logs. Above this
+# many queued records a process drops records instead of waiting for the disk
+API_LOG_QUEUE_SIZE = int(os.getenv("API_LOG_QUEUE_SIZE", 10000))
+# Once the queue is half full, one in this many records below WARNING is kept
+API_LOG_SAMPLE_RATE = int(os.getenv("API_LOG_SAMPLE_RATE", 10))
+# logs/debug.log is rotated past this size, keeping API_LOG_BACKUP_COUNT files
+API_LOG_MAX_BYTES = int(os.getenv("API_LOG_MAX_BYTES", 10 * 1024**2))
+API_LOG_BACKUP_COUNT = int(os.getenv("API_LOG_BACKUP_COUNT", 5))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -203,6 +303,9 @@ LOGGING = {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "todo_api.logs.JSONFormatter",
+        },
     },
     "handlers": {
         "console": {
@@ -210,28 +313,36 @@ LOGGING = {
             "formatter": "verbose",
         },
         "file": {
-            "class": "logging.FileHandler",
+            "class": "todo_api.logs.ProcessSafeRotatingFileHandler",
             "filename": os.path.join(BASE_DIR, "logs", "debug.log"),
-            "formatter": "verbose",
+            "maxBytes": API_LOG_MAX_BYTES,
+            "backupCount": API_LOG_BACKUP_COUNT,
+            "formatter": "json",
+        },
+        "queue": {
+            "()": "todo_api.logs.NonBlockingQueueHandler",
+            "handlers": ["console", "file"],
+            "queue_size": API_LOG_QUEUE_SIZE,
+            "sample_rate": API_LOG_SAMPLE_RATE,
         },
     },
     "loggers": {
         "": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": os.getenv("DJANGO_LOG_LEVEL", "INFO"),
         },
         "django.security": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "WARNING",
             "propagate": False,
         },
         "rest_framework": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
         "django.request": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "ERROR",
             "propagate": False,
         },
@@ -248,7 +359,7 @@ SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
     "COMPONENT_SPLIT_PATCH": True,
     "DEFAULT_AUHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "todo_api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",